@@ -1,10 +1,32 @@
-from fastapi import Cookie, HTTPException, status
+from fastapi import Cookie, Header, HTTPException, status
 from uuid import UUID
+import hmac
 import jwt
+import os
 from api.auth.jwt import decode_access_token
-from api.db.supabase import supabase
+from api.db.supabase import supabase, run_query
+from api.cache import TTLCache
+from api import metrics
 
-def get_current_user(access_token: str = Cookie(default=None)) -> UUID:
+# The JWT signature already proves who the caller is; this only remembers that the
+# users row still existed recently, so most requests skip the lookup.
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+USER_CACHE_MAXSIZE = int(os.getenv("USER_CACHE_MAXSIZE", "10000"))
+
+# Shared secret for internal callers of /api/metrics (monitoring, ops scripts); unset
+# leaves the endpoint closed. User sessions never grant access.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+_verified_users = TTLCache(maxsize=USER_CACHE_MAXSIZE, ttl=USER_CACHE_TTL_SECONDS)
+metrics.register("user_cache", _verified_users.stats)
+
+
+def invalidate_user(user_id: UUID | str) -> None:
+    """Forget a cached user; call on logout and when the account is deleted."""
+    _verified_users.invalidate(str(user_id))
+
+
+async def get_current_user(access_token: str = Cookie(default=None)) -> UUID:
     if not access_token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
 
@@ -29,7 +51,10 @@ def get_current_user(access_token: str = Cookie(default=None)) -> UUID:
             detail="Invalid or expired token",
         )
 
-    result = supabase.table("users").select("id").eq("id", str(user_id)).execute()
+    if _verified_users.get(str(user_id)):
+        return user_id
+
+    result = await run_query(supabase.table("users").select("id").eq("id", str(user_id)))
 
     if not result.data:
         raise HTTPException(
@@ -37,4 +62,15 @@ def get_current_user(access_token: str = Cookie(default=None)) -> UUID:
             detail="User not found",
         )
 
-    return user_id
\ No newline at end of file
+    _verified_users.set(str(user_id), True)
+    return user_id
+
+
+async def require_metrics_token(authorization: str = Header(default=None)) -> None:
+    scheme, _, token = (authorization or "").partition(" ")
+    if not METRICS_TOKEN or scheme.lower() != "bearer" or not hmac.compare_digest(token, METRICS_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
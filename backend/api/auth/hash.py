@@ -1,11 +1,76 @@
 # backend/utils/hash.py
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import bcrypt
+from fastapi import HTTPException
+
+from api import metrics
+
+# Work factor for new hashes; existing hashes keep verifying at whatever cost they were made with.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+if not 4 <= BCRYPT_ROUNDS <= 31:
+    raise RuntimeError(f"Unsupported BCRYPT_ROUNDS: {BCRYPT_ROUNDS}. Must be between 4 and 31")
+
+# bcrypt releases the GIL, so a small dedicated pool caps how many cores a login burst
+# can take from the event loop. Requests beyond the queue depth are turned away with a
+# 503 instead of piling up behind each other.
+HASH_POOL_SIZE = int(os.getenv("HASH_POOL_SIZE", str(max(1, (os.cpu_count() or 2) // 2))))
+HASH_QUEUE_DEPTH = int(os.getenv("HASH_QUEUE_DEPTH", "32"))
+
+_hash_executor = ThreadPoolExecutor(max_workers=HASH_POOL_SIZE, thread_name_prefix="bcrypt")
+_lock = threading.Lock()
+_in_flight = 0
+_rejected = 0
+
+
+def _stats() -> dict:
+    return {
+        "pool_size": HASH_POOL_SIZE,
+        "queue_depth": HASH_QUEUE_DEPTH,
+        "in_flight": _in_flight,
+        "rejected": _rejected,
+    }
+
+
+metrics.register("password_hashing", _stats)
 
-def hash_password(password: str) -> str:
+
+async def _run_in_hash_pool(fn, *args):
+    global _in_flight, _rejected
+    with _lock:
+        if _in_flight >= HASH_POOL_SIZE + HASH_QUEUE_DEPTH:
+            _rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Server busy, please try again",
+                headers={"Retry-After": "1"},
+            )
+        _in_flight += 1
+
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, fn, *args)
+    finally:
+        with _lock:
+            _in_flight -= 1
+
+
+def _hashpw(password: str) -> str:
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode("utf-8")
+
+
+def _checkpw(plain_password: str, hashed_password: str) -> bool:
+    return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
+
+
+async def hash_password(password: str) -> str:
     """
     Don't do prehashing to avoid truncating output possibility space
     """
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    return await _run_in_hash_pool(_hashpw, password)
+
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
\ No newline at end of file
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await _run_in_hash_pool(_checkpw, plain_password, hashed_password)
@@ -1,5 +1,6 @@
 # backend/utils/jwt.py
 from datetime import datetime, timedelta, timezone
+import hashlib
 import jwt
 import os
 import uuid
@@ -39,3 +40,15 @@ def decode_access_token(token: str):
     if payload.get("type") == "refresh":
         raise jwt.InvalidTokenError("Refresh token cannot be used as access token")
     return payload
+
+
+def decode_refresh_token(token: str):
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    if payload.get("type") != "refresh":
+        raise jwt.InvalidTokenError("Access token cannot be used as refresh token")
+    return payload
+
+
+def hash_refresh_token(token: str) -> str:
+    """Fixed-length digest stored in refresh_tokens in place of the token itself."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
@@ -0,0 +1,114 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+from fastapi import HTTPException, Query
+from api.db.supabase import run_query
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class PageParams:
+    """
+    Query parameters shared by the per-user list endpoints.
+
+    Pages are keyset-paginated newest first on (sort column, id): the cursor holds the
+    last row's sort value and id, so rows inserted while a client is paging never shift
+    or repeat the pages that follow.
+
+    Without a limit or cursor every row is returned, as before paging existed, so
+    clients that do not follow next_cursor still see all of their rows. A cursor
+    without a limit continues in pages of DEFAULT_PAGE_SIZE.
+    """
+
+    def __init__(
+        self,
+        limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = Query(None, max_length=512),
+        from_: Optional[datetime] = Query(None, alias="from"),
+        to: Optional[datetime] = Query(None),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.from_ = from_
+        self.to = to
+
+
+def encode_cursor(sort_value, row_id) -> str:
+    payload = json.dumps([sort_value, row_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if not isinstance(sort_value, str) or not isinstance(row_id, int) or '"' in sort_value:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return sort_value, row_id
+
+
+def _range_bound(value: datetime, sort_type: type) -> str:
+    """
+    A from/to datetime as a literal of the sort column's type. A date column holds
+    midnights, so a bound inside a day moves to the next midnight.
+    """
+    if sort_type is not date:
+        return value.isoformat()
+    day = value.date()
+    if value.timetz().replace(tzinfo=None) != time.min:
+        day += timedelta(days=1)
+    return day.isoformat()
+
+
+def _cursor_value(sort_value: str, sort_type: type) -> str:
+    """The cursor's sort value re-read as the sort column's type (date or datetime)."""
+    try:
+        return sort_type.fromisoformat(sort_value).isoformat()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def paginate(query, page: PageParams, sort_column: str, id_column: str, sort_type: type = datetime) -> dict:
+    """
+    Apply the page's date range, cursor and limit to a select builder and run it.
+    sort_type is the Python type of sort_column: datetime for timestamps, date for
+    date columns, so the range and cursor are compared as that type.
+
+    Returns the response body: the page of rows under "data" and, when more rows
+    remain, the cursor for the next page under "next_cursor".
+    """
+    if page.from_:
+        query = query.gte(sort_column, _range_bound(page.from_, sort_type))
+    if page.to:
+        query = query.lt(sort_column, _range_bound(page.to, sort_type))
+
+    query = query.order(sort_column, desc=True).order(id_column, desc=True)
+    if page.limit is None and not page.cursor:
+        # No paging asked for: every row, as before the endpoints were paginated.
+        return {"data": (await run_query(query)).data, "next_cursor": None}
+    limit = page.limit or DEFAULT_PAGE_SIZE
+
+    if page.cursor:
+        sort_value, row_id = decode_cursor(page.cursor)
+        sort_value = _cursor_value(sort_value, sort_type)
+        query = query.or_(
+            f'{sort_column}.lt."{sort_value}",'
+            f'and({sort_column}.eq."{sort_value}",{id_column}.lt.{row_id})'
+        )
+
+    # One extra row tells us whether there is a next page without a count query.
+    response = await run_query(query.limit(limit + 1))
+
+    rows = response.data[:limit]
+    next_cursor = None
+    if len(response.data) > limit:
+        last = rows[-1]
+        next_cursor = encode_cursor(last[sort_column], last[id_column])
+    return {"data": rows, "next_cursor": next_cursor}
@@ -0,0 +1,114 @@
+from dataclasses import dataclass
+from uuid import UUID
+
+from fastapi import HTTPException
+from api.db.supabase import supabase, run_query
+
+
+@dataclass(frozen=True)
+class OwnedResource:
+    """
+    A table whose rows belong to a user, either through its own user_id column or
+    through a chain of parent rows (owner_path, nearest parent first).
+
+    Ownership is folded into the data query itself: rows are filtered by user in the
+    same PostgREST call that reads them, and a row the user does not own is
+    indistinguishable from a missing one (404, per the IDOR policy).
+    """
+    table: str
+    id_column: str
+    not_found: str
+    owner_path: tuple[str, ...] = ()
+    soft_delete: bool = False
+
+    def _owner_embed(self) -> str:
+        embed = "user_id"
+        for parent in reversed(self.owner_path):
+            embed = f"{parent}!inner({embed})"
+        return embed
+
+    def select(self, user_id: UUID, columns: str = "*"):
+        """Builder over the user's rows of this table; add filters and pass it to run_query."""
+        if self.owner_path:
+            query = (
+                supabase.table(self.table)
+                .select(f"{columns}, {self._owner_embed()}")
+                .eq(".".join((*self.owner_path, "user_id")), str(user_id))
+            )
+        else:
+            query = supabase.table(self.table).select(columns).eq("user_id", str(user_id))
+
+        if self.soft_delete:
+            query = query.is_("deleted_at", "null")
+        return query
+
+    async def get(self, resource_id, user_id: UUID, columns: str = "*", match: dict | None = None) -> dict:
+        query = self.select(user_id, columns).eq(self.id_column, resource_id)
+        if match:
+            query = query.match(match)
+
+        result = await run_query(query)
+        if not result.data:
+            raise HTTPException(status_code=404, detail=self.not_found)
+
+        row = result.data[0]
+        if self.owner_path:
+            row.pop(self.owner_path[0], None)
+        return row
+
+    async def verify(self, resource_id, user_id: UUID, match: dict | None = None) -> None:
+        await self.get(resource_id, user_id, columns=self.id_column, match=match)
+
+    def _scoped(self, query, resource_id, user_id: UUID, match: dict | None):
+        query = query.eq(self.id_column, resource_id)
+        if match:
+            query = query.match(match)
+        if not self.owner_path:
+            query = query.eq("user_id", str(user_id))
+        if self.soft_delete:
+            query = query.is_("deleted_at", "null")
+        return query
+
+    async def update(self, resource_id, user_id: UUID, data: dict, match: dict | None = None) -> dict:
+        # Updates can't filter through embedded parents, so child rows are checked first.
+        if self.owner_path:
+            await self.verify(resource_id, user_id, match)
+
+        result = await run_query(
+            self._scoped(supabase.table(self.table).update(data), resource_id, user_id, match)
+        )
+        if not result.data:
+            raise HTTPException(status_code=404, detail=self.not_found)
+        return result.data[0]
+
+    async def delete(self, resource_id, user_id: UUID, match: dict | None = None) -> None:
+        if self.owner_path:
+            await self.verify(resource_id, user_id, match)
+
+        result = await run_query(
+            self._scoped(supabase.table(self.table).delete(), resource_id, user_id, match)
+        )
+        if not result.data:
+            raise HTTPException(status_code=404, detail=self.not_found)
+
+
+# ------------------------------------------------------------------
+# Resources
+# ------------------------------------------------------------------
+
+SYMPTOM_LOGS = OwnedResource("symptom_logs", "symptom_id", "Symptom log not found")
+MEDICATION_STOCK = OwnedResource("user_medication_stock", "stock_id", "Medication stock entry not found")
+SCHEDULES = OwnedResource("user_medication_schedule", "schedule_id", "Schedule not found", soft_delete=True)
+SUPPLEMENTS = OwnedResource("user_supplements", "supplement_id", "Supplement not found")
+BODY_METRICS = OwnedResource("body_metrics", "id", "Body metric entry not found")
+
+WORKOUTS = OwnedResource("workouts", "id", "Workout not found")
+WORKOUT_EXERCISES = OwnedResource("workout_exercises", "id", "Workout exercise not found", owner_path=("workouts",))
+SETS = OwnedResource("sets", "id", "Set not found", owner_path=("workout_exercises", "workouts"))
+
+WORKOUT_ROUTINES = OwnedResource("workout_routines", "id", "Workout routine not found")
+ROUTINE_EXERCISES = OwnedResource("routine_exercises", "id", "Routine exercise not found", owner_path=("workout_routines",))
+ROUTINE_SETS = OwnedResource("routine_sets", "id", "Routine set not found", owner_path=("routine_exercises", "workout_routines"))
+
+WORKOUT_PLANS = OwnedResource("workout_plans", "id", "Workout plan not found")
+PLAN_DAYS = OwnedResource("plan_routine_days", "id", "Plan day not found", owner_path=("workout_plans",))
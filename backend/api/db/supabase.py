@@ -1,3 +1,6 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
 from dotenv import load_dotenv
 from supabase import create_client, Client
 import os
@@ -11,4 +14,18 @@ SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
 if not SUPABASE_URL or not SUPABASE_KEY:
     raise RuntimeError("SUPABASE_URL or SUPABASE_KEY not set")
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
\ No newline at end of file
+# Upper bound on PostgREST round trips in flight per worker process.
+DB_MAX_CONCURRENCY = int(os.getenv("DB_MAX_CONCURRENCY", "32"))
+
+supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+# The supabase client is synchronous, so queries run on a dedicated pool instead of
+# the event loop (which would stall every other request on the worker) or Starlette's
+# shared threadpool (which sync routes and file uploads also draw from).
+_db_executor = ThreadPoolExecutor(max_workers=DB_MAX_CONCURRENCY, thread_name_prefix="supabase")
+
+
+async def run_query(query):
+    """Execute a PostgREST query builder without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_db_executor, query.execute)
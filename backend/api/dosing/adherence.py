@@ -0,0 +1,86 @@
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from api.dosing.occurrences import ScheduleSet, dates_us, to_us
+
+PERIODS = ("week", "month")
+
+
+def period_starts(period: str, count: int, today: date) -> list[date]:
+    """First day of the last `count` weeks (Monday) or calendar months, oldest first."""
+    if period == "week":
+        monday = today - timedelta(days=today.weekday())
+        return [monday - timedelta(weeks=i) for i in reversed(range(count))]
+
+    starts = []
+    year, month = today.year, today.month
+    for _ in range(count):
+        starts.append(date(year, month, 1))
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return starts[::-1]
+
+
+def adherence_by_medication(
+    schedules: list[dict],
+    rollups: list[dict],
+    starts: list[date],
+    now: datetime,
+) -> list[dict]:
+    """
+    Expected, taken and missed doses per medication per period, oldest period first.
+
+    Expected doses are the schedule slots from each period start up to the next (the
+    last period ends at `now`), counted arithmetically per schedule. Taken and missed
+    come from the daily rollup rows, bucketed into periods by day. Adherence is taken
+    over expected as a percentage, with extra logs beyond the expected count ignored.
+    Periods with neither expected doses nor logs are left out.
+    """
+    if not schedules:
+        return []
+
+    schedule_set = ScheduleSet(schedules)
+    edges = np.append(dates_us([start.isoformat() for start in starts]), to_us(now))
+    n_periods = len(starts)
+
+    schedule_meds = np.fromiter((s["medication_id"] for s in schedules), dtype=np.int64, count=len(schedules))
+    medication_ids, med_index = np.unique(schedule_meds, return_inverse=True)
+    n_cells = len(medication_ids) * n_periods
+
+    expected = np.zeros((len(medication_ids), n_periods), dtype=np.int64)
+    np.add.at(expected, med_index, np.maximum(schedule_set.slot_counts(edges), 0))
+
+    taken = np.zeros(n_cells)
+    missed = np.zeros(n_cells)
+    if rollups:
+        order = np.argsort(schedule_set.ids, kind="stable")
+        sorted_ids = schedule_set.ids[order]
+        rollup_ids = np.fromiter((r["schedule_id"] for r in rollups), dtype=np.int64, count=len(rollups))
+        found = np.minimum(np.searchsorted(sorted_ids, rollup_ids), len(sorted_ids) - 1)
+        period = np.searchsorted(edges, dates_us([r["day"] for r in rollups]), side="right") - 1
+        valid = (sorted_ids[found] == rollup_ids) & (period >= 0) & (period < n_periods)
+
+        cell = med_index[order[found][valid]] * n_periods + period[valid]
+        counts = np.array([(r["taken"], r["missed"]) for r in rollups], dtype=np.float64).reshape(-1, 2)[valid]
+        taken = np.bincount(cell, weights=counts[:, 0], minlength=n_cells)
+        missed = np.bincount(cell, weights=counts[:, 1], minlength=n_cells)
+    taken = taken.reshape(expected.shape).astype(np.int64)
+    missed = missed.reshape(expected.shape).astype(np.int64)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        percent = np.round(np.minimum(taken, expected) * 100 / expected, 1)
+    has_expected = expected > 0
+    present = has_expected | (taken > 0) | (missed > 0)
+
+    rows = []
+    for m, p in zip(*np.nonzero(present)):
+        rows.append({
+            "medication_id": int(medication_ids[m]),
+            "period_start": starts[p],
+            "expected": int(expected[m, p]),
+            "taken": int(taken[m, p]),
+            "missed": int(missed[m, p]),
+            "adherence": float(percent[m, p]) if has_expected[m, p] else None,
+        })
+    rows.sort(key=lambda row: (row["period_start"], row["medication_id"]))
+    return rows
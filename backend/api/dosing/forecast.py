@@ -0,0 +1,133 @@
+import asyncio
+import itertools
+import os
+from datetime import date, timedelta
+from uuid import UUID
+
+import numpy as np
+
+from api import metrics
+from api.cache import TTLCache
+from api.db.supabase import supabase, run_query
+from api.dosing.occurrences import US_PER_DAY, dates_us, dose_interval_us
+
+# Stock projected to run out within this many days is reported as low.
+LOW_STOCK_DAYS = int(os.getenv("LOW_STOCK_DAYS", "7"))
+# Forecasts are dropped on any dose log, stock or schedule change, but the cache is per
+# worker: a change handled by one worker leaves the others serving their copy until it
+# expires. The TTL bounds that staleness (and how stale "today" gets for an idle user).
+STOCK_FORECAST_CACHE_TTL_SECONDS = float(os.getenv("STOCK_FORECAST_CACHE_TTL_SECONDS", "300"))
+STOCK_FORECAST_CACHE_MAXSIZE = int(os.getenv("STOCK_FORECAST_CACHE_MAXSIZE", "10000"))
+
+_forecasts = TTLCache(maxsize=STOCK_FORECAST_CACHE_MAXSIZE, ttl=STOCK_FORECAST_CACHE_TTL_SECONDS)
+metrics.register("stock_forecast_cache", _forecasts.stats)
+
+# Every invalidation stamps the user with the next value of one process-wide counter. A
+# forecast computed from rows read before the latest invalidation is stale, so it is only
+# cached if the user's stamp did not move while it was being loaded. Stamps only have to
+# outlive a load or a forecast job pass, so they expire (and are LRU-bounded) rather than
+# accumulating one per user ever invalidated; an expired stamp reads as 0, which never
+# matches a newer one.
+_generation_counter = itertools.count(1)
+_generations = TTLCache(maxsize=STOCK_FORECAST_CACHE_MAXSIZE, ttl=max(STOCK_FORECAST_CACHE_TTL_SECONDS, 3600))
+
+STOCK_COLUMNS = "stock_id, user_id, medication_id, quantity, unit"
+SCHEDULE_COLUMNS = "stock_id, dose_amount, frequency_per_day, interval_hours, start_date, end_date"
+
+
+def invalidate_forecast(user_id: UUID | str) -> None:
+    """Drop a user's cached forecast; call whenever their stock or dose usage changes."""
+    key = str(user_id)
+    _generations.set(key, next(_generation_counter))
+    _forecasts.invalidate(key)
+
+
+def forecast_generation() -> int:
+    """Watermark to pass to prime_forecasts, taken before reading the rows it forecasts."""
+    return next(_generation_counter)
+
+
+def forecast_stock(stock_rows: list[dict], schedules: list[dict], today: date) -> list[dict]:
+    """
+    Project when each stock row runs out under the schedules drawing from it.
+
+    Daily usage per stock is the sum over its schedules active today of dose size times
+    doses per day, computed for all rows at once. Dose sizes are truncated to whole
+    units, the same way log_dose decrements stock. Stock with no usage never runs out
+    (depletion_date is None).
+    """
+    n = len(stock_rows)
+    stock_ids = np.fromiter((s["stock_id"] for s in stock_rows), dtype=np.int64, count=n)
+    quantity = np.fromiter((s.get("quantity") or 0 for s in stock_rows), dtype=np.float64, count=n)
+
+    daily = np.zeros(n)
+    if n and schedules:
+        today_us = int(dates_us([today.isoformat()])[0])
+        linked = [s for s in schedules if s.get("stock_id") is not None]
+        m = len(linked)
+        schedule_stock = np.fromiter((s["stock_id"] for s in linked), dtype=np.int64, count=m)
+        dose = np.trunc(np.fromiter((s["dose_amount"] for s in linked), dtype=np.float64, count=m))
+        interval = np.fromiter((dose_interval_us(s) for s in linked), dtype=np.float64, count=m)
+        starts = dates_us([s["start_date"] for s in linked])
+        ends = dates_us([s.get("end_date") or "9999-12-31" for s in linked])
+        active = (starts <= today_us) & (ends >= today_us)
+
+        order = np.argsort(stock_ids, kind="stable")
+        found = np.minimum(np.searchsorted(stock_ids[order], schedule_stock), n - 1)
+        matched = active & (stock_ids[order][found] == schedule_stock)
+        usage = dose * (US_PER_DAY / interval)
+        daily = np.bincount(order[found][matched], weights=usage[matched], minlength=n)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        days_remaining = np.where(daily > 0, quantity / daily, np.inf)
+    finite = np.isfinite(days_remaining)
+    is_low = finite & (days_remaining < LOW_STOCK_DAYS)
+
+    forecasts = []
+    for i, stock in enumerate(stock_rows):
+        forecasts.append({
+            "stock_id": stock["stock_id"],
+            "medication_id": stock["medication_id"],
+            "quantity": stock.get("quantity"),
+            "unit": stock.get("unit"),
+            "daily_usage": round(float(daily[i]), 3),
+            "days_remaining": round(float(days_remaining[i]), 1) if finite[i] else None,
+            "depletion_date": today + timedelta(days=int(days_remaining[i])) if finite[i] else None,
+            "is_low": bool(is_low[i]),
+        })
+    return forecasts
+
+
+async def get_user_forecast(user_id: UUID) -> list[dict]:
+    key = str(user_id)
+    cached = _forecasts.get(key)
+    if cached is not None:
+        return cached
+
+    generation = _generations.get(key, 0)
+    stock, schedules = await asyncio.gather(
+        run_query(supabase.table("user_medication_stock").select(STOCK_COLUMNS).eq("user_id", str(user_id))),
+        run_query(
+            supabase.table("user_medication_schedule")
+            .select(SCHEDULE_COLUMNS)
+            .eq("user_id", str(user_id))
+            .is_("deleted_at", "null")
+        ),
+    )
+    forecasts = forecast_stock(stock.data, schedules.data, date.today())
+    if _generations.get(key, 0) == generation:
+        _forecasts.set(key, forecasts)
+    return forecasts
+
+
+def prime_forecasts(forecasts_by_user: dict[str, list[dict]], generation: int) -> int:
+    """
+    Cache forecasts computed in bulk, for users with no cached forecast who were not
+    invalidated after `generation` (from forecast_generation()). Returns how many were cached.
+    """
+    primed = 0
+    for user_id, forecasts in forecasts_by_user.items():
+        if user_id not in _forecasts and _generations.get(user_id, 0) < generation:
+            _forecasts.set(user_id, forecasts)
+            primed += 1
+    return primed
@@ -0,0 +1,181 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+# Times are int64 microseconds since the Unix epoch (UTC) so a whole batch of
+# schedules can be expanded with array arithmetic instead of per-dose datetimes.
+US_PER_HOUR = 3_600_000_000
+US_PER_DAY = 24 * US_PER_HOUR
+_NO_END = np.iinfo(np.int64).max // 2
+
+PENDING, TAKEN, MISSED = 0, 1, 2
+STATUS_NAMES = ("pending", "taken", "missed")
+
+
+def parse_timestamp(value) -> datetime:
+    moment = datetime.fromisoformat(value) if isinstance(value, str) else value
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment
+
+
+def to_us(moment: datetime) -> int:
+    moment = parse_timestamp(moment)
+    return (moment - datetime(1970, 1, 1, tzinfo=timezone.utc)) // timedelta(microseconds=1)
+
+
+def from_us(us: int) -> datetime:
+    return datetime(1970, 1, 1, tzinfo=timezone.utc) + timedelta(microseconds=int(us))
+
+
+def _utc_text(value) -> str:
+    if isinstance(value, str) and value.endswith("Z"):
+        return value[:-1]
+    return parse_timestamp(value).astimezone(timezone.utc).replace(tzinfo=None).isoformat()
+
+
+def timestamps_us(values) -> np.ndarray:
+    """
+    ISO 8601 timestamps (as PostgREST returns timestamptz) to epoch microseconds.
+
+    UTC values, which is all PostgREST sends, are parsed by numpy in one call; anything
+    else is normalised row by row first. Naive values are taken to be UTC.
+    """
+    text = [
+        value[:-6] if isinstance(value, str) and value.endswith("+00:00") else _utc_text(value)
+        for value in values
+    ]
+    return np.array(text, dtype="datetime64[us]").astype(np.int64)
+
+
+def dates_us(values) -> np.ndarray:
+    """ISO dates to epoch microseconds of their midnight (UTC)."""
+    return np.array(values, dtype="datetime64[D]").astype("datetime64[us]").astype(np.int64)
+
+
+def dose_interval_us(schedule: dict) -> int:
+    """Spacing between consecutive doses: interval_hours if set, else the day split evenly."""
+    if schedule.get("interval_hours"):
+        return int(schedule["interval_hours"]) * US_PER_HOUR
+    return US_PER_DAY // max(1, int(schedule.get("frequency_per_day") or 1))
+
+
+def dose_interval(schedule: dict) -> timedelta:
+    return timedelta(microseconds=dose_interval_us(schedule))
+
+
+class ScheduleSet:
+    """
+    A batch of schedule rows as parallel arrays.
+
+    Each schedule is an arithmetic series of dose slots: anchor + k * interval, where the
+    anchor is next_dose_at (or midnight of start_date) and k is any integer that keeps the
+    slot inside [start_date, end_date]. Advancing next_dose_at by one interval when a dose
+    is logged shifts k but leaves the series itself unchanged.
+    """
+
+    def __init__(self, schedules: list[dict]):
+        self.schedules = schedules
+        n = len(schedules)
+        self.ids = np.fromiter((s["schedule_id"] for s in schedules), dtype=np.int64, count=n)
+        self.interval = np.fromiter((dose_interval_us(s) for s in schedules), dtype=np.int64, count=n)
+        self.first = dates_us([s["start_date"] for s in schedules])
+
+        ends = [s.get("end_date") for s in schedules]
+        has_end = np.array([end is not None for end in ends], dtype=bool)
+        self.last = np.full(n, _NO_END, dtype=np.int64)
+        self.last[has_end] = dates_us([end for end in ends if end is not None]) + US_PER_DAY
+
+        anchors = [s.get("next_dose_at") for s in schedules]
+        has_anchor = np.array([anchor is not None for anchor in anchors], dtype=bool)
+        self.anchor = self.first.copy()
+        self.anchor[has_anchor] = timestamps_us([anchor for anchor in anchors if anchor is not None])
+
+    def __len__(self) -> int:
+        return len(self.schedules)
+
+    def expand(self, start: datetime, end: datetime) -> "Occurrences":
+        """Every dose slot of every schedule in [start, end)."""
+        lo = np.maximum(self.first, to_us(start))
+        hi = np.minimum(self.last, to_us(end))
+        # First and one-past-last k with lo <= anchor + k * interval < hi (ceil via negated floor).
+        k_first = -((self.anchor - lo) // self.interval)
+        k_end = -((self.anchor - hi) // self.interval)
+        counts = np.maximum(k_end - k_first, 0)
+        return Occurrences(self, k_first, counts)
+
+    def slot_counts(self, edges_us: np.ndarray) -> np.ndarray:
+        """
+        Number of dose slots of each schedule between consecutive edges, without
+        expanding them: a (schedules, len(edges) - 1) matrix.
+        """
+        clipped = np.clip(edges_us[None, :], self.first[:, None], self.last[:, None])
+        k = -((self.anchor[:, None] - clipped) // self.interval[:, None])
+        return np.diff(k, axis=1)
+
+
+class Occurrences:
+    """Dose slots of a ScheduleSet within one window, grouped by schedule."""
+
+    def __init__(self, schedule_set: ScheduleSet, k_first: np.ndarray, counts: np.ndarray):
+        self.schedule_set = schedule_set
+        self.k_first = k_first
+        self.counts = counts
+        self.offsets = np.cumsum(counts) - counts
+
+        total = int(counts.sum())
+        self.position = np.repeat(np.arange(len(counts)), counts)
+        k = k_first[self.position] + (np.arange(total) - self.offsets[self.position])
+        self.at = schedule_set.anchor[self.position] + k * schedule_set.interval[self.position]
+        self.status = np.full(total, PENDING, dtype=np.int8)
+        self.log_index = np.full(total, -1, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.at)
+
+    def match_logs(self, logs: list[dict]) -> None:
+        """
+        Attach intake logs to the slot nearest their taken_at, within half an interval.
+
+        When several logs land on one slot the latest wins. Logs whose nearest slot falls
+        outside the window or the schedule's date range are ignored.
+        """
+        if not logs or not len(self):
+            return
+
+        schedule_set = self.schedule_set
+        order = np.argsort(schedule_set.ids, kind="stable")
+        sorted_ids = schedule_set.ids[order]
+
+        log_ids = np.fromiter((log["schedule_id"] for log in logs), dtype=np.int64, count=len(logs))
+        log_at = timestamps_us([log["taken_at"] for log in logs])
+        found = np.searchsorted(sorted_ids, log_ids)
+        found = np.minimum(found, len(sorted_ids) - 1)
+        known = sorted_ids[found] == log_ids
+        position = order[found]
+
+        interval = schedule_set.interval[position]
+        k = (log_at - schedule_set.anchor[position] + interval // 2) // interval
+        slot = k - self.k_first[position]
+        valid = known & (slot >= 0) & (slot < self.counts[position])
+
+        log_numbers = np.nonzero(valid)[0]
+        slot_index = self.offsets[position[valid]] + slot[valid]
+        # Apply oldest first so the latest log is the one left on a shared slot.
+        by_time = np.argsort(log_at[valid], kind="stable")
+        slot_index, log_numbers = slot_index[by_time], log_numbers[by_time]
+
+        missed = np.fromiter((bool(log["was_missed"]) for log in logs), dtype=bool, count=len(logs))
+        self.log_index[slot_index] = log_numbers
+        self.status[slot_index] = np.where(missed[log_numbers], MISSED, TAKEN)
+
+    def timestamps(self) -> np.ndarray:
+        """Slot times as ISO 8601 UTC strings."""
+        return np.datetime_as_string(self.at.astype("datetime64[us]"), unit="s", timezone="UTC")
+
+    def in_time_order(self) -> np.ndarray:
+        """Indices of the slots sorted by time, then by schedule."""
+        return np.lexsort((self.position, self.at))
+
+    def overdue(self, now: datetime) -> np.ndarray:
+        return (self.status == PENDING) & (self.at < to_us(now))
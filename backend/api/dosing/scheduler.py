@@ -0,0 +1,116 @@
+import heapq
+from typing import Iterable, NamedTuple
+
+
+class DueDose(NamedTuple):
+    schedule_id: int
+    due_us: int
+
+
+class DoseQueue:
+    """
+    Min-heap of one fire time per schedule, with lazy deletion.
+
+    Re-scheduling or removing a schedule only updates the `_fire_at` index; the stale
+    heap entry is skipped when it surfaces. The heap is rebuilt from the index once
+    stale entries outnumber live ones, so memory stays proportional to the schedules.
+    """
+
+    def __init__(self):
+        self._heap: list[tuple[int, int]] = []
+        self._fire_at: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._fire_at)
+
+    def __contains__(self, schedule_id: int) -> bool:
+        return schedule_id in self._fire_at
+
+    def replace(self, items: Iterable[tuple[int, int]]) -> None:
+        """Swap the whole queue for (schedule_id, fire_at) pairs in O(n)."""
+        self._fire_at = dict(items)
+        self._heap = [(fire_at, schedule_id) for schedule_id, fire_at in self._fire_at.items()]
+        heapq.heapify(self._heap)
+
+    def upsert(self, schedule_id: int, fire_at: int) -> None:
+        if self._fire_at.get(schedule_id) == fire_at:
+            return
+        self._fire_at[schedule_id] = fire_at
+        heapq.heappush(self._heap, (fire_at, schedule_id))
+        if len(self._heap) > 2 * len(self._fire_at) + 1024:
+            self.replace(self._fire_at.items())
+
+    def remove(self, schedule_id: int) -> None:
+        self._fire_at.pop(schedule_id, None)
+
+    def pop_due(self, now_us: int, limit: int) -> list[int]:
+        """Remove and return up to `limit` schedules whose fire time is at or before now."""
+        fired = []
+        heap, fire_at = self._heap, self._fire_at
+        while heap and heap[0][0] <= now_us and len(fired) < limit:
+            when, schedule_id = heapq.heappop(heap)
+            if fire_at.get(schedule_id) == when:
+                del fire_at[schedule_id]
+                fired.append(schedule_id)
+        return fired
+
+
+class DoseScheduler:
+    """
+    Tracks each active schedule's next dose and reports what has come due.
+
+    A dose first comes due for a reminder at next_dose_at, then, if it is still tracked
+    `grace_us` later (nothing logged it and advanced the schedule), as missed. The
+    scheduler does no I/O: callers feed it schedule changes and act on what
+    `advance` returns.
+    """
+
+    def __init__(self, grace_us: int):
+        self.grace_us = grace_us
+        self._due: dict[int, int] = {}
+        self._reminders = DoseQueue()
+        self._missed = DoseQueue()
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def load(self, schedules: Iterable[tuple[int, int]], now_us: int) -> None:
+        """Replace all state with (schedule_id, due_us) pairs."""
+        self._due = dict(schedules)
+        self._reminders.replace((sid, due) for sid, due in self._due.items() if due > now_us)
+        self._missed.replace((sid, due + self.grace_us) for sid, due in self._due.items() if due <= now_us)
+
+    def track(self, schedule_id: int, due_us: int | None) -> None:
+        """Record a schedule's new next dose; None stops tracking it."""
+        if due_us is None:
+            self.untrack(schedule_id)
+            return
+        if self._due.get(schedule_id) == due_us:
+            return
+        self._due[schedule_id] = due_us
+        self._missed.remove(schedule_id)
+        self._reminders.upsert(schedule_id, due_us)
+
+    def untrack(self, schedule_id: int) -> None:
+        self._due.pop(schedule_id, None)
+        self._reminders.remove(schedule_id)
+        self._missed.remove(schedule_id)
+
+    def advance(self, now_us: int, limit: int = 10_000) -> tuple[list[DueDose], list[DueDose]]:
+        """
+        Move the clock to `now_us`; returns (reminders, missed) that came due.
+
+        Missed doses stop being tracked until the caller reports the schedule's next
+        dose with `track`.
+        """
+        reminders = []
+        for schedule_id in self._reminders.pop_due(now_us, limit):
+            due = self._due[schedule_id]
+            self._missed.upsert(schedule_id, due + self.grace_us)
+            if due + self.grace_us > now_us:
+                reminders.append(DueDose(schedule_id, due))
+
+        missed = []
+        for schedule_id in self._missed.pop_due(now_us, limit):
+            missed.append(DueDose(schedule_id, self._due.pop(schedule_id)))
+        return reminders, missed
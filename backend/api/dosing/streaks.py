@@ -0,0 +1,49 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+
+def decode_bitmap(value: str | bytes) -> np.ndarray:
+    """
+    A user_supplement_history.taken bytea (PostgREST sends it as "\\x..." hex) as one
+    bool per day, in Postgres get_bit order.
+    """
+    raw = bytes.fromhex(value[2:]) if isinstance(value, str) else value
+    return np.unpackbits(np.frombuffer(raw, dtype=np.uint8), bitorder="little").astype(bool)
+
+
+class TakenDays:
+    """One supplement's taken-day bitmap: bit i is origin + i days."""
+
+    def __init__(self, origin: date, bits: np.ndarray):
+        self.origin = origin
+        self.bits = bits
+
+    @classmethod
+    def from_row(cls, row: dict) -> "TakenDays":
+        return cls(date.fromisoformat(row["origin"]), decode_bitmap(row["taken"]))
+
+    def _index(self, day: date) -> int:
+        return (day - self.origin).days
+
+    def between(self, start: date, end: date) -> list[date]:
+        """Taken days in [start, end]."""
+        lo = max(self._index(start), 0)
+        hi = min(self._index(end) + 1, len(self.bits))
+        if lo >= hi:
+            return []
+        return [self.origin + timedelta(days=int(i)) for i in lo + np.flatnonzero(self.bits[lo:hi])]
+
+    def current_streak(self, today: date) -> int:
+        """
+        Consecutive taken days up to today, or up to yesterday while today is not yet
+        taken, so a streak only breaks once a whole day passes without a dose.
+        """
+        bits = self.bits
+        last = self._index(today)
+        if not 0 <= last < len(bits) or not bits[last]:
+            last -= 1
+        if not 0 <= last < len(bits) or not bits[last]:
+            return 0
+        gaps = np.flatnonzero(~bits[:last + 1])
+        return int(last - gaps[-1]) if len(gaps) else last + 1
@@ -0,0 +1,39 @@
+import asyncio
+import os
+import socket
+import traceback
+import uuid
+from typing import Awaitable, Callable
+
+from api.db.supabase import supabase, run_query
+
+# Background jobs are off in the test environment so fixture TestClients (each of which
+# runs the app lifespan) never start them. DISABLE_BACKGROUND_JOBS=1 turns them off
+# elsewhere, e.g. on hosts that should only serve requests.
+JOBS_ENABLED = os.getenv("ENVIRONMENT") != "test" and os.getenv("DISABLE_BACKGROUND_JOBS") != "1"
+
+# Identifies this worker process in job_leases.
+JOB_HOLDER = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+async def claim_lease(job: str, ttl_seconds: int) -> bool:
+    """
+    Take or renew this worker's lease on `job` (migration 0010). True while this worker
+    holds it; every worker calls it each pass, and only the holder should do the work.
+    """
+    result = await run_query(supabase.rpc("claim_job_lease", {
+        "p_job": job,
+        "p_holder": JOB_HOLDER,
+        "p_ttl_seconds": ttl_seconds,
+    }))
+    return result.data is True
+
+
+async def run_periodically(job: Callable[[], Awaitable[object]], interval_seconds: float) -> None:
+    """Run `job` every `interval_seconds` until cancelled; a failed run never stops the loop."""
+    while True:
+        try:
+            await job()
+        except Exception:
+            traceback.print_exc()
+        await asyncio.sleep(interval_seconds)
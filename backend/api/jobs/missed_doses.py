@@ -0,0 +1,167 @@
+import logging
+import os
+import time
+from datetime import datetime, timezone
+
+from api import metrics
+from api.db.supabase import supabase, run_query
+from api.dosing.occurrences import from_us, to_us
+from api.dosing.scheduler import DoseScheduler
+from api.jobs import claim_lease
+
+logger = logging.getLogger(__name__)
+
+# How often due doses are checked, and how often the whole schedule table is re-read
+# to pick up changes made through other workers.
+DOSE_CHECK_INTERVAL_SECONDS = int(os.getenv("DOSE_CHECK_INTERVAL_SECONDS", "30"))
+DOSE_RELOAD_INTERVAL_SECONDS = int(os.getenv("DOSE_RELOAD_INTERVAL_SECONDS", "900"))
+# Only the worker holding the "dose_scheduler" lease tracks schedules and runs passes;
+# if it stops renewing, another worker takes over (after a full reload) once this lapses.
+DOSE_SCHEDULER_LEASE_SECONDS = int(os.getenv("DOSE_SCHEDULER_LEASE_SECONDS", str(DOSE_CHECK_INTERVAL_SECONDS * 4)))
+# A dose still unlogged this long after next_dose_at is recorded as missed.
+MISSED_DOSE_GRACE_MINUTES = int(os.getenv("MISSED_DOSE_GRACE_MINUTES", "120"))
+MISSED_DOSE_BATCH_SIZE = int(os.getenv("MISSED_DOSE_BATCH_SIZE", "500"))
+SCHEDULE_LOAD_PAGE_SIZE = 1000
+
+dose_scheduler = DoseScheduler(grace_us=MISSED_DOSE_GRACE_MINUTES * 60 * 1_000_000)
+
+_next_reload = 0.0
+_leading = False
+_totals = {"reloads": 0, "reminders": 0, "missed_recorded": 0, "missed_batches": 0}
+_last_reload: dict = {}
+metrics.register("dose_scheduler", lambda: {
+    "leading": _leading,
+    "tracked": len(dose_scheduler),
+    **_totals,
+    "last_reload": dict(_last_reload),
+})
+
+
+def track_schedule(schedule: dict) -> None:
+    """
+    Feed a created, updated or logged schedule row to the scheduler, if this worker runs
+    it. Changes served by other workers reach it through reloads, and due reminders are
+    re-checked against the table before they go out.
+    """
+    if _leading:
+        _track(schedule)
+
+
+def _track(schedule: dict) -> None:
+    next_dose_at = schedule.get("next_dose_at")
+    if schedule.get("deleted_at") or not next_dose_at:
+        dose_scheduler.untrack(schedule["schedule_id"])
+    else:
+        dose_scheduler.track(schedule["schedule_id"], to_us(next_dose_at))
+
+
+async def reload_schedules() -> int:
+    """Re-read next_dose_at of every active schedule, keyset-paged by schedule_id."""
+    started = time.perf_counter()
+    loaded = []
+    last_id = 0
+    while True:
+        rows = (await run_query(
+            supabase.table("user_medication_schedule")
+            .select("schedule_id, next_dose_at")
+            .is_("deleted_at", "null")
+            .not_.is_("next_dose_at", "null")
+            .gt("schedule_id", last_id)
+            .order("schedule_id")
+            .limit(SCHEDULE_LOAD_PAGE_SIZE)
+        )).data
+        loaded.extend((row["schedule_id"], to_us(row["next_dose_at"])) for row in rows)
+        if len(rows) < SCHEDULE_LOAD_PAGE_SIZE:
+            break
+        last_id = rows[-1]["schedule_id"]
+
+    dose_scheduler.load(loaded, to_us(datetime.now(timezone.utc)))
+    _totals["reloads"] += 1
+    _last_reload.update({
+        "finished_at": datetime.now(timezone.utc).isoformat(),
+        "schedules": len(loaded),
+        "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+    })
+    return len(loaded)
+
+
+async def _still_due(reminders: list) -> list:
+    """
+    The reminders whose schedule still has that next_dose_at. Others were logged, edited
+    or deleted through another worker since the last reload, and are re-tracked instead.
+    """
+    current = {}
+    for start in range(0, len(reminders), MISSED_DOSE_BATCH_SIZE):
+        ids = [dose.schedule_id for dose in reminders[start:start + MISSED_DOSE_BATCH_SIZE]]
+        rows = (await run_query(
+            supabase.table("user_medication_schedule")
+            .select("schedule_id, next_dose_at")
+            .in_("schedule_id", ids)
+            .is_("deleted_at", "null")
+        )).data
+        current.update((row["schedule_id"], row["next_dose_at"]) for row in rows)
+
+    due = []
+    for dose in reminders:
+        next_dose_at = current.get(dose.schedule_id)
+        if next_dose_at and to_us(next_dose_at) == dose.due_us:
+            due.append(dose)
+        else:
+            _track({"schedule_id": dose.schedule_id, "next_dose_at": next_dose_at})
+    return due
+
+
+async def check_due_doses() -> dict:
+    """Emit reminders for doses now due and record overdue ones as missed, in batches."""
+    reminders, missed = dose_scheduler.advance(to_us(datetime.now(timezone.utc)))
+    if reminders:
+        reminders = await _still_due(reminders)
+
+    # Reminders are logged for now; push/email delivery hooks in here.
+    for dose in reminders:
+        logger.info("dose due: schedule %d at %s", dose.schedule_id, from_us(dose.due_us).isoformat())
+    _totals["reminders"] += len(reminders)
+
+    recorded = 0
+    for start in range(0, len(missed), MISSED_DOSE_BATCH_SIZE):
+        batch = missed[start:start + MISSED_DOSE_BATCH_SIZE]
+        rows = (await run_query(supabase.rpc("record_missed_doses", {
+            "p_schedule_ids": [dose.schedule_id for dose in batch],
+            "p_due_at": [from_us(dose.due_us).isoformat() for dose in batch],
+        }))).data
+        for row in rows:
+            _track(row)
+            recorded += row["missed"]
+        _totals["missed_batches"] += 1
+
+    _totals["missed_recorded"] += recorded
+    if recorded:
+        logger.info("recorded %d missed doses", recorded)
+    return {"reminders": len(reminders), "missed": recorded}
+
+
+async def run_dose_scheduler() -> dict:
+    """
+    One scheduler pass, run by the lease holder only: re-read all schedules when a reload
+    is due, then check due doses. Other workers keep no schedule state.
+    """
+    global _next_reload, _leading
+    if not await claim_lease("dose_scheduler", DOSE_SCHEDULER_LEASE_SECONDS):
+        if _leading:
+            dose_scheduler.load([], 0)
+        _leading = False
+        return {"leading": False}
+    if not _leading:
+        # Newly elected: start from a full reload rather than whatever this worker saw.
+        _leading = True
+        _next_reload = 0.0
+
+    if time.monotonic() >= _next_reload:
+        await reload_schedules()
+        _next_reload = time.monotonic() + DOSE_RELOAD_INTERVAL_SECONDS
+    try:
+        return await check_due_doses()
+    except Exception:
+        # Doses popped for a failed batch are no longer tracked; the next pass reloads them.
+        _next_reload = 0.0
+        raise
@@ -0,0 +1,49 @@
+import logging
+import os
+import time
+from datetime import datetime, timezone
+
+from api import metrics
+from api.db.supabase import supabase, run_query
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PURGE_INTERVAL_SECONDS = int(os.getenv("TOKEN_PURGE_INTERVAL_SECONDS", "3600"))
+TOKEN_PURGE_BATCH_SIZE = int(os.getenv("TOKEN_PURGE_BATCH_SIZE", "1000"))
+MAX_SESSIONS_PER_USER = int(os.getenv("MAX_SESSIONS_PER_USER", "10"))
+
+_last_run: dict = {}
+_totals = {"runs": 0, "expired": 0, "over_cap": 0}
+metrics.register("refresh_token_purge", lambda: {**_totals, "last_run": dict(_last_run)})
+
+
+async def purge_refresh_tokens() -> dict:
+    """Delete expired and over-cap refresh tokens in batches; returns this run's counts."""
+    started = time.perf_counter()
+    expired = over_cap = batches = 0
+
+    while True:
+        result = await run_query(supabase.rpc("purge_refresh_tokens", {
+            "p_max_sessions": MAX_SESSIONS_PER_USER,
+            "p_batch_size": TOKEN_PURGE_BATCH_SIZE,
+        }))
+        row = result.data[0]
+        expired += row["expired"]
+        over_cap += row["over_cap"]
+        batches += 1
+
+        if row["expired"] < TOKEN_PURGE_BATCH_SIZE and row["over_cap"] < TOKEN_PURGE_BATCH_SIZE:
+            break
+
+    _last_run.update({
+        "finished_at": datetime.now(timezone.utc).isoformat(),
+        "expired": expired,
+        "over_cap": over_cap,
+        "batches": batches,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+    })
+    _totals["runs"] += 1
+    _totals["expired"] += expired
+    _totals["over_cap"] += over_cap
+    logger.info("refresh token purge reclaimed %d expired and %d over-cap rows in %d batches", expired, over_cap, batches)
+    return dict(_last_run)
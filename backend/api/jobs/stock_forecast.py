@@ -0,0 +1,65 @@
+import logging
+import os
+import time
+from collections import defaultdict
+from datetime import date, datetime, timezone
+
+from api import metrics
+from api.db.supabase import supabase, run_query
+from api.dosing.forecast import STOCK_COLUMNS, SCHEDULE_COLUMNS, forecast_stock, forecast_generation, prime_forecasts
+
+logger = logging.getLogger(__name__)
+
+STOCK_FORECAST_INTERVAL_SECONDS = int(os.getenv("STOCK_FORECAST_INTERVAL_SECONDS", "3600"))
+FORECAST_LOAD_PAGE_SIZE = 1000
+
+_last_run: dict = {}
+_totals = {"runs": 0}
+metrics.register("stock_forecast", lambda: {**_totals, "last_run": dict(_last_run)})
+
+
+async def _load_all(table: str, columns: str, id_column: str, active_only: bool = False) -> list[dict]:
+    """Read a whole table keyset-paged by its id column."""
+    rows = []
+    last_id = 0
+    while True:
+        query = supabase.table(table).select(columns).gt(id_column, last_id)
+        if active_only:
+            query = query.is_("deleted_at", "null")
+        page = (await run_query(query.order(id_column).limit(FORECAST_LOAD_PAGE_SIZE))).data
+        rows.extend(page)
+        if len(page) < FORECAST_LOAD_PAGE_SIZE:
+            return rows
+        last_id = page[-1][id_column]
+
+
+async def refresh_stock_forecasts() -> dict:
+    """
+    Forecast every user's stock in one pass and prime the per-user forecast cache for
+    users it has no entry for; anyone invalidated during the pass is left to load lazily.
+    """
+    started = time.perf_counter()
+    generation = forecast_generation()
+    stock = await _load_all("user_medication_stock", STOCK_COLUMNS, "stock_id")
+    schedules = await _load_all(
+        "user_medication_schedule", f"schedule_id, {SCHEDULE_COLUMNS}", "schedule_id", active_only=True
+    )
+
+    by_user = defaultdict(list)
+    low = 0
+    for row, forecast in zip(stock, forecast_stock(stock, schedules, date.today())):
+        by_user[row["user_id"]].append(forecast)
+        low += forecast["is_low"]
+    primed = prime_forecasts(by_user, generation)
+
+    _last_run.update({
+        "finished_at": datetime.now(timezone.utc).isoformat(),
+        "users": len(by_user),
+        "primed": primed,
+        "stock": len(stock),
+        "low_stock": low,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+    })
+    _totals["runs"] += 1
+    logger.info("forecast %d stock rows for %d users, %d running low", len(stock), len(by_user), low)
+    return dict(_last_run)
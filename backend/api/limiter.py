@@ -1,9 +1,83 @@
 import os
+import threading
+import time
+from collections import defaultdict
 
+from limits import parse
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
+from api import metrics
+
+# Counters must live outside the worker process, otherwise every uvicorn worker
+# enforces its own copy of each limit. Use redis://host:6379 across hosts, or
+# shm:///dev/shm/medilabel-ratelimit for the workers of a single host.
+RATE_LIMIT_STORAGE_URI = os.getenv("RATE_LIMIT_STORAGE_URI", "memory://")
+
+if RATE_LIMIT_STORAGE_URI.startswith("shm://"):
+    # Registers the shm:// storage scheme. It needs fcntl, so it is POSIX only and
+    # only imported when asked for; memory:// and redis:// work everywhere.
+    import api.limiter_storage  # noqa: F401
+
+# The sliding window counter keeps two counters per key (O(1) memory and one round
+# trip per hit) instead of a timestamp per request like the moving window.
+RATE_LIMIT_STRATEGY = os.getenv("RATE_LIMIT_STRATEGY", "sliding-window-counter")
+
+
+class TimedLimiter(Limiter):
+    """Limiter that records how long the limit check takes for each route."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._timings_lock = threading.Lock()
+        self._timings: dict[str, dict] = defaultdict(lambda: {"count": 0, "total_us": 0.0, "max_us": 0.0})
+
+    def _check_request_limit(self, request, endpoint_func, in_middleware: bool = True) -> None:
+        start = time.perf_counter()
+        try:
+            super()._check_request_limit(request, endpoint_func, in_middleware)
+        finally:
+            elapsed_us = (time.perf_counter() - start) * 1_000_000
+            route = request.scope.get("route")
+            name = route.path if route is not None else request.url.path
+            with self._timings_lock:
+                timing = self._timings[name]
+                timing["count"] += 1
+                timing["total_us"] += elapsed_us
+                timing["max_us"] = max(timing["max_us"], elapsed_us)
+
+    def hit(self, limit: str, scope: str, request) -> bool:
+        """
+        Count one request from this client against `limit` under `scope`, for a limit on
+        one branch of a route rather than the whole route. False once it is exhausted.
+        """
+        if not self.enabled:
+            return True
+        return self.limiter.hit(parse(limit), scope, self._key_func(request))
+
+    def overhead(self) -> dict:
+        with self._timings_lock:
+            routes = {
+                name: {
+                    "count": timing["count"],
+                    "mean_us": round(timing["total_us"] / timing["count"], 1),
+                    "max_us": round(timing["max_us"], 1),
+                }
+                for name, timing in self._timings.items()
+            }
+        return {"storage": RATE_LIMIT_STORAGE_URI.split(":", 1)[0], "strategy": RATE_LIMIT_STRATEGY, "routes": routes}
+
+
 # Rate limiting is disabled in the test environment so fixture user creation
 # (signup × N per test run) never hits the 3/minute signup cap.
 _enabled = os.getenv("ENVIRONMENT") != "test"
-limiter = Limiter(key_func=get_remote_address, enabled=_enabled)
\ No newline at end of file
+limiter = TimedLimiter(
+    key_func=get_remote_address,
+    enabled=_enabled,
+    storage_uri=RATE_LIMIT_STORAGE_URI,
+    strategy=RATE_LIMIT_STRATEGY,
+    # If the shared store goes away, limit per worker rather than failing requests.
+    in_memory_fallback_enabled=RATE_LIMIT_STORAGE_URI != "memory://",
+)
+
+metrics.register("rate_limiter", limiter.overhead)
@@ -0,0 +1,197 @@
+import fcntl
+import hashlib
+import math
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import parse_qs, urlparse
+
+from limits.storage import SlidingWindowCounterSupport, Storage
+
+# One fixed-size slot per rate limit key:
+#   key hash (u64) | anchor (f64) | current count (u32) | previous count (u32) | expiry (u32) | stale at (u32)
+# For the sliding window counter the anchor is the index of the current window, so a key
+# costs the same 32 bytes however many hits it receives. Plain counters (fixed window)
+# use the anchor as their expiry timestamp. Either way "stale at" is the epoch second
+# after which the slot no longer affects any limit, so eviction compares like with like.
+_SLOT = struct.Struct("<QdIIII")
+_PROBES = 8
+
+
+class SharedMemoryStorage(Storage, SlidingWindowCounterSupport):
+    """
+    Rate limit storage in a memory-mapped file shared by every worker on one host.
+
+        shm:///dev/shm/medilabel-ratelimit?slots=65536
+
+    The table has a fixed number of slots (open addressing, short linear probe); when a
+    probe run is full a stale slot is recycled, or else the one that goes stale soonest. An fcntl lock on the
+    file serialises access across processes, and a thread lock across threads.
+    """
+
+    STORAGE_SCHEME = ["shm"]
+
+    def __init__(self, uri: str | None = None, wrap_exceptions: bool = False, **options):
+        parsed = urlparse(uri or "shm://")
+        self.path = parsed.path or os.path.join(tempfile.gettempdir(), "medilabel-ratelimit")
+        self.slots = int(parse_qs(parsed.query).get("slots", ["65536"])[0])
+        size = self.slots * _SLOT.size
+
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        with self._file_lock():
+            if os.fstat(self._fd).st_size < size:
+                os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+        self._thread_lock = threading.Lock()
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+    @property
+    def base_exceptions(self) -> type[Exception] | tuple[type[Exception], ...]:
+        return OSError
+
+    # ------------------------------------------------------------------
+    # Slot table
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def _file_lock(self):
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    @contextmanager
+    def _locked(self):
+        with self._thread_lock, self._file_lock():
+            yield
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little") or 1
+
+    def _read(self, index: int) -> tuple[int, float, int, int, int]:
+        return _SLOT.unpack_from(self._map, index * _SLOT.size)[:5]
+
+    def _write(
+        self, index: int, key_hash: int, anchor: float, current: int, previous: int, expiry: int, stale_at: float
+    ) -> None:
+        _SLOT.pack_into(
+            self._map, index * _SLOT.size, key_hash, anchor, current, previous, expiry, math.ceil(stale_at)
+        )
+
+    def _find(self, key_hash: int, create: bool) -> int | None:
+        start = key_hash % self.slots
+        free = soonest = None
+        soonest_stale_at = math.inf
+        now = time.time()
+        for probe in range(_PROBES):
+            index = (start + probe) % self.slots
+            slot_hash, *_, stale_at = _SLOT.unpack_from(self._map, index * _SLOT.size)
+            if slot_hash == key_hash:
+                return index
+            if slot_hash == 0 or stale_at <= now:
+                free = index if free is None else free
+            elif stale_at < soonest_stale_at:
+                soonest, soonest_stale_at = index, stale_at
+
+        if not create:
+            return None
+        index = free if free is not None else soonest
+        self._write(index, key_hash, 0.0, 0, 0, 0, 0)
+        return index
+
+    # ------------------------------------------------------------------
+    # Fixed window counters
+    # ------------------------------------------------------------------
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        key_hash, now = self._hash(key), time.time()
+        with self._locked():
+            index = self._find(key_hash, create=True)
+            _, expires_at, count, _, _ = self._read(index)
+            if expires_at <= now:
+                count, expires_at = 0, now + expiry
+            count += amount
+            self._write(index, key_hash, expires_at, count, 0, expiry, expires_at)
+            return count
+
+    def get(self, key: str) -> int:
+        with self._locked():
+            index = self._find(self._hash(key), create=False)
+            if index is None:
+                return 0
+            _, expires_at, count, _, _ = self._read(index)
+            return count if expires_at > time.time() else 0
+
+    def get_expiry(self, key: str) -> float:
+        with self._locked():
+            index = self._find(self._hash(key), create=False)
+            return self._read(index)[1] if index is not None else time.time()
+
+    def check(self) -> bool:
+        return not self._map.closed
+
+    def reset(self) -> int | None:
+        with self._locked():
+            used = sum(1 for index in range(self.slots) if self._read(index)[0])
+            self._map[:] = bytes(len(self._map))
+            return used
+
+    def clear(self, key: str) -> None:
+        with self._locked():
+            index = self._find(self._hash(key), create=False)
+            if index is not None:
+                self._write(index, 0, 0.0, 0, 0, 0, 0)
+
+    # ------------------------------------------------------------------
+    # Sliding window counter
+    # ------------------------------------------------------------------
+
+    def _roll(self, index: int, expiry: int, now: float) -> tuple[int, int, int]:
+        """Shift the slot's counters to the window containing `now`; returns (window, current, previous)."""
+        _, anchor, current, previous, slot_expiry = self._read(index)
+        window = math.floor(now / expiry)
+        if slot_expiry != expiry or anchor < window - 1:
+            return window, 0, 0
+        if anchor == window - 1:
+            return window, 0, current
+        return window, current, previous
+
+    def _window_info(self, window: int, current: int, previous: int, expiry: int, now: float):
+        elapsed = now / expiry - window
+        previous_ttl = (1 - elapsed) * expiry if previous else 0.0
+        current_ttl = (1 - elapsed) * expiry + expiry
+        return previous, previous_ttl, current, current_ttl
+
+    def acquire_sliding_window_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+        key_hash, now = self._hash(key), time.time()
+        with self._locked():
+            index = self._find(key_hash, create=True)
+            window, current, previous = self._roll(index, expiry, now)
+            _, previous_ttl, _, _ = self._window_info(window, current, previous, expiry, now)
+            # The current window's count still weighs on the next window, then drops out.
+            stale_at = (window + 2) * expiry
+            if math.floor(previous * previous_ttl / expiry + current) + amount > limit:
+                self._write(index, key_hash, window, current, previous, expiry, stale_at)
+                return False
+            self._write(index, key_hash, window, current + amount, previous, expiry, stale_at)
+            return True
+
+    def get_sliding_window(self, key: str, expiry: int) -> tuple[int, float, int, float]:
+        now = time.time()
+        with self._locked():
+            index = self._find(self._hash(key), create=False)
+            if index is None:
+                return self._window_info(math.floor(now / expiry), 0, 0, expiry, now)
+            window, current, previous = self._roll(index, expiry, now)
+            return self._window_info(window, current, previous, expiry, now)
+
+    def clear_sliding_window(self, key: str, expiry: int) -> None:
+        self.clear(key)
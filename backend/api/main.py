@@ -1,8 +1,13 @@
+import asyncio
 import traceback
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from api.routers import auth, medical, workouts, routines, exercises, body_metrics, plans, supplements, schedules
+from api.routers import auth, medical, workouts, routines, exercises, body_metrics, plans, supplements, schedules, dashboard, metrics
+from api.medications.rxnav import rxnav
+from api.medications.rxnorm_index import load_rxnorm_index
+from api.medications.fuzzy import load_medication_index
 
 from postgrest.exceptions import APIError as PostgrestAPIError
 
@@ -11,7 +16,33 @@ from api.limiter import limiter
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 
-app = FastAPI()
+# background jobs
+from api.jobs import JOBS_ENABLED, run_periodically
+from api.jobs.refresh_token_purge import purge_refresh_tokens, TOKEN_PURGE_INTERVAL_SECONDS
+from api.jobs.missed_doses import run_dose_scheduler, DOSE_CHECK_INTERVAL_SECONDS
+from api.jobs.stock_forecast import refresh_stock_forecasts, STOCK_FORECAST_INTERVAL_SECONDS
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    await rxnav.start()
+    load_rxnorm_index()
+    # Built in the background so startup does not wait on the medications table.
+    jobs = [asyncio.create_task(load_medication_index())]
+    if JOBS_ENABLED:
+        jobs.append(asyncio.create_task(run_periodically(purge_refresh_tokens, TOKEN_PURGE_INTERVAL_SECONDS)))
+        jobs.append(asyncio.create_task(run_periodically(run_dose_scheduler, DOSE_CHECK_INTERVAL_SECONDS)))
+        jobs.append(asyncio.create_task(run_periodically(refresh_stock_forecasts, STOCK_FORECAST_INTERVAL_SECONDS)))
+
+    yield
+
+    for job in jobs:
+        job.cancel()
+    await asyncio.gather(*jobs, return_exceptions=True)
+    await rxnav.close()
+
+
+app = FastAPI(lifespan=lifespan)
 app.state.limiter = limiter
 
 SWAGGER_PATHS = {"/docs", "/redoc", "/openapi.json"}
@@ -61,6 +92,8 @@ app.include_router(body_metrics.router)
 app.include_router(plans.router)
 app.include_router(supplements.router)
 app.include_router(schedules.router)
+app.include_router(dashboard.router)
+app.include_router(metrics.router)
 
 @app.get("/")
 def root():
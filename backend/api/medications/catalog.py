@@ -0,0 +1,134 @@
+"""
+The medications catalogue: a process-wide cache of its rows, and write-back of RxNav
+lookups into it.
+
+Medication rows are never updated once inserted, so `medication_cache` keeps them by
+medication_id (and rxcui) for existence checks and id -> name joins, reading through
+to the table only for ids it has not seen. Rows this process inserts are put in
+directly.
+
+When search_medications misses the table it answers from RxNav, then hands what it
+fetched to `remember_rxnav_properties` as a background task (run after the response
+is sent). The rows are stored in one call, so the next search for the same term is
+answered locally.
+"""
+import logging
+import os
+
+from api import metrics
+from api.cache import TTLCache
+from api.db.supabase import supabase, run_query
+from api.medications.fuzzy import medication_index
+from api.medications.rxnorm_index import DEFAULT_TTYS
+
+logger = logging.getLogger(__name__)
+
+# medications.name column width, as enforced for add_medication.
+MAX_NAME_LENGTH = 255
+
+# Rows are immutable, so the TTL only lets a long-lived worker forget ids it no longer sees.
+MEDICATION_CACHE_TTL_SECONDS = float(os.getenv("MEDICATION_CACHE_TTL_SECONDS", "86400"))
+MEDICATION_CACHE_MAXSIZE = int(os.getenv("MEDICATION_CACHE_MAXSIZE", "20000"))
+
+
+class MedicationCache:
+    """
+    Read-through cache of medications rows. Unknown ids are not remembered, so a
+    medication inserted by another worker is found on the next lookup.
+    Returned rows are shared: do not modify them.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.by_id = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.by_rxcui = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def put(self, row: dict) -> None:
+        self.by_id.set(row["medication_id"], row)
+        self.by_rxcui.set(row["rxcui"], row)
+
+    def invalidate(self, row: dict) -> None:
+        self.by_id.invalidate(row["medication_id"])
+        self.by_rxcui.invalidate(row["rxcui"])
+
+    def clear(self) -> None:
+        self.by_id.clear()
+        self.by_rxcui.clear()
+
+    def stats(self) -> dict:
+        return {"by_id": self.by_id.stats(), "by_rxcui": self.by_rxcui.stats()}
+
+    async def _load(self, column: str, values: list) -> list[dict]:
+        rows = (await run_query(supabase.table("medications").select("*").in_(column, values))).data
+        for row in rows:
+            self.put(row)
+        return rows
+
+    async def get(self, medication_id: int) -> dict | None:
+        """The medications row, or None if it does not exist."""
+        return (await self.get_many([medication_id])).get(medication_id)
+
+    async def get_many(self, medication_ids) -> dict[int, dict]:
+        """medication_id -> row for the ids that exist, with one query for any not cached."""
+        found = {}
+        missing = []
+        for medication_id in dict.fromkeys(medication_ids):
+            row = self.by_id.get(medication_id)
+            if row is None:
+                missing.append(medication_id)
+            else:
+                found[medication_id] = row
+        if missing:
+            found.update((row["medication_id"], row) for row in await self._load("medication_id", missing))
+        return found
+
+    async def get_by_rxcui(self, rxcuis: list[str]) -> list[dict]:
+        """Rows for the rxcuis that exist, in the order given."""
+        found = {}
+        missing = []
+        for rxcui in dict.fromkeys(rxcuis):
+            row = self.by_rxcui.get(rxcui)
+            if row is None:
+                missing.append(rxcui)
+            else:
+                found[rxcui] = row
+        if missing:
+            found.update((row["rxcui"], row) for row in await self._load("rxcui", missing))
+        return [found[rxcui] for rxcui in dict.fromkeys(rxcuis) if rxcui in found]
+
+
+medication_cache = MedicationCache(maxsize=MEDICATION_CACHE_MAXSIZE, ttl=MEDICATION_CACHE_TTL_SECONDS)
+metrics.register("medication_cache", medication_cache.stats)
+
+_totals = {"batches": 0, "inserted": 0, "failures": 0}
+metrics.register("rxnav_writeback", lambda: dict(_totals))
+
+
+def medication_rows(properties: list[dict]) -> list[dict]:
+    """medications rows for the RxNav property lookups add_medication would also accept."""
+    rows = []
+    for body in properties:
+        found = body.get("properties") or {}
+        if found.get("tty") in DEFAULT_TTYS and found.get("name") and len(found["name"]) <= MAX_NAME_LENGTH:
+            rows.append({"rxcui": found["rxcui"], "name": found["name"], "is_brand": found["tty"] != "SCD"})
+    return rows
+
+
+async def remember_rxnav_properties(properties: list[dict]) -> None:
+    """Insert the medications in one RPC (skipping known ones) and index the new rows."""
+    rows = medication_rows(properties)
+    if not rows:
+        return
+    try:
+        inserted = (await run_query(supabase.rpc("cache_rxnav_medications", {"p_medications": rows}))).data
+    except Exception:
+        # The response has already gone out; a failed write-back only costs the next
+        # search another RxNav round trip.
+        _totals["failures"] += 1
+        logger.exception("storing %d RxNav medications failed", len(rows))
+        return
+
+    for row in inserted:
+        medication_cache.put(row)
+        medication_index.add(row)
+    _totals["batches"] += 1
+    _totals["inserted"] += len(inserted)
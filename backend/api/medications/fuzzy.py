@@ -0,0 +1,185 @@
+"""
+Typo-tolerant search over the medications table.
+
+Names are split into words and every distinct word goes into a SymSpell-style deletion
+dictionary: each string left after deleting up to MAX_EDIT_DISTANCE characters from the
+word's first PREFIX_LENGTH characters points back to the word. A misspelled query word
+generates its own deletes, so the words it could be meet it on a shared key, and only
+those few candidates get a real edit-distance check. A medication's score is the summed
+distance of its closest word for each query word; lower ranks first.
+"""
+import heapq
+import logging
+import time
+
+from api import metrics
+from api.db.supabase import supabase, run_query
+from api.medications.rxnorm_index import normalise
+
+logger = logging.getLogger(__name__)
+
+MAX_EDIT_DISTANCE = 2
+PREFIX_LENGTH = 7
+INDEX_LOAD_PAGE_SIZE = 1000
+COLUMNS = "medication_id, rxcui, name, is_brand"
+
+
+def allowed_distance(word: str) -> int:
+    """Edits tolerated in one query word: none for short tokens like "20" or "mg"."""
+    if len(word) <= 3:
+        return 0
+    return 1 if len(word) <= 6 else MAX_EDIT_DISTANCE
+
+
+def deletes(word: str, distance: int) -> set[str]:
+    """The word plus every string reachable from it by deleting up to `distance` characters."""
+    found = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        found |= frontier
+    return found
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Optimal string alignment distance (an adjacent transposition is one edit), or
+    limit + 1 as soon as it is known to exceed limit.
+    """
+    if a == b:
+        return 0
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before = None
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cost = previous[j - 1] + (ca != cb)
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if current[j - 1] + 1 < cost:
+                cost = current[j - 1] + 1
+            if before is not None and j > 1 and ca == b[j - 2] and a[i - 2] == cb and before[j - 2] + 1 < cost:
+                cost = before[j - 2] + 1
+            current[j] = cost
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+class FuzzyIndex:
+    def __init__(self):
+        self._rows: dict[int, dict] = {}
+        self._row_words: dict[int, frozenset[int]] = {}
+        self._word_ids: dict[str, int] = {}
+        self._words: list[str] = []
+        self._postings: list[set[int]] = []
+        self._deletes: dict[str, list[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def stats(self) -> dict:
+        return {"medications": len(self._rows), "words": len(self._words), "deletes": len(self._deletes)}
+
+    def _word_id(self, word: str) -> int:
+        word_id = self._word_ids.get(word)
+        if word_id is None:
+            word_id = self._word_ids[word] = len(self._words)
+            self._words.append(word)
+            self._postings.append(set())
+            for key in deletes(word[:PREFIX_LENGTH], MAX_EDIT_DISTANCE):
+                self._deletes.setdefault(key, []).append(word_id)
+        return word_id
+
+    def add(self, row: dict) -> None:
+        """Index (or re-index) one medications row; needs medication_id, rxcui, name, is_brand."""
+        medication_id = row["medication_id"]
+        for word_id in self._row_words.pop(medication_id, ()):
+            self._postings[word_id].discard(medication_id)
+        self._rows[medication_id] = {key: row[key] for key in ("medication_id", "rxcui", "name", "is_brand")}
+        word_ids = frozenset(self._word_id(word) for word in normalise(row["name"]).split())
+        self._row_words[medication_id] = word_ids
+        for word_id in word_ids:
+            self._postings[word_id].add(medication_id)
+
+    def _match_word(self, word: str) -> dict[int, int]:
+        """Indexed words within this word's allowed distance: word id -> distance."""
+        limit = allowed_distance(word)
+        matches = {}
+        for key in deletes(word[:PREFIX_LENGTH], limit):
+            for word_id in self._deletes.get(key, ()):
+                if word_id not in matches:
+                    matches[word_id] = edit_distance(word, self._words[word_id], limit)
+        return {word_id: distance for word_id, distance in matches.items() if distance <= limit}
+
+    def search(self, query: str, limit: int = 10) -> list[dict]:
+        """
+        Medications with a close match for every query word, by summed edit distance, then
+        shorter name (fewer words the query did not mention), then name.
+        """
+        matches = []
+        for word in dict.fromkeys(normalise(query).split()):
+            found = self._match_word(word)
+            if not found:
+                return []
+            matches.append(found)
+        if not matches:
+            return []
+
+        # Seed candidates from the query word that matches the fewest medications, then
+        # check only those against the other words.
+        matches.sort(key=lambda found: sum(len(self._postings[word_id]) for word_id in found))
+        scores = {}
+        for word_id, distance in matches[0].items():
+            for medication_id in self._postings[word_id]:
+                if distance < scores.get(medication_id, MAX_EDIT_DISTANCE + 1):
+                    scores[medication_id] = distance
+        for found in matches[1:]:
+            for medication_id in list(scores):
+                distances = [found[w] for w in self._row_words[medication_id] if w in found]
+                if distances:
+                    scores[medication_id] += min(distances)
+                else:
+                    del scores[medication_id]
+
+        rows = self._rows
+        ranked = heapq.nsmallest(
+            limit,
+            scores.items(),
+            key=lambda item: (item[1], len(rows[item[0]]["name"]), rows[item[0]]["name"]),
+        )
+        return [{**rows[medication_id], "distance": distance} for medication_id, distance in ranked]
+
+
+medication_index = FuzzyIndex()
+_load = {"loaded": False}
+metrics.register("medication_index", lambda: {**medication_index.stats(), **_load})
+
+
+async def load_medication_index() -> None:
+    """Index the whole medications table, keyset-paged; rows added meanwhile are kept."""
+    started = time.perf_counter()
+    last_id = 0
+    try:
+        while True:
+            page = (await run_query(
+                supabase.table("medications")
+                .select(COLUMNS)
+                .gt("medication_id", last_id)
+                .order("medication_id")
+                .limit(INDEX_LOAD_PAGE_SIZE)
+            )).data
+            for row in page:
+                medication_index.add(row)
+            if len(page) < INDEX_LOAD_PAGE_SIZE:
+                break
+            last_id = page[-1]["medication_id"]
+    except Exception:
+        logger.exception("medication index load failed after %d rows", len(medication_index))
+        return
+
+    _load.update({"loaded": True, "duration_ms": round((time.perf_counter() - started) * 1000, 1)})
+    logger.info("indexed %d medications in %.1f ms", len(medication_index), _load["duration_ms"])
@@ -0,0 +1,97 @@
+import asyncio
+import os
+
+import httpx
+
+from api import metrics
+from api.cache import TTLCache
+
+RXNAV_BASE_URL = os.getenv("RXNAV_BASE_URL", "https://rxnav.nlm.nih.gov/REST")
+RXNAV_TIMEOUT_SECONDS = float(os.getenv("RXNAV_TIMEOUT_SECONDS", "5"))
+# Upper bound on property lookups in flight at once, across all requests.
+RXNAV_MAX_CONCURRENCY = int(os.getenv("RXNAV_MAX_CONCURRENCY", "8"))
+RXNAV_CACHE_TTL_SECONDS = float(os.getenv("RXNAV_CACHE_TTL_SECONDS", "86400"))
+RXNAV_CACHE_MAXSIZE = int(os.getenv("RXNAV_CACHE_MAXSIZE", "10000"))
+
+
+class RxNavClient:
+    """
+    RxNav REST client sharing one pooled HTTP/2 connection for the app's lifetime.
+
+    Term searches and per-rxcui properties are cached (TTL + LRU). Property lookups
+    for several ids run concurrently, bounded by a semaphore shared by all requests so
+    a burst of searches cannot open an unbounded number of upstream calls.
+    """
+
+    def __init__(
+        self,
+        base_url: str = RXNAV_BASE_URL,
+        max_concurrency: int = RXNAV_MAX_CONCURRENCY,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.base_url = base_url
+        self._transport = transport
+        self._http: httpx.AsyncClient | None = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.terms = TTLCache(maxsize=RXNAV_CACHE_MAXSIZE, ttl=RXNAV_CACHE_TTL_SECONDS)
+        self.properties = TTLCache(maxsize=RXNAV_CACHE_MAXSIZE, ttl=RXNAV_CACHE_TTL_SECONDS)
+
+    def _open(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            http2=True,
+            timeout=RXNAV_TIMEOUT_SECONDS,
+            limits=httpx.Limits(max_connections=RXNAV_MAX_CONCURRENCY, max_keepalive_connections=RXNAV_MAX_CONCURRENCY),
+            transport=self._transport,
+        )
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        # Opened by the app lifespan; created on first use where no lifespan runs (scripts).
+        if self._http is None:
+            self._http = self._open()
+        return self._http
+
+    async def start(self) -> None:
+        if self._http is None:
+            self._http = self._open()
+
+    async def close(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    def clear_cache(self) -> None:
+        self.terms.clear()
+        self.properties.clear()
+
+    async def _get_json(self, path: str, params: dict | None = None) -> dict:
+        response = await self.http.get(path, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    async def search_ids(self, term: str) -> list[str]:
+        """rxcuis matching a name (exact or normalized, search=9)."""
+        key = term.strip().lower()
+        ids = self.terms.get(key)
+        if ids is None:
+            body = await self._get_json("/rxcui.json", {"name": term, "search": 9, "allsrc": 0})
+            ids = body.get("idGroup", {}).get("rxnormId") or []
+            self.terms.set(key, ids)
+        return ids
+
+    async def get_properties(self, rxcui: str) -> dict:
+        properties = self.properties.get(rxcui)
+        if properties is None:
+            async with self._semaphore:
+                properties = await self._get_json(f"/rxcui/{rxcui}/properties.json")
+            self.properties.set(rxcui, properties)
+        return properties
+
+    async def get_properties_many(self, rxcuis: list[str]) -> list[dict]:
+        """Properties for each rxcui, in order, fetched concurrently."""
+        return list(await asyncio.gather(*(self.get_properties(rxcui) for rxcui in rxcuis)))
+
+
+rxnav = RxNavClient()
+metrics.register("rxnav", lambda: {"terms": rxnav.terms.stats(), "properties": rxnav.properties.stats()})
@@ -0,0 +1,154 @@
+"""
+Offline RxNorm name index for medication autocomplete.
+
+`build` reads an RxNorm RRF snapshot's RXNCONSO.RRF and writes a directory of flat
+arrays: every kept name, normalised and sorted, as one UTF-8 blob plus offsets, with
+parallel rxcui and TTY arrays and the display names. `RxNormIndex` memory-maps them, so
+opening costs nothing and a prefix lookup is one binary search over the sorted keys.
+
+Build (from backend/):
+    python -m api.medications.rxnorm_index RXNCONSO.RRF data/rxnorm [--tty BN SBD SCD]
+"""
+import argparse
+import json
+import mmap
+import os
+import re
+import time
+from pathlib import Path
+
+import numpy as np
+
+RXNORM_INDEX_DIR = os.getenv("RXNORM_INDEX_DIR")
+# The term types add_medication accepts.
+DEFAULT_TTYS = ("BN", "SBD", "SCD")
+
+# RXNCONSO.RRF columns (pipe-delimited, with a trailing pipe).
+_RXCUI, _LAT, _SAB, _TTY, _STR, _SUPPRESS = 0, 1, 11, 12, 14, 16
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalise(name: str) -> str:
+    return _WHITESPACE.sub(" ", name.casefold()).strip()
+
+
+def _write_strings(path: Path, strings: list[str]) -> None:
+    encoded = [s.encode() for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    path.with_suffix(".bin").write_bytes(b"".join(encoded))
+    np.save(path.with_suffix(".offsets.npy"), offsets)
+
+
+def build(rrf_path: str | Path, out_dir: str | Path, ttys: tuple[str, ...] = DEFAULT_TTYS) -> int:
+    """Index RXNORM-source English names of the given term types; returns the entry count."""
+    wanted = set(ttys)
+    entries = set()
+    with open(rrf_path, encoding="utf-8") as rrf:
+        for line in rrf:
+            fields = line.split("|")
+            if (
+                fields[_SAB] == "RXNORM"
+                and fields[_LAT] == "ENG"
+                and fields[_TTY] in wanted
+                and fields[_SUPPRESS] not in ("Y", "E", "O")
+            ):
+                entries.add((normalise(fields[_STR]), int(fields[_RXCUI]), fields[_TTY], fields[_STR]))
+
+    ordered = sorted(entries)
+    tty_codes = sorted(wanted)
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    _write_strings(out / "keys", [key for key, _, _, _ in ordered])
+    _write_strings(out / "names", [name for _, _, _, name in ordered])
+    np.save(out / "rxcui.npy", np.array([rxcui for _, rxcui, _, _ in ordered], dtype=np.int64))
+    np.save(out / "tty.npy", np.array([tty_codes.index(tty) for _, _, tty, _ in ordered], dtype=np.uint8))
+    (out / "meta.json").write_text(json.dumps({"ttys": tty_codes, "entries": len(ordered)}))
+    return len(ordered)
+
+
+class _Strings:
+    """A memory-mapped list of strings: one blob plus int64 offsets."""
+
+    def __init__(self, path: Path):
+        # Plain ndarray views of the mapping: indexing an np.memmap is several times slower.
+        self.offsets = np.load(path.with_suffix(".offsets.npy"), mmap_mode="r").view(np.ndarray)
+        self.blob = b""
+        if self.offsets[-1]:
+            with open(path.with_suffix(".bin"), "rb") as blob:
+                self.blob = mmap.mmap(blob.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def raw(self, i: int) -> bytes:
+        return self.blob[self.offsets[i]:self.offsets[i + 1]]
+
+    def __getitem__(self, i: int) -> str:
+        return self.raw(i).decode()
+
+
+class RxNormIndex:
+    def __init__(self, directory: str | Path):
+        directory = Path(directory)
+        self.keys = _Strings(directory / "keys")
+        self.names = _Strings(directory / "names")
+        self.rxcui = np.load(directory / "rxcui.npy", mmap_mode="r").view(np.ndarray)
+        self.tty = np.load(directory / "tty.npy", mmap_mode="r").view(np.ndarray)
+        self.ttys = json.loads((directory / "meta.json").read_text())["ttys"]
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _bisect(self, target: bytes) -> int:
+        """First entry whose key is >= target (keys compare as UTF-8 bytes, like str order)."""
+        lo, hi = 0, len(self.keys)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.keys.raw(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def prefix(self, query: str, limit: int = 10) -> list[dict]:
+        """Up to `limit` distinct rxcuis whose normalised name starts with the query, in name order."""
+        prefix = normalise(query).encode()
+        if not prefix:
+            return []
+        results = []
+        seen = set()
+        for i in range(self._bisect(prefix), len(self.keys)):
+            if not self.keys.raw(i).startswith(prefix):
+                break
+            rxcui = int(self.rxcui[i])
+            if rxcui in seen:
+                continue
+            seen.add(rxcui)
+            results.append({"rxcui": str(rxcui), "name": self.names[i], "tty": self.ttys[self.tty[i]]})
+            if len(results) == limit:
+                break
+        return results
+
+
+_index: RxNormIndex | None = None
+
+
+def load_rxnorm_index() -> RxNormIndex | None:
+    """Open the index at RXNORM_INDEX_DIR once; None when it is not configured or missing."""
+    global _index
+    if _index is None and RXNORM_INDEX_DIR and (Path(RXNORM_INDEX_DIR) / "meta.json").exists():
+        _index = RxNormIndex(RXNORM_INDEX_DIR)
+    return _index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("rrf", help="path to RXNCONSO.RRF")
+    parser.add_argument("out_dir", help="directory to write the index to")
+    parser.add_argument("--tty", nargs="+", default=list(DEFAULT_TTYS), help="term types to keep")
+    args = parser.parse_args()
+    started = time.perf_counter()
+    count = build(args.rrf, args.out_dir, tuple(args.tty))
+    print(f"indexed {count} names into {args.out_dir} in {time.perf_counter() - started:.1f} s")
@@ -0,0 +1,12 @@
+from typing import Callable
+
+# name -> zero-arg callable returning that component's current counters
+_sources: dict[str, Callable[[], dict]] = {}
+
+
+def register(name: str, source: Callable[[], dict]) -> None:
+    _sources[name] = source
+
+
+def snapshot() -> dict:
+    return {name: source() for name, source in _sources.items()}
@@ -1,11 +1,20 @@
 from datetime import datetime, timezone, timedelta
 from fastapi import APIRouter, Depends, HTTPException, Request, Response
+import jwt
 import os
 
 from api.auth.hash import hash_password, verify_password
-from api.auth.jwt import create_access_token, create_refresh_token, decode_access_token, REFRESH_TOKEN_EXPIRE_DAYS, ACCESS_TOKEN_EXPIRE_MINUTES
-from api.db.supabase import supabase
-from api.auth.auth import get_current_user
+from api.auth.jwt import (
+    create_access_token,
+    create_refresh_token,
+    decode_access_token,
+    decode_refresh_token,
+    hash_refresh_token,
+    REFRESH_TOKEN_EXPIRE_DAYS,
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+)
+from api.db.supabase import supabase, run_query
+from api.auth.auth import get_current_user, invalidate_user
 from api.schemas.common import DataResponse
 from api.schemas.user import UserCreate, UserLogin, MeResponse
 from postgrest.exceptions import APIError as PostgrestAPIError
@@ -21,18 +30,24 @@ IS_PRODUCTION = os.getenv("ENVIRONMENT") == "production"
 # Helpers
 # ------------------------------------------------------------------
 
-def _set_auth_cookies(response:Response, user_id: str) -> None:
-    """Create access + refresh tokens and store the refresh token in the DB."""
-    access_token = create_access_token({"sub": user_id})
+def _refresh_expiry() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+
+
+async def _set_auth_cookies(response: Response, user_id: str) -> None:
+    """Create access + refresh tokens and store the refresh token's hash in the DB."""
     refresh_token = create_refresh_token({"sub": user_id})
 
-    expires_at = datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
-    supabase.table("refresh_tokens").insert({
+    await run_query(supabase.table("refresh_tokens").insert({
         "user_id": user_id,
-        "token": refresh_token,
-        "expires_at": expires_at.isoformat(),
-    }).execute()
+        "token_hash": hash_refresh_token(refresh_token),
+        "expires_at": _refresh_expiry().isoformat(),
+    }))
+
+    _write_auth_cookies(response, create_access_token({"sub": user_id}), refresh_token)
+
 
+def _write_auth_cookies(response: Response, access_token: str, refresh_token: str) -> None:
     #short-lived
     response.set_cookie(
         key="access_token",
@@ -62,14 +77,14 @@ def _set_auth_cookies(response:Response, user_id: str) -> None:
 
 @router.post("/signup", summary="Create a new user", status_code=201)
 @limiter.limit("3/minute")
-def signup(request: Request, response: Response, user: UserCreate):
-    hashed = hash_password(user.password)
+async def signup(request: Request, response: Response, user: UserCreate):
+    hashed = await hash_password(user.password)
 
     try:
-        db_response = supabase.table("users").insert({
+        db_response = await run_query(supabase.table("users").insert({
             "email": user.email,
             "password": hashed,
-        }).execute()
+        }))
     except PostgrestAPIError as e:
         if "23505" in str(e):
             raise HTTPException(status_code=400, detail="Email already registered")
@@ -80,7 +95,7 @@ def signup(request: Request, response: Response, user: UserCreate):
 
     user_id = db_response.data[0]["id"]
     
-    _set_auth_cookies(response, str(user_id))
+    await _set_auth_cookies(response, str(user_id))
 
     return {"message": "Account created"}
 
@@ -91,18 +106,18 @@ def signup(request: Request, response: Response, user: UserCreate):
 
 @router.post("/login", summary="Login and get JWT")
 @limiter.limit("5/minute")
-def login(request: Request, response: Response, user: UserLogin):
-    db_response = supabase.table("users").select("*").eq("email", user.email).execute()
+async def login(request: Request, response: Response, user: UserLogin):
+    db_response = await run_query(supabase.table("users").select("*").eq("email", user.email))
 
     if not db_response.data:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     db_user = db_response.data[0]
 
-    if not verify_password(user.password, db_user["password"]):
+    if not await verify_password(user.password, db_user["password"]):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    _set_auth_cookies(response, str(db_user["id"]))
+    await _set_auth_cookies(response, str(db_user["id"]))
 
     return {"message": "Login successful"}
 
@@ -113,40 +128,40 @@ def login(request: Request, response: Response, user: UserLogin):
 
 @router.post("/refresh", summary="Refresh access token")
 @limiter.limit("30/minute")
-def refresh(request: Request, response: Response):
-    # 1. decode and validate the token
+async def refresh(request: Request, response: Response):
+    # 1. decode and validate the token (also rejects access tokens)
     refresh_token = request.cookies.get("refresh_token")
     if not refresh_token:
         raise HTTPException(status_code=401, detail="No refresh token")
     try:
-        payload = decode_access_token(refresh_token)
-    except Exception:
+        payload = decode_refresh_token(refresh_token)
+    except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid or expired refresh token")
 
-    # 2. confirm it's a refresh token, not an access token
-    if payload.get("type") != "refresh":
-        raise HTTPException(status_code=401, detail="Invalid token type")
-
-    # 3. check it exists in the DB (not already rotated/revoked)
-    result = supabase.table("refresh_tokens").select("id").eq("token", refresh_token).execute()
-
-    if not result.data:
-        raise HTTPException(status_code=401, detail="Refresh token revoked or not found")
-
     user_id = payload.get("sub")
+    new_refresh_token = create_refresh_token({"sub": user_id})
+
+    # 2. rotate in one round trip — the old token is consumed only if it still exists
+    #    (not already rotated/revoked) and the new one is stored in the same transaction
+    rotated = await run_query(supabase.rpc("rotate_refresh_token", {
+        "p_old_hash": hash_refresh_token(refresh_token),
+        "p_new_hash": hash_refresh_token(new_refresh_token),
+        "p_user_id": user_id,
+        "p_expires_at": _refresh_expiry().isoformat(),
+    }))
+
+    if not rotated.data:
+        raise HTTPException(status_code=401, detail="Refresh token revoked or not found")
 
-    # 4. rotate — delete old token then issue new pair
-    supabase.table("refresh_tokens").delete().eq("token", refresh_token).execute()
-
-    _set_auth_cookies(response, user_id)
+    _write_auth_cookies(response, create_access_token({"sub": user_id}), new_refresh_token)
 
 # ------------------------------------------------------------------
 # Me
 # ------------------------------------------------------------------
 
 @router.get("/me", response_model=DataResponse[MeResponse], summary="Get current user")
-def me(current_user_id=Depends(get_current_user)):
-    result = supabase.table("users").select("email").eq("id", str(current_user_id)).execute()
+async def me(current_user_id=Depends(get_current_user)):
+    result = await run_query(supabase.table("users").select("email").eq("id", str(current_user_id)))
 
     if not result.data:
         raise HTTPException(status_code=404, detail="User not found")
@@ -159,10 +174,18 @@ def me(current_user_id=Depends(get_current_user)):
 # ------------------------------------------------------------------
 
 @router.post("/logout", status_code=200, summary="Logout")
-def logout(request: Request, response: Response):
+async def logout(request: Request, response: Response):
     refresh_token = request.cookies.get("refresh_token")
     if refresh_token:
-        supabase.table("refresh_tokens").delete().eq("token", refresh_token).execute()
+        await run_query(supabase.table("refresh_tokens").delete().eq("token_hash", hash_refresh_token(refresh_token)))
+
+    access_token = request.cookies.get("access_token")
+    if access_token:
+        try:
+            invalidate_user(decode_access_token(access_token)["sub"])
+        except (jwt.InvalidTokenError, KeyError):
+            pass
+
     response.delete_cookie("access_token")
     response.delete_cookie("refresh_token")
     return {"message": "Logged out"}
\ No newline at end of file
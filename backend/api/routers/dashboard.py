@@ -0,0 +1,45 @@
+import asyncio
+import time
+from typing import Awaitable, TypeVar
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Request, Response
+from api.auth.auth import get_current_user
+from api.routers.schedules import get_today_doses
+from api.routers.supplements import get_today_supplements
+from api.schemas.dashboard import TodayDashboard
+from api.schemas.common import DataResponse
+from api.limiter import limiter
+
+router = APIRouter(prefix="/api", tags=["Dashboard"])
+
+T = TypeVar("T")
+
+
+async def timed(name: str, section: Awaitable[T], timings: dict[str, float]) -> T:
+    started = time.perf_counter()
+    try:
+        return await section
+    finally:
+        timings[name] = (time.perf_counter() - started) * 1000
+
+
+def server_timing(timings: dict[str, float]) -> str:
+    return ", ".join(f"{name};dur={ms:.1f}" for name, ms in timings.items())
+
+
+@router.get("/today", response_model=DataResponse[TodayDashboard])
+@limiter.limit("30/minute")
+async def get_today(request: Request, response: Response, user_id: UUID = Depends(get_current_user)):
+    # One authentication for the home screen; the dose and supplement sections share
+    # no queries, so they run concurrently and the slower one sets the response time.
+    timings: dict[str, float] = {}
+    started = time.perf_counter()
+    doses, supplements = await asyncio.gather(
+        timed("doses", get_today_doses(user_id), timings),
+        timed("supplements", get_today_supplements(user_id), timings),
+    )
+    timings["total"] = (time.perf_counter() - started) * 1000
+
+    response.headers["Server-Timing"] = server_timing(timings)
+    return {"data": {"doses": doses, "supplements": supplements}}
@@ -1,7 +1,7 @@
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Request
-from api.db.supabase import supabase
+from api.db.supabase import supabase, run_query
 from api.auth.auth import get_current_user
 from api.schemas.exercise_record import ExerciseRecordCreate, ExerciseResponse
 from api.schemas.common import DataResponse
@@ -21,14 +21,13 @@ async def create_exercise(
     exercise_record: ExerciseRecordCreate,
     _: UUID = Depends(get_current_user),
 ):
-    response = (
+    response = await run_query(
         supabase.table("exercises")
         .insert({
             "exercise_name": exercise_record.exercise_name.lower(),
             "muscle_group": exercise_record.muscle_group.lower(),
             "equipment": exercise_record.equipment.lower(),
         })
-        .execute()
     )
     return {"data": response.data[0]}
 
@@ -36,7 +35,7 @@ async def create_exercise(
 @router.get("/exercises", response_model=DataResponse[list[ExerciseResponse]])
 @limiter.limit("30/minute")
 async def get_all_exercises(request: Request, _: UUID = Depends(get_current_user)):
-    response = supabase.table("exercises").select("*").execute()
+    response = await run_query(supabase.table("exercises").select("*"))
     return {"data": response.data}
 
 
@@ -47,11 +46,10 @@ async def get_exercise_by_id(
     exercise_id: int,
     _: UUID = Depends(get_current_user),
 ):
-    response = (
+    response = await run_query(
         supabase.table("exercises")
         .select("*")
         .eq("id", exercise_id)
-        .execute()
     )
 
     if not response.data:
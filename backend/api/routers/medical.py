@@ -2,68 +2,40 @@ from datetime import datetime, timezone
 from uuid import UUID
 
 import httpx
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
-from api.db.supabase import supabase
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response
+from api.db.supabase import supabase, run_query
+from api.db.repository import SYMPTOM_LOGS, MEDICATION_STOCK
+from api.db.pagination import PageParams, paginate
 from api.auth.auth import get_current_user
 from api.schemas.symptom_logs import SymptomLogCreate, SymptomLogUpdate, SymptomLogResponse
-from api.schemas.medication_record import MedicationRecordCreate, MedicationResponse
-from api.schemas.stock_record import StockRecordCreate, StockRecordResponse
-from api.schemas.common import DataResponse
+from api.schemas.medication_record import MedicationRecordCreate, MedicationResponse, MedicationSuggestion, MedicationMatch
+from api.schemas.stock_record import StockRecordCreate, StockRecordResponse, StockForecast
+from api.schemas.common import DataResponse, PageResponse
 from api.limiter import limiter
+from api.dosing.forecast import get_user_forecast, invalidate_forecast
+from api.medications.rxnav import rxnav
+from api.medications.rxnorm_index import load_rxnorm_index
+from api.medications.fuzzy import medication_index
+from api.medications.catalog import medication_cache, remember_rxnav_properties
 
 router = APIRouter(prefix="/api", tags=["Medical"])
 
-
-# ------------------------------------------------------------------
-# Helpers
-# ------------------------------------------------------------------
-
-def verify_symptom_ownership(symptom_id: str, user_id: UUID):
-    result = (
-        supabase.table("symptom_logs")
-        .select("symptom_id, user_id")
-        .eq("symptom_id", symptom_id)
-        .eq("user_id", str(user_id))
-        .execute()
-    )
-
-    if not result.data:
-        raise HTTPException(status_code=404, detail="Symptom log not found")
-
-    if result.data[0]["user_id"] != str(user_id):
-        raise HTTPException(status_code=403, detail="Not authorized")
-
-
-def verify_stock_ownership(stock_id: int, user_id: UUID):
-    result = (
-        supabase.table("user_medication_stock")
-        .select("stock_id, user_id")
-        .eq("stock_id", stock_id)
-        .eq("user_id", str(user_id))
-        .execute()
-    )
-
-    if not result.data:
-        raise HTTPException(status_code=404, detail="Medication stock entry not found")
-
-    if result.data[0]["user_id"] != str(user_id):
-        raise HTTPException(status_code=403, detail="Not authorized")
+# Per-client cap on requests that reach RxNav, shared by search and the autocomplete fallback.
+RXNAV_RATE_LIMIT = "5/minute"
 
 
 # ------------------------------------------------------------------
 # Symptom routes
 # ------------------------------------------------------------------
 
-@router.get("/symptoms", response_model=DataResponse[list[SymptomLogResponse]])
+@router.get("/symptoms", response_model=PageResponse[SymptomLogResponse])
 @limiter.limit("30/minute")
-async def get_symptom_logs(request: Request, user_id: UUID = Depends(get_current_user)):
-    response = (
-        supabase.table("symptom_logs")
-        .select("*")
-        .eq("user_id", str(user_id))
-        .execute()
-    )
-    return {"data": response.data}
+async def get_symptom_logs(
+    request: Request,
+    page: PageParams = Depends(),
+    user_id: UUID = Depends(get_current_user),
+):
+    return await paginate(SYMPTOM_LOGS.select(user_id), page, "created_at", SYMPTOM_LOGS.id_column)
 
 
 @router.post("/symptoms", response_model=DataResponse[SymptomLogResponse], status_code=201)
@@ -73,7 +45,7 @@ async def add_symptom_log(
     symptom_log: SymptomLogCreate,
     user_id: UUID = Depends(get_current_user),
 ):
-    response = (
+    response = await run_query(
         supabase.table("symptom_logs")
         .insert({
             "user_id": str(user_id),
@@ -82,7 +54,6 @@ async def add_symptom_log(
             "notes": symptom_log.notes,
             "is_resolved": symptom_log.is_resolved,
         })
-        .execute()
     )
     return {"data": response.data[0]}
 
@@ -94,15 +65,7 @@ async def get_symptom_log(
     symptom_id: str,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_symptom_ownership(symptom_id, user_id)
-    response = (
-        supabase.table("symptom_logs")
-        .select("*")
-        .eq("symptom_id", symptom_id)
-        .eq("user_id", str(user_id))
-        .execute()
-    )
-    return {"data": response.data[0]}
+    return {"data": await SYMPTOM_LOGS.get(symptom_id, user_id)}
 
 
 @router.put("/symptoms/{symptom_id}", response_model=DataResponse[SymptomLogResponse])
@@ -113,19 +76,10 @@ async def update_symptom_log(
     symptom_log_update: SymptomLogUpdate,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_symptom_ownership(symptom_id, user_id)
-
     update_data = symptom_log_update.model_dump(exclude_unset=True)
     update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
 
-    response = (
-        supabase.table("symptom_logs")
-        .update(update_data)
-        .eq("symptom_id", symptom_id)
-        .eq("user_id", str(user_id))
-        .execute()
-    )
-    return {"data": response.data[0]}
+    return {"data": await SYMPTOM_LOGS.update(symptom_id, user_id, update_data)}
 
 
 @router.delete("/symptoms/{symptom_id}", status_code=204)
@@ -135,8 +89,7 @@ async def delete_symptom_log(
     symptom_id: str,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_symptom_ownership(symptom_id, user_id)
-    supabase.table("symptom_logs").delete().eq("symptom_id", symptom_id).eq("user_id", str(user_id)).execute()
+    await SYMPTOM_LOGS.delete(symptom_id, user_id)
     return Response(status_code=204)
 
 
@@ -145,35 +98,26 @@ async def delete_symptom_log(
 # ------------------------------------------------------------------
 
 @router.get("/medications/search")
-@limiter.limit("5/minute")
+@limiter.limit(RXNAV_RATE_LIMIT)
 async def search_medications(
     request: Request,
+    background_tasks: BackgroundTasks,
     medication_term: str = Query(..., max_length=100),
     _: UUID = Depends(get_current_user),
 ):
     try:
-        async with httpx.AsyncClient() as client:
-            id_search_response = await client.get(
-                "https://rxnav.nlm.nih.gov/REST/rxcui.json",
-                params={"name": medication_term, "search": 9, "allsrc": 0},
-                timeout=5,
-            )
-            id_search_response.raise_for_status()
-
-            id_array = id_search_response.json().get("idGroup", {}).get("rxnormId")
-            if not id_array:
-                return {"data": []}
-
-            db_response = supabase.table("medications").select("*").in_("rxcui", id_array).execute()
-            if db_response.data:
-                return {"data": db_response.data}
-
-            data = []
-            for rxcui_id in id_array:
-                properties_url = f"https://rxnav.nlm.nih.gov/REST/rxcui/{rxcui_id}/properties.json"
-                properties_response = await client.get(properties_url, timeout=5)
-                properties_response.raise_for_status()
-                data.append(properties_response.json())
+        id_array = await rxnav.search_ids(medication_term)
+        if not id_array:
+            # No exact RxNav match: likely a misspelling, so try known medications.
+            return {"data": medication_index.search(medication_term)}
+
+        known = await medication_cache.get_by_rxcui(id_array)
+        if known:
+            return {"data": known}
+
+        data = await rxnav.get_properties_many(id_array)
+        # Keep them, so the next search for this term is answered by the query above.
+        background_tasks.add_task(remember_rxnav_properties, data)
 
     except httpx.TimeoutException:
         raise HTTPException(status_code=504, detail="Medication search timed out")
@@ -183,6 +127,53 @@ async def search_medications(
     return {"data": data}
 
 
+@router.get("/medications/autocomplete", response_model=DataResponse[list[MedicationSuggestion]])
+@limiter.limit("120/minute")
+async def autocomplete_medications(
+    request: Request,
+    q: str = Query(..., min_length=2, max_length=100),
+    limit: int = Query(10, ge=1, le=25),
+    _: UUID = Depends(get_current_user),
+):
+    # Prefix lookup in the local RxNorm index. Without one, every keystroke would go to
+    # RxNav, so the endpoint is unavailable instead.
+    index = load_rxnorm_index()
+    if index is None:
+        raise HTTPException(status_code=503, detail="Medication autocomplete is not available")
+    suggestions = index.prefix(q, limit)
+    # RxNav only matches whole words, so a miss is sent there only once the last word is
+    # finished (the query ends in a space), and under the same limit as /medications/search.
+    if suggestions or not q[-1].isspace():
+        return {"data": suggestions}
+    if not limiter.hit(RXNAV_RATE_LIMIT, "rxnav-autocomplete", request):
+        raise HTTPException(status_code=429, detail="Too many medication lookups")
+
+    try:
+        id_array = (await rxnav.search_ids(q.strip()))[:limit]
+        properties = await rxnav.get_properties_many(id_array)
+    except httpx.TimeoutException:
+        raise HTTPException(status_code=504, detail="Medication search timed out")
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(status_code=502, detail=f"Upstream API error: {e.response.status_code}")
+
+    for body in properties:
+        found = body.get("properties")
+        if found:
+            suggestions.append({"rxcui": found["rxcui"], "name": found["name"], "tty": found.get("tty")})
+    return {"data": suggestions}
+
+
+@router.get("/medications/fuzzy", response_model=DataResponse[list[MedicationMatch]])
+@limiter.limit("60/minute")
+async def fuzzy_search_medications(
+    request: Request,
+    q: str = Query(..., min_length=2, max_length=100),
+    limit: int = Query(10, ge=1, le=25),
+    _: UUID = Depends(get_current_user),
+):
+    return {"data": medication_index.search(q, limit)}
+
+
 @router.get("/medications/{medication_id}", response_model=DataResponse[MedicationResponse])
 @limiter.limit("30/minute")
 async def get_medication(
@@ -190,17 +181,11 @@ async def get_medication(
     medication_id: int,
     _: UUID = Depends(get_current_user),
 ):
-    response = (
-        supabase.table("medications")
-        .select("*")
-        .eq("medication_id", medication_id)
-        .execute()
-    )
-
-    if not response.data:
+    medication = await medication_cache.get(medication_id)
+    if medication is None:
         raise HTTPException(status_code=404, detail="Medication not found")
 
-    return {"data": response.data[0]}
+    return {"data": medication}
 
 
 @router.post("/medications", response_model=DataResponse[MedicationResponse], status_code=201)
@@ -213,7 +198,7 @@ async def add_medication(
     if medication_record.tty.lower() not in ("bn", "sbd", "scd"):
         raise HTTPException(status_code=400, detail=f"Unsupported term type (TTY): {medication_record.tty}")
 
-    response = (
+    response = await run_query(
         supabase.table("medications")
         .insert({
             "rxcui": medication_record.rxcui,
@@ -221,8 +206,9 @@ async def add_medication(
             "generic_rxcui": None,
             "is_brand": medication_record.tty.lower() != "scd",
         })
-        .execute()
     )
+    medication_cache.put(response.data[0])
+    medication_index.add(response.data[0])
     return {"data": response.data[0]}
 
 
@@ -240,11 +226,10 @@ async def add_medication_to_stock(
     user_id: UUID = Depends(get_current_user),
 ):
     #check existence of medication first
-    medication = supabase.table("medications").select("medication_id").eq("medication_id", medication_id).execute()
-    if not medication.data:
+    if await medication_cache.get(medication_id) is None:
         raise HTTPException(status_code=404, detail="Medication not found")
 
-    response = (
+    response = await run_query(
         supabase.table("user_medication_stock")
         .insert({
             "user_id": str(user_id),
@@ -255,21 +240,32 @@ async def add_medication_to_stock(
             "opened_at": stock_record.opened_at.isoformat() if stock_record.opened_at else None,
             "notes": stock_record.notes,
         })
-        .execute()
     )
+    invalidate_forecast(user_id)
     return {"data": response.data[0]}
 
 
-@router.get("/user/medications", response_model=DataResponse[list[StockRecordResponse]])
+@router.get("/user/medications", response_model=PageResponse[StockRecordResponse])
 @limiter.limit("30/minute")
-async def get_all_user_medications(request: Request, user_id: UUID = Depends(get_current_user)):
-    response = (
-        supabase.table("user_medication_stock")
-        .select("*")
-        .eq("user_id", str(user_id))
-        .execute()
-    )
-    return {"data": response.data}
+async def get_all_user_medications(
+    request: Request,
+    page: PageParams = Depends(),
+    user_id: UUID = Depends(get_current_user),
+):
+    return await paginate(MEDICATION_STOCK.select(user_id), page, "created_at", MEDICATION_STOCK.id_column)
+
+
+@router.get("/medications/stock/forecast", response_model=DataResponse[list[StockForecast]])
+@limiter.limit("30/minute")
+async def get_stock_forecast(
+    request: Request,
+    low_only: bool = Query(False, description="Only stock projected to run out soon"),
+    user_id: UUID = Depends(get_current_user),
+):
+    forecasts = await get_user_forecast(user_id)
+    if low_only:
+        forecasts = [f for f in forecasts if f["is_low"]]
+    return {"data": forecasts}
 
 
 @router.get("/medications/stock/{stock_id}", response_model=DataResponse[StockRecordResponse])
@@ -279,16 +275,7 @@ async def get_user_medication_stock(
     stock_id: int,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_stock_ownership(stock_id, user_id)
-
-    response = (
-        supabase.table("user_medication_stock")
-        .select("*")
-        .eq("stock_id", stock_id)
-        .eq("user_id", str(user_id))
-        .execute()
-    )
-    return {"data": response.data[0]}
+    return {"data": await MEDICATION_STOCK.get(stock_id, user_id)}
 
 @router.delete("/medications/{medication_id}/stock/{stock_id}", status_code=204)
 @limiter.limit("10/minute")
@@ -298,7 +285,6 @@ async def delete_user_medication_stock(
     stock_id: int,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_stock_ownership(stock_id, user_id)
-
-    supabase.table("user_medication_stock").delete().eq("medication_id", medication_id).eq("stock_id", stock_id).eq("user_id", str(user_id)).execute()
+    await MEDICATION_STOCK.delete(stock_id, user_id, match={"medication_id": medication_id})
+    invalidate_forecast(user_id)
     return Response(status_code=204)
\ No newline at end of file
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends, Request
+from api.schemas.common import DataResponse
+from api.metrics import snapshot
+from api.limiter import limiter
+from api.auth.auth import require_metrics_token
+
+router = APIRouter(prefix="/api", tags=["Metrics"])
+
+
+@router.get(
+    "/metrics",
+    response_model=DataResponse[dict],
+    include_in_schema=False,
+    dependencies=[Depends(require_metrics_token)],
+)
+@limiter.limit("30/minute")
+async def get_metrics(request: Request):
+    return {"data": snapshot()}
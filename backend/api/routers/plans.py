@@ -1,7 +1,8 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Request, Response
-from api.db.supabase import supabase
+from fastapi import APIRouter, Depends, Request, Response
+from api.db.supabase import supabase, run_query
+from api.db.repository import WORKOUT_PLANS, PLAN_DAYS, WORKOUT_ROUTINES
 from api.auth.auth import get_current_user
 from api.schemas.plan_record import (
     WorkoutPlanCreate,
@@ -19,64 +20,6 @@ from api.limiter import limiter
 router = APIRouter(prefix="/api", tags=["Plans"])
 
 
-# ------------------------------------------------------------------
-# Helpers
-# ------------------------------------------------------------------
-
-def verify_plan_ownership(plan_id: int, user_id: UUID):
-    result = (
-        supabase.table("workout_plans")
-        .select("id, user_id")
-        .eq("id", plan_id)
-        .eq("user_id", str(user_id))
-        .execute()
-    )
-
-    if not result.data:
-        raise HTTPException(status_code=404, detail="Workout plan not found")
-
-    if result.data[0]["user_id"] != str(user_id):
-        raise HTTPException(status_code=403, detail="Not authorized")
-
-
-def verify_plan_day_ownership(plan_day_id: int, user_id: UUID):
-    result = (
-        supabase.table("plan_routine_days")
-        .select("""
-            id,
-            plan_id,
-            workout_plans (
-                id,
-                user_id
-            )
-        """)
-        .eq("id", plan_day_id)
-        .execute()
-    )
-
-    if not result.data:
-        raise HTTPException(status_code=404, detail="Plan day not found")
-
-    if result.data[0]["workout_plans"]["user_id"] != str(user_id):
-        raise HTTPException(status_code=403, detail="Not authorized")
-
-
-def verify_routine_belongs_to_user(routine_id: int, user_id: UUID):
-    result = (
-        supabase.table("workout_routines")
-        .select("id, user_id")
-        .eq("id", routine_id)
-        .eq("user_id", str(user_id))
-        .execute()
-    )
-
-    if not result.data:
-        raise HTTPException(status_code=404, detail="Workout routine not found")
-
-    if result.data[0]["user_id"] != str(user_id):
-        raise HTTPException(status_code=403, detail="Not authorized")
-
-
 # ------------------------------------------------------------------
 # Workout plan routes
 # ------------------------------------------------------------------
@@ -88,14 +31,13 @@ async def create_workout_plan(
     plan: WorkoutPlanCreate,
     user_id: UUID = Depends(get_current_user),
 ):
-    response = (
+    response = await run_query(
         supabase.table("workout_plans")
         .insert({
             "user_id": str(user_id),
             "name": plan.name,
             "description": plan.description,
         })
-        .execute()
     )
     return {"data": response.data[0]}
 
@@ -103,11 +45,10 @@ async def create_workout_plan(
 @router.get("/workout-plans", response_model=DataResponse[list[WorkoutPlanResponse]])
 @limiter.limit("30/minute")
 async def get_all_workout_plans(request: Request, user_id: UUID = Depends(get_current_user)):
-    response = (
+    response = await run_query(
         supabase.table("workout_plans")
         .select("*")
         .eq("user_id", str(user_id))
-        .execute()
     )
     return {"data": response.data}
 
@@ -119,15 +60,7 @@ async def get_workout_plan(
     plan_id: int,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_plan_ownership(plan_id, user_id)
-
-    response = (
-        supabase.table("workout_plans")
-        .select("*")
-        .eq("id", plan_id)
-        .execute()
-    )
-    return {"data": response.data[0]}
+    return {"data": await WORKOUT_PLANS.get(plan_id, user_id)}
 
 
 @router.put("/workout-plans/{plan_id}", response_model=DataResponse[WorkoutPlanResponse])
@@ -138,18 +71,9 @@ async def update_workout_plan(
     updated_plan: WorkoutPlanUpdate,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_plan_ownership(plan_id, user_id)
-
     update_data = updated_plan.model_dump(exclude_unset=True)
 
-    response = (
-        supabase.table("workout_plans")
-        .update(update_data)
-        .eq("id", plan_id)
-        .eq("user_id", str(user_id))
-        .execute()
-    )
-    return {"data": response.data[0]}
+    return {"data": await WORKOUT_PLANS.update(plan_id, user_id, update_data)}
 
 
 @router.patch("/workout-plans/{plan_id}/activate", response_model=DataResponse[WorkoutPlanResponse])
@@ -159,19 +83,12 @@ async def activate_workout_plan(
     plan_id: int,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_plan_ownership(plan_id, user_id)
+    await WORKOUT_PLANS.verify(plan_id, user_id)
 
     # Deactivate all plans for this user, then activate the target
-    supabase.table("workout_plans").update({"is_active": False}).eq("user_id", str(user_id)).execute()
+    await run_query(supabase.table("workout_plans").update({"is_active": False}).eq("user_id", str(user_id)))
 
-    response = (
-        supabase.table("workout_plans")
-        .update({"is_active": True})
-        .eq("id", plan_id)
-        .eq("user_id", str(user_id))
-        .execute()
-    )
-    return {"data": response.data[0]}
+    return {"data": await WORKOUT_PLANS.update(plan_id, user_id, {"is_active": True})}
 
 
 @router.delete("/workout-plans/{plan_id}", status_code=204)
@@ -181,8 +98,7 @@ async def delete_workout_plan(
     plan_id: int,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_plan_ownership(plan_id, user_id)
-    supabase.table("workout_plans").delete().eq("id", plan_id).eq("user_id", str(user_id)).execute()
+    await WORKOUT_PLANS.delete(plan_id, user_id)
     return Response(status_code=204)
 
 
@@ -198,10 +114,10 @@ async def add_day_to_plan(
     plan_day: PlanRoutineDayCreate,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_plan_ownership(plan_id, user_id)
-    verify_routine_belongs_to_user(plan_day.routine_id, user_id)
+    await WORKOUT_PLANS.verify(plan_id, user_id)
+    await WORKOUT_ROUTINES.verify(plan_day.routine_id, user_id)
 
-    response = (
+    response = await run_query(
         supabase.table("plan_routine_days")
         .insert({
             "plan_id": plan_id,
@@ -209,7 +125,6 @@ async def add_day_to_plan(
             "weekday": plan_day.weekday,
             "notes": plan_day.notes,
         })
-        .execute()
     )
     return {"data": response.data[0]}
 
@@ -221,14 +136,13 @@ async def get_all_days_in_plan(
     plan_id: int,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_plan_ownership(plan_id, user_id)
+    await WORKOUT_PLANS.verify(plan_id, user_id)
 
-    response = (
+    response = await run_query(
         supabase.table("plan_routine_days")
         .select("*")
         .eq("plan_id", plan_id)
         .order("weekday", desc=False)
-        .execute()
     )
     return {"data": response.data}
 
@@ -241,20 +155,7 @@ async def get_plan_day(
     plan_day_id: int,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_plan_ownership(plan_id, user_id)
-
-    response = (
-        supabase.table("plan_routine_days")
-        .select("*")
-        .eq("id", plan_day_id)
-        .eq("plan_id", plan_id)
-        .execute()
-    )
-
-    if not response.data:
-        raise HTTPException(status_code=404, detail="Plan day not found")
-
-    return {"data": response.data[0]}
+    return {"data": await PLAN_DAYS.get(plan_day_id, user_id, match={"plan_id": plan_id})}
 
 
 @router.put("/workout-plans/{plan_id}/days/{plan_day_id}", response_model=DataResponse[PlanRoutineDayResponse])
@@ -266,22 +167,12 @@ async def update_plan_day(
     updated_day: PlanRoutineDayUpdate,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_plan_ownership(plan_id, user_id)
-    verify_plan_day_ownership(plan_day_id, user_id)
-
     update_data = updated_day.model_dump(exclude_unset=True)
 
     if "routine_id" in update_data:
-        verify_routine_belongs_to_user(update_data["routine_id"], user_id)
+        await WORKOUT_ROUTINES.verify(update_data["routine_id"], user_id)
 
-    response = (
-        supabase.table("plan_routine_days")
-        .update(update_data)
-        .eq("id", plan_day_id)
-        .eq("plan_id", plan_id)
-        .execute()
-    )
-    return {"data": response.data[0]}
+    return {"data": await PLAN_DAYS.update(plan_day_id, user_id, update_data, match={"plan_id": plan_id})}
 
 
 @router.delete("/workout-plans/{plan_id}/days/{plan_day_id}", status_code=204)
@@ -292,10 +183,7 @@ async def delete_plan_day(
     plan_day_id: int,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_plan_ownership(plan_id, user_id)
-    verify_plan_day_ownership(plan_day_id, user_id)
-
-    supabase.table("plan_routine_days").delete().eq("id", plan_day_id).eq("plan_id", plan_id).execute()
+    await PLAN_DAYS.delete(plan_day_id, user_id, match={"plan_id": plan_id})
     return Response(status_code=204)
 
 
@@ -310,12 +198,11 @@ async def get_rest_days(
     plan_id: int,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_plan_ownership(plan_id, user_id)
-    response = (
+    await WORKOUT_PLANS.verify(plan_id, user_id)
+    response = await run_query(
         supabase.table("plan_rest_days")
         .select("*")
         .eq("plan_id", plan_id)
-        .execute()
     )
     return {"data": response.data}
 
@@ -328,11 +215,10 @@ async def add_rest_day(
     rest_day: PlanRestDayCreate,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_plan_ownership(plan_id, user_id)
-    response = (
+    await WORKOUT_PLANS.verify(plan_id, user_id)
+    response = await run_query(
         supabase.table("plan_rest_days")
         .insert({"plan_id": plan_id, "weekday": rest_day.weekday})
-        .execute()
     )
     return {"data": response.data[0]}
 
@@ -345,6 +231,6 @@ async def delete_rest_day(
     rest_day_id: int,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_plan_ownership(plan_id, user_id)
-    supabase.table("plan_rest_days").delete().eq("id", rest_day_id).eq("plan_id", plan_id).execute()
+    await WORKOUT_PLANS.verify(plan_id, user_id)
+    await run_query(supabase.table("plan_rest_days").delete().eq("id", rest_day_id).eq("plan_id", plan_id))
     return Response(status_code=204)
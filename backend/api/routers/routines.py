@@ -1,13 +1,15 @@
 from decimal import Decimal
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Request, Response
-from api.db.supabase import supabase
+from fastapi import APIRouter, Depends, Request, Response
+from api.db.supabase import supabase, run_query
+from api.db.repository import WORKOUT_ROUTINES, ROUTINE_EXERCISES, ROUTINE_SETS
+from api.db.pagination import PageParams, paginate
 from api.auth.auth import get_current_user
 from api.schemas.workout_routine_record import WorkoutRoutineCreate, WorkoutRoutineUpdate, WorkoutRoutineResponse
 from api.schemas.routine_exercise_record import RoutineExerciseRecordCreate, RoutineExerciseRecordUpdate, RoutineExerciseResponse
 from api.schemas.routine_set_record import RoutineSetRecordCreate, RoutineSetRecordUpdate, RoutineSetResponse
-from api.schemas.common import DataResponse
+from api.schemas.common import DataResponse, PageResponse
 from api.limiter import limiter
 
 router = APIRouter(prefix="/api", tags=["Routines"])
@@ -17,68 +19,6 @@ router = APIRouter(prefix="/api", tags=["Routines"])
 # Helpers
 # ------------------------------------------------------------------
 
-def verify_routine_ownership(routine_id: int, user_id: UUID):
-    result = (
-        supabase.table("workout_routines")
-        .select("id, user_id")
-        .eq("id", routine_id)
-        .eq("user_id", str(user_id))
-        .execute()
-    )
-
-    if not result.data:
-        raise HTTPException(status_code=404, detail="Workout routine not found")
-
-    if result.data[0]["user_id"] != str(user_id):
-        raise HTTPException(status_code=403, detail="Not authorized")
-
-
-def verify_routine_exercise_ownership(routine_exercise_id: int, user_id: UUID):
-    result = (
-        supabase.table("routine_exercises")
-        .select("""
-            id,
-            routine_id,
-            workout_routines (
-                id,
-                user_id
-            )
-        """)
-        .eq("id", routine_exercise_id)
-        .execute()
-    )
-
-    if not result.data:
-        raise HTTPException(status_code=404, detail="Routine exercise not found")
-
-    if result.data[0]["workout_routines"]["user_id"] != str(user_id):
-        raise HTTPException(status_code=403, detail="Not authorized")
-
-
-def verify_routine_set_ownership(set_id: int, user_id: UUID):
-    result = (
-        supabase.table("routine_sets")
-        .select("""
-            id,
-            routine_exercise_id,
-            routine_exercises (
-                routine_id,
-                workout_routines (
-                    user_id
-                )
-            )
-        """)
-        .eq("id", set_id)
-        .execute()
-    )
-
-    if not result.data:
-        raise HTTPException(status_code=404, detail="Routine set not found")
-
-    if result.data[0]["routine_exercises"]["workout_routines"]["user_id"] != str(user_id):
-        raise HTTPException(status_code=403, detail="Not authorized")
-
-
 def convert_decimals_to_float(data: dict) -> dict:
     for key, value in data.items():
         if isinstance(value, Decimal):
@@ -97,28 +37,25 @@ async def create_workout_routine(
     workout_routine_record: WorkoutRoutineCreate,
     user_id: UUID = Depends(get_current_user),
 ):
-    response = (
+    response = await run_query(
         supabase.table("workout_routines")
         .insert({
             "user_id": str(user_id),
             "routine_name": workout_routine_record.routine_name,
             "description": workout_routine_record.description,
         })
-        .execute()
     )
     return {"data": response.data[0]}
 
 
-@router.get("/workout-routines", response_model=DataResponse[list[WorkoutRoutineResponse]])
+@router.get("/workout-routines", response_model=PageResponse[WorkoutRoutineResponse])
 @limiter.limit("30/minute")
-async def get_all_workout_routines(request: Request, user_id: UUID = Depends(get_current_user)):
-    response = (
-        supabase.table("workout_routines")
-        .select("*")
-        .eq("user_id", str(user_id))
-        .execute()
-    )
-    return {"data": response.data}
+async def get_all_workout_routines(
+    request: Request,
+    page: PageParams = Depends(),
+    user_id: UUID = Depends(get_current_user),
+):
+    return await paginate(WORKOUT_ROUTINES.select(user_id), page, "created_at", WORKOUT_ROUTINES.id_column)
 
 
 @router.put("/workout-routines/{routine_id}", response_model=DataResponse[WorkoutRoutineResponse])
@@ -129,18 +66,9 @@ async def update_workout_routine(
     updated_record: WorkoutRoutineUpdate,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_routine_ownership(routine_id, user_id)
-
     update_data = updated_record.model_dump(exclude_unset=True)
 
-    response = (
-        supabase.table("workout_routines")
-        .update(update_data)
-        .eq("id", routine_id)
-        .eq("user_id", str(user_id))
-        .execute()
-    )
-    return {"data": response.data[0]}
+    return {"data": await WORKOUT_ROUTINES.update(routine_id, user_id, update_data)}
 
 
 @router.delete("/workout-routines/{routine_id}", status_code=204)
@@ -150,8 +78,7 @@ async def delete_workout_routine(
     routine_id: int,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_routine_ownership(routine_id, user_id)
-    supabase.table("workout_routines").delete().eq("id", routine_id).eq("user_id", str(user_id)).execute()
+    await WORKOUT_ROUTINES.delete(routine_id, user_id)
     return Response(status_code=204)
 
 
@@ -167,9 +94,9 @@ async def add_exercise_to_routine(
     routine_exercise_record: RoutineExerciseRecordCreate,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_routine_ownership(routine_id, user_id)
+    await WORKOUT_ROUTINES.verify(routine_id, user_id)
 
-    response = (
+    response = await run_query(
         supabase.table("routine_exercises")
         .insert({
             "routine_id": routine_id,
@@ -177,7 +104,6 @@ async def add_exercise_to_routine(
             "order_index": routine_exercise_record.order_index,
             "notes": routine_exercise_record.notes,
         })
-        .execute()
     )
     return {"data": response.data[0]}
 
@@ -189,14 +115,13 @@ async def get_exercises_in_routine(
     routine_id: int,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_routine_ownership(routine_id, user_id)
+    await WORKOUT_ROUTINES.verify(routine_id, user_id)
 
-    response = (
+    response = await run_query(
         supabase.table("routine_exercises")
         .select("*")
         .eq("routine_id", routine_id)
         .order("order_index", desc=False)
-        .execute()
     )
     return {"data": response.data}
 
@@ -209,17 +134,9 @@ async def update_routine_exercise(
     updated_record: RoutineExerciseRecordUpdate,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_routine_exercise_ownership(routine_exercise_id, user_id)
-
     update_data = updated_record.model_dump(exclude_unset=True)
 
-    response = (
-        supabase.table("routine_exercises")
-        .update(update_data)
-        .eq("id", routine_exercise_id)
-        .execute()
-    )
-    return {"data": response.data[0]}
+    return {"data": await ROUTINE_EXERCISES.update(routine_exercise_id, user_id, update_data)}
 
 
 @router.delete("/routine-exercises/{routine_exercise_id}", status_code=204)
@@ -229,8 +146,7 @@ async def delete_routine_exercise(
     routine_exercise_id: int,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_routine_exercise_ownership(routine_exercise_id, user_id)
-    supabase.table("routine_exercises").delete().eq("id", routine_exercise_id).execute()
+    await ROUTINE_EXERCISES.delete(routine_exercise_id, user_id)
     return Response(status_code=204)
 
 
@@ -246,9 +162,9 @@ async def add_set_to_routine_exercise(
     routine_set_record: RoutineSetRecordCreate,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_routine_exercise_ownership(routine_exercise_id, user_id)
+    await ROUTINE_EXERCISES.verify(routine_exercise_id, user_id)
 
-    response = (
+    response = await run_query(
         supabase.table("routine_sets")
         .insert({
             "routine_exercise_id": routine_exercise_id,
@@ -258,7 +174,6 @@ async def add_set_to_routine_exercise(
             "rest_seconds": int(routine_set_record.rest_seconds) if routine_set_record.rest_seconds else None,
             "set_order": routine_set_record.set_order,
         })
-        .execute()
     )
     return {"data": response.data[0]}
 
@@ -270,13 +185,12 @@ async def get_sets_in_routine_exercise(
     routine_exercise_id: int,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_routine_exercise_ownership(routine_exercise_id, user_id)
+    await ROUTINE_EXERCISES.verify(routine_exercise_id, user_id)
 
-    response = (
+    response = await run_query(
         supabase.table("routine_sets")
         .select("*")
         .eq("routine_exercise_id", routine_exercise_id)
-        .execute()
     )
     return {"data": response.data}
 
@@ -288,19 +202,7 @@ async def get_routine_set_by_id(
     set_id: int,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_routine_set_ownership(set_id, user_id)
-
-    response = (
-        supabase.table("routine_sets")
-        .select("*")
-        .eq("id", set_id)
-        .execute()
-    )
-
-    if not response.data:
-        raise HTTPException(status_code=404, detail="Routine set not found")
-
-    return {"data": response.data[0]}
+    return {"data": await ROUTINE_SETS.get(set_id, user_id)}
 
 
 @router.put("/routine-sets/{set_id}", response_model=DataResponse[RoutineSetResponse])
@@ -311,18 +213,10 @@ async def update_routine_set(
     updated_record: RoutineSetRecordUpdate,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_routine_set_ownership(set_id, user_id)
-
     update_data = updated_record.model_dump(exclude_unset=True)
     update_data = convert_decimals_to_float(update_data)
 
-    response = (
-        supabase.table("routine_sets")
-        .update(update_data)
-        .eq("id", set_id)
-        .execute()
-    )
-    return {"data": response.data[0]}
+    return {"data": await ROUTINE_SETS.update(set_id, user_id, update_data)}
 
 
 @router.delete("/routine-sets/{set_id}", status_code=204)
@@ -332,6 +226,5 @@ async def delete_routine_set(
     set_id: int,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_routine_set_ownership(set_id, user_id)
-    supabase.table("routine_sets").delete().eq("id", set_id).execute()
+    await ROUTINE_SETS.delete(set_id, user_id)
     return Response(status_code=204)
@@ -1,99 +1,89 @@
-from datetime import datetime, date, timedelta, timezone
+import asyncio
+from datetime import datetime, date, time, timedelta, timezone
+from typing import Literal, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Request, Response
-from api.db.supabase import supabase
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from api.db.supabase import supabase, run_query
+from api.db.repository import SCHEDULES
+from api.dosing.adherence import adherence_by_medication, period_starts
+from api.dosing.forecast import invalidate_forecast
+from api.dosing.occurrences import STATUS_NAMES, ScheduleSet
+from api.jobs.missed_doses import dose_scheduler, track_schedule
+from api.medications.catalog import medication_cache
 from api.auth.auth import get_current_user
 from api.schemas.schedule_record import (
     ScheduleCreate,
     ScheduleUpdate,
     ScheduleResponse,
     IntakeLogCreate,
-    IntakeLogResponse,
+    DoseLogResponse,
     TodayDoseItem,
+    TimelineDose,
+    AdherencePeriod,
 )
 from api.schemas.common import DataResponse
 from api.limiter import limiter
 
 router = APIRouter(prefix="/api", tags=["Schedules"])
 
-
-def verify_schedule_ownership(schedule_id: int, user_id: UUID):
-    result = (
-        supabase.table("user_medication_schedule")
-        .select("schedule_id, user_id")
-        .eq("schedule_id", schedule_id)
-        .eq("user_id", str(user_id))
-        .is_("deleted_at", "null")
-        .execute()
-    )
-
-    if not result.data:
-        raise HTTPException(status_code=404, detail="Schedule not found")
-
-    if result.data[0]["user_id"] != str(user_id):
-        raise HTTPException(status_code=403, detail="Not authorized")
+MAX_TIMELINE_DAYS = 92
+MAX_ADHERENCE_PERIODS = 53
+ROLLUP_PAGE_SIZE = 1000
 
 
-@router.get("/schedules", response_model=DataResponse[list[ScheduleResponse]])
-@limiter.limit("30/minute")
-async def get_schedules(request: Request, user_id: UUID = Depends(get_current_user)):
-    schedules = (
-        supabase.table("user_medication_schedule")
-        .select("*")
-        .eq("user_id", str(user_id))
-        .is_("deleted_at", "null")
-        .execute()
-    ).data
+# ------------------------------------------------------------------
+# Helpers
+# ------------------------------------------------------------------
 
-    if not schedules:
-        return {"data": []}
+async def get_medication_names(schedules: list[dict]) -> dict[int, str]:
+    medications = await medication_cache.get_many(s["medication_id"] for s in schedules)
+    return {medication_id: m["name"] for medication_id, m in medications.items()}
 
-    medication_ids = list({s["medication_id"] for s in schedules}) #using list to make sure medication only gets added once (even if in multiple schedules)
-    medications = (
-        supabase.table("medications")
-        .select("medication_id, name")
-        .in_("medication_id", medication_ids)
-        .execute()
-    ).data
-    medication_names = {m["medication_id"]: m["name"] for m in medications}
 
+async def get_stock_units(schedules: list[dict]) -> dict[int, str]:
     stock_ids = [s["stock_id"] for s in schedules if s.get("stock_id")]
-    stock_units = {}
-    if stock_ids:
-        stock_rows = (
-            supabase.table("user_medication_stock")
-            .select("stock_id, unit")
-            .in_("stock_id", stock_ids)
-            .execute()
-        ).data
-        stock_units = {s["stock_id"]: s["unit"] for s in stock_rows}
-
-    result = []
-    for s in schedules:
-        result.append(ScheduleResponse(
-            **s,
-            medication_name=medication_names.get(s["medication_id"]),
-            stock_unit=stock_units.get(s.get("stock_id")),
-        ))
-
-    return {"data": result}
-
-
-@router.get("/schedules/today", response_model=DataResponse[list[TodayDoseItem]])
-@limiter.limit("30/minute")
-async def get_schedules_today(request: Request, user_id: UUID = Depends(get_current_user)):
+    if not stock_ids:
+        return {}
+    stock_rows = (await run_query(
+        supabase.table("user_medication_stock")
+        .select("stock_id, unit")
+        .in_("stock_id", stock_ids)
+    )).data
+    return {s["stock_id"]: s["unit"] for s in stock_rows}
+
+
+async def get_adherence_rollups(user_id: UUID, schedule_ids: list[int], since: date) -> list[dict]:
+    """Daily taken/missed rows since a date, paged past PostgREST's row cap."""
+    rows = []
+    while True:
+        page = (await run_query(
+            supabase.table("user_medication_adherence_daily")
+            .select("schedule_id, day, taken, missed")
+            .eq("user_id", str(user_id))
+            .in_("schedule_id", schedule_ids)
+            .gte("day", since.isoformat())
+            .order("schedule_id")
+            .order("day")
+            .range(len(rows), len(rows) + ROLLUP_PAGE_SIZE - 1)
+        )).data
+        rows.extend(page)
+        if len(page) < ROLLUP_PAGE_SIZE:
+            return rows
+
+
+async def get_today_doses(user_id: UUID) -> list[TodayDoseItem]:
+    """Today's active schedules with their log status; shared with the /today dashboard."""
     today = date.today().isoformat()
     now = datetime.now(timezone.utc)
 
-    schedules = (
+    schedules = (await run_query(
         supabase.table("user_medication_schedule")
         .select("*")
         .eq("user_id", str(user_id))
         .lte("start_date", today)
         .is_("deleted_at", "null")
-        .execute()
-    ).data
+    )).data
 
     active_schedules = [
         s for s in schedules
@@ -101,38 +91,23 @@ async def get_schedules_today(request: Request, user_id: UUID = Depends(get_curr
     ]
 
     if not active_schedules:
-        return {"data": []}
-
-    medication_ids = list({s["medication_id"] for s in active_schedules})
-    medications = (
-        supabase.table("medications")
-        .select("medication_id, name")
-        .in_("medication_id", medication_ids)
-        .execute()
-    ).data
-    medication_names = {m["medication_id"]: m["name"] for m in medications}
-
-    stock_ids = [s["stock_id"] for s in active_schedules if s.get("stock_id")]
-    stock_units = {}
-    if stock_ids:
-        stock_rows = (
-            supabase.table("user_medication_stock")
-            .select("stock_id, unit")
-            .in_("stock_id", stock_ids)
-            .execute()
-        ).data
-        stock_units = {s["stock_id"]: s["unit"] for s in stock_rows}
+        return []
 
+    # Names, units and today's logs only depend on the schedule rows, so the three
+    # lookups run concurrently: two round trips on the critical path instead of four.
     schedule_ids = [s["schedule_id"] for s in active_schedules]
-    logs = (
-        supabase.table("user_medication_intake_logs")
-        .select("*")
-        .in_("schedule_id", schedule_ids)
-        .eq("user_id", str(user_id))
-        .gte("taken_at", today)
-        .execute()
-    ).data
-    logs_by_schedule = {log["schedule_id"]: log for log in logs}
+    medication_names, stock_units, logs = await asyncio.gather(
+        get_medication_names(active_schedules),
+        get_stock_units(active_schedules),
+        run_query(
+            supabase.table("user_medication_intake_logs")
+            .select("*")
+            .in_("schedule_id", schedule_ids)
+            .eq("user_id", str(user_id))
+            .gte("taken_at", today)
+        ),
+    )
+    logs_by_schedule = {log["schedule_id"]: log for log in logs.data}
 
     items = []
     for s in active_schedules:
@@ -163,9 +138,149 @@ async def get_schedules_today(request: Request, user_id: UUID = Depends(get_curr
             is_overdue=is_overdue,
         ))
 
+    return items
+
+
+# ------------------------------------------------------------------
+# Schedule routes
+# ------------------------------------------------------------------
+
+@router.get("/schedules", response_model=DataResponse[list[ScheduleResponse]])
+@limiter.limit("30/minute")
+async def get_schedules(request: Request, user_id: UUID = Depends(get_current_user)):
+    schedules = (await run_query(
+        supabase.table("user_medication_schedule")
+        .select("*")
+        .eq("user_id", str(user_id))
+        .is_("deleted_at", "null")
+    )).data
+
+    if not schedules:
+        return {"data": []}
+
+    # Both lookups only depend on the schedule rows, so they run concurrently.
+    medication_names, stock_units = await asyncio.gather(
+        get_medication_names(schedules),
+        get_stock_units(schedules),
+    )
+
+    result = []
+    for s in schedules:
+        result.append(ScheduleResponse(
+            **s,
+            medication_name=medication_names.get(s["medication_id"]),
+            stock_unit=stock_units.get(s.get("stock_id")),
+        ))
+
+    return {"data": result}
+
+
+@router.get("/schedules/today", response_model=DataResponse[list[TodayDoseItem]])
+@limiter.limit("30/minute")
+async def get_schedules_today(request: Request, user_id: UUID = Depends(get_current_user)):
+    return {"data": await get_today_doses(user_id)}
+
+
+@router.get("/schedules/timeline", response_model=DataResponse[list[TimelineDose]])
+@limiter.limit("30/minute")
+async def get_schedule_timeline(
+    request: Request,
+    from_: Optional[datetime] = Query(None, alias="from"),
+    to: Optional[datetime] = Query(None),
+    user_id: UUID = Depends(get_current_user),
+):
+    now = datetime.now(timezone.utc)
+    start = from_ or datetime.combine(now.date(), time.min, tzinfo=timezone.utc)
+    start = start if start.tzinfo else start.replace(tzinfo=timezone.utc)
+    end = to or start + timedelta(days=1)
+    end = end if end.tzinfo else end.replace(tzinfo=timezone.utc)
+    if not start < end <= start + timedelta(days=MAX_TIMELINE_DAYS):
+        raise HTTPException(
+            status_code=400,
+            detail=f"'to' must be after 'from' and at most {MAX_TIMELINE_DAYS} days later",
+        )
+
+    schedules = (await run_query(
+        SCHEDULES.select(user_id)
+        .lte("start_date", end.date().isoformat())
+        .or_(f"end_date.is.null,end_date.gte.{start.date().isoformat()}")
+    )).data
+    if not schedules:
+        return {"data": []}
+
+    schedule_set = ScheduleSet(schedules)
+    occurrences = schedule_set.expand(start, end)
+    if not len(occurrences):
+        return {"data": []}
+
+    # A log counts toward the slot nearest to it, so look half an interval past each edge.
+    margin = timedelta(microseconds=int(schedule_set.interval.max()) // 2)
+    medication_names, logs = await asyncio.gather(
+        get_medication_names(schedules),
+        run_query(
+            supabase.table("user_medication_intake_logs")
+            .select("intake_id, schedule_id, was_missed, taken_at")
+            .eq("user_id", str(user_id))
+            .in_("schedule_id", schedule_set.ids.tolist())
+            .gte("taken_at", (start - margin).isoformat())
+            .lt("taken_at", (end + margin).isoformat())
+        ),
+    )
+    logs = logs.data
+    occurrences.match_logs(logs)
+    overdue = occurrences.overdue(now)
+    scheduled_at = occurrences.timestamps()
+
+    items = []
+    for i in occurrences.in_time_order().tolist():
+        s = schedules[occurrences.position[i]]
+        log = logs[occurrences.log_index[i]] if occurrences.log_index[i] >= 0 else None
+        items.append({
+            "schedule_id": s["schedule_id"],
+            "medication_id": s["medication_id"],
+            "medication_name": medication_names.get(s["medication_id"], "Unknown"),
+            "scheduled_at": scheduled_at[i],
+            "dose_amount": s["dose_amount"],
+            "dose_unit": s.get("dose_unit"),
+            "status": STATUS_NAMES[occurrences.status[i]],
+            "intake_id": log["intake_id"] if log else None,
+            "taken_at": log["taken_at"] if log else None,
+            "is_overdue": bool(overdue[i]),
+        })
+
     return {"data": items}
 
 
+@router.get("/schedules/adherence", response_model=DataResponse[list[AdherencePeriod]])
+@limiter.limit("30/minute")
+async def get_schedule_adherence(
+    request: Request,
+    period: Literal["week", "month"] = Query("week"),
+    periods: int = Query(12, ge=1, le=MAX_ADHERENCE_PERIODS),
+    user_id: UUID = Depends(get_current_user),
+):
+    now = datetime.now(timezone.utc)
+    starts = period_starts(period, periods, now.date())
+
+    schedules = (await run_query(
+        SCHEDULES.select(user_id)
+        .lte("start_date", now.date().isoformat())
+        .or_(f"end_date.is.null,end_date.gte.{starts[0].isoformat()}")
+    )).data
+    if not schedules:
+        return {"data": []}
+
+    # Logs are read through the daily rollup, so a year costs at most 366 rows per schedule.
+    medication_names, rollups = await asyncio.gather(
+        get_medication_names(schedules),
+        get_adherence_rollups(user_id, [s["schedule_id"] for s in schedules], starts[0]),
+    )
+    rows = adherence_by_medication(schedules, rollups, starts, now)
+    for row in rows:
+        row["medication_name"] = medication_names.get(row["medication_id"], "Unknown")
+    return {"data": rows}
+
+
 @router.get("/schedules/{schedule_id}", response_model=DataResponse[ScheduleResponse])
 @limiter.limit("30/minute")
 async def get_schedule(
@@ -173,17 +288,7 @@ async def get_schedule(
     schedule_id: int,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_schedule_ownership(schedule_id, user_id)
-
-    response = (
-        supabase.table("user_medication_schedule")
-        .select("*")
-        .eq("schedule_id", schedule_id)
-        .eq("user_id", str(user_id))
-        .is_("deleted_at", "null")
-        .execute()
-    )
-    return {"data": response.data[0]}
+    return {"data": await SCHEDULES.get(schedule_id, user_id)}
 
 
 @router.post("/schedules", response_model=DataResponse[ScheduleResponse], status_code=201)
@@ -193,13 +298,7 @@ async def create_schedule(
     body: ScheduleCreate,
     user_id: UUID = Depends(get_current_user),
 ):
-    medication = (
-        supabase.table("medications")
-        .select("medication_id")
-        .eq("medication_id", body.medication_id)
-        .execute()
-    )
-    if not medication.data:
+    if await medication_cache.get(body.medication_id) is None:
         raise HTTPException(status_code=404, detail="Medication not found")
 
     row: dict = {
@@ -218,11 +317,12 @@ async def create_schedule(
     if body.next_dose_at is not None:
         row["next_dose_at"] = body.next_dose_at.isoformat()
 
-    response = (
+    response = await run_query(
         supabase.table("user_medication_schedule")
         .insert(row)
-        .execute()
     )
+    track_schedule(response.data[0])
+    invalidate_forecast(user_id)
     return {"data": response.data[0]}
 
 
@@ -234,8 +334,6 @@ async def update_schedule(
     body: ScheduleUpdate,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_schedule_ownership(schedule_id, user_id)
-
     update_data = body.model_dump(exclude_unset=True)
 
     if "start_date" in update_data and update_data["start_date"]:
@@ -247,14 +345,10 @@ async def update_schedule(
 
     update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
 
-    response = (
-        supabase.table("user_medication_schedule")
-        .update(update_data)
-        .eq("schedule_id", schedule_id)
-        .eq("user_id", str(user_id))
-        .execute()
-    )
-    return {"data": response.data[0]}
+    schedule = await SCHEDULES.update(schedule_id, user_id, update_data)
+    track_schedule(schedule)
+    invalidate_forecast(user_id)
+    return {"data": schedule}
 
 
 @router.delete("/schedules/{schedule_id}", status_code=204)
@@ -264,15 +358,13 @@ async def delete_schedule(
     schedule_id: int,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_schedule_ownership(schedule_id, user_id)
-
-    supabase.table("user_medication_schedule").update(
-        {"deleted_at": datetime.now(timezone.utc).isoformat()}
-    ).eq("schedule_id", schedule_id).eq("user_id", str(user_id)).execute()
+    await SCHEDULES.update(schedule_id, user_id, {"deleted_at": datetime.now(timezone.utc).isoformat()})
+    dose_scheduler.untrack(schedule_id)
+    invalidate_forecast(user_id)
     return Response(status_code=204)
 
 
-@router.post("/schedules/{schedule_id}/log", response_model=DataResponse[IntakeLogResponse], status_code=201)
+@router.post("/schedules/{schedule_id}/log", response_model=DataResponse[DoseLogResponse], status_code=201)
 @limiter.limit("30/minute")
 async def log_dose(
     request: Request,
@@ -280,53 +372,28 @@ async def log_dose(
     body: IntakeLogCreate,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_schedule_ownership(schedule_id, user_id)
-
-    schedule = (
-        supabase.table("user_medication_schedule")
-        .select("frequency_per_day, next_dose_at, dose_amount, stock_id")
-        .eq("schedule_id", schedule_id)
-        .execute()
-    ).data[0]
-
     taken_at = body.taken_at or datetime.now(timezone.utc)
 
-    response = (
-        supabase.table("user_medication_intake_logs")
-        .insert({
-            "schedule_id": schedule_id,
-            "user_id": str(user_id),
-            "dose_amount": int(schedule["dose_amount"]),
-            "was_missed": body.was_missed,
-            "taken_at": taken_at.isoformat(),
-            "notes": body.notes,
+    # Ownership check, log insert, schedule advance and stock decrement in one transaction.
+    result = await run_query(
+        supabase.rpc("log_dose", {
+            "p_schedule_id": schedule_id,
+            "p_user_id": str(user_id),
+            "p_taken_at": taken_at.isoformat(),
+            "p_was_missed": body.was_missed,
+            "p_notes": body.notes,
         })
-        .execute()
     )
-
-    if not body.was_missed:
-        current_next = schedule.get("next_dose_at")
-        frequency_per_day = schedule.get("frequency_per_day", 1)
-        interval_hours = 24 // frequency_per_day
-        if current_next:
-            base = datetime.fromisoformat(current_next)
-            if base.tzinfo is None:
-                base = base.replace(tzinfo=timezone.utc)
-            next_dose = (base + timedelta(hours=interval_hours)).isoformat()
-            supabase.table("user_medication_schedule").update({"next_dose_at": next_dose}).eq("schedule_id", schedule_id).execute()
-
-        stock_id = schedule.get("stock_id")
-        dose_amount = int(schedule["dose_amount"])
-        if stock_id:
-            stock = (
-                supabase.table("user_medication_stock")
-                .select("quantity")
-                .eq("stock_id", stock_id)
-                .execute()
-            ).data
-            if stock and stock[0]["quantity"] is not None and stock[0]["quantity"] >= dose_amount:
-                supabase.table("user_medication_stock").update(
-                    {"quantity": stock[0]["quantity"] - dose_amount}
-                ).eq("stock_id", stock_id).execute()
-
-    return {"data": response.data[0]}
+    if not result.data:
+        raise HTTPException(status_code=404, detail=SCHEDULES.not_found)
+
+    row = result.data[0]
+    track_schedule({"schedule_id": schedule_id, "next_dose_at": row["next_dose_at"]})
+    if row["stock_decremented"]:
+        invalidate_forecast(user_id)
+    return {"data": {
+        **row["intake"],
+        "next_dose_at": row["next_dose_at"],
+        "stock_quantity": row["stock_quantity"],
+        "stock_decremented": row["stock_decremented"],
+    }}
@@ -1,74 +1,65 @@
-from datetime import datetime, date, timezone
+import asyncio
+from datetime import datetime, date, timedelta, timezone
+from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Request, Response
-from api.db.supabase import supabase
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from api.db.supabase import supabase, run_query
+from api.db.repository import SUPPLEMENTS
+from api.db.pagination import PageParams, paginate
 from api.auth.auth import get_current_user
+from api.dosing.streaks import TakenDays
 from api.schemas.supplement_record import (
     SupplementCreate,
     SupplementUpdate,
     SupplementResponse,
-    SupplementLogResponse,
+    SupplementToggleResponse,
+    SupplementLogBatch,
+    SupplementHistory,
     SupplementTodayItem,
 )
-from api.schemas.common import DataResponse
+from api.schemas.common import DataResponse, PageResponse
 from api.limiter import limiter
 
 router = APIRouter(prefix="/api", tags=["Supplements"])
 
+DEFAULT_HISTORY_DAYS = 30
+MAX_HISTORY_DAYS = 366
 
-def verify_supplement_ownership(supplement_id: int, user_id: UUID):
-    result = (
-        supabase.table("user_supplements")
-        .select("supplement_id, user_id")
-        .eq("supplement_id", supplement_id)
-        .eq("user_id", str(user_id))
-        .execute()
-    )
-
-    if not result.data:
-        raise HTTPException(status_code=404, detail="Supplement not found")
-
-    if result.data[0]["user_id"] != str(user_id):
-        raise HTTPException(status_code=403, detail="Not authorized")
 
-
-@router.get("/supplements", response_model=DataResponse[list[SupplementResponse]])
+@router.get("/supplements", response_model=PageResponse[SupplementResponse])
 @limiter.limit("30/minute")
-async def get_supplements(request: Request, user_id: UUID = Depends(get_current_user)):
-    response = (
-        supabase.table("user_supplements")
-        .select("*")
-        .eq("user_id", str(user_id))
-        .execute()
-    )
-    return {"data": response.data}
+async def get_supplements(
+    request: Request,
+    page: PageParams = Depends(),
+    user_id: UUID = Depends(get_current_user),
+):
+    return await paginate(SUPPLEMENTS.select(user_id), page, "created_at", SUPPLEMENTS.id_column)
 
 
-@router.get("/supplements/today", response_model=DataResponse[list[SupplementTodayItem]])
-@limiter.limit("30/minute")
-async def get_supplements_today(request: Request, user_id: UUID = Depends(get_current_user)):
+async def get_today_supplements(user_id: UUID) -> list[SupplementTodayItem]:
+    """Every supplement with today's log status; shared with the /today dashboard."""
     today = date.today().isoformat()
 
-    supplements = (
-        supabase.table("user_supplements")
-        .select("*")
-        .eq("user_id", str(user_id))
-        .execute()
-    ).data
-
-    logs = (
-        supabase.table("user_supplement_logs")
-        .select("*")
-        .eq("user_id", str(user_id))
-        .eq("log_date", today)
-        .execute()
-    ).data
+    # Neither query depends on the other, so they run concurrently.
+    supplements, logs = await asyncio.gather(
+        run_query(
+            supabase.table("user_supplements")
+            .select("*")
+            .eq("user_id", str(user_id))
+        ),
+        run_query(
+            supabase.table("user_supplement_logs")
+            .select("*")
+            .eq("user_id", str(user_id))
+            .eq("log_date", today)
+        ),
+    )
 
-    logs_by_supplement = {log["supplement_id"]: log for log in logs}
+    logs_by_supplement = {log["supplement_id"]: log for log in logs.data}
 
     items = []
-    for supplement in supplements:
+    for supplement in supplements.data:
         log = logs_by_supplement.get(supplement["supplement_id"])
         items.append(
             SupplementTodayItem(
@@ -85,6 +76,57 @@ async def get_supplements_today(request: Request, user_id: UUID = Depends(get_cu
             )
         )
 
+    return items
+
+
+@router.get("/supplements/today", response_model=DataResponse[list[SupplementTodayItem]])
+@limiter.limit("30/minute")
+async def get_supplements_today(request: Request, user_id: UUID = Depends(get_current_user)):
+    return {"data": await get_today_supplements(user_id)}
+
+
+@router.get("/supplements/history", response_model=DataResponse[list[SupplementHistory]])
+@limiter.limit("30/minute")
+async def get_supplement_history(
+    request: Request,
+    from_: Optional[date] = Query(None, alias="from"),
+    to: Optional[date] = Query(None),
+    user_id: UUID = Depends(get_current_user),
+):
+    today = date.today()
+    end = to or today
+    start = from_ or end - timedelta(days=DEFAULT_HISTORY_DAYS - 1)
+    if not start <= end < start + timedelta(days=MAX_HISTORY_DAYS):
+        raise HTTPException(
+            status_code=400,
+            detail=f"'to' must not be before 'from' and at most {MAX_HISTORY_DAYS} days later",
+        )
+
+    # Taken days and the longest streak come from the bitmap the log trigger keeps
+    # up to date, so no logs are read.
+    supplements, history = await asyncio.gather(
+        run_query(SUPPLEMENTS.select(user_id, "supplement_id, name")),
+        run_query(
+            supabase.table("user_supplement_history")
+            .select("supplement_id, origin, taken, longest_streak")
+            .eq("user_id", str(user_id))
+        ),
+    )
+    history_by_supplement = {row["supplement_id"]: row for row in history.data}
+
+    items = []
+    for supplement in supplements.data:
+        row = history_by_supplement.get(supplement["supplement_id"])
+        item = {"supplement_id": supplement["supplement_id"], "name": supplement["name"]}
+        if row:
+            days = TakenDays.from_row(row)
+            item.update(
+                current_streak=days.current_streak(today),
+                longest_streak=row["longest_streak"],
+                taken_days=days.between(start, end),
+            )
+        items.append(item)
+
     return {"data": items}
 
 
@@ -95,16 +137,7 @@ async def get_supplement(
     supplement_id: int,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_supplement_ownership(supplement_id, user_id)
-
-    response = (
-        supabase.table("user_supplements")
-        .select("*")
-        .eq("supplement_id", supplement_id)
-        .eq("user_id", str(user_id))
-        .execute()
-    )
-    return {"data": response.data[0]}
+    return {"data": await SUPPLEMENTS.get(supplement_id, user_id)}
 
 
 @router.post("/supplements", response_model=DataResponse[SupplementResponse], status_code=201)
@@ -114,7 +147,7 @@ async def create_supplement(
     body: SupplementCreate,
     user_id: UUID = Depends(get_current_user),
 ):
-    response = (
+    response = await run_query(
         supabase.table("user_supplements")
         .insert({
             "user_id": str(user_id),
@@ -125,7 +158,6 @@ async def create_supplement(
             "dosage_unit": body.dosage_unit,
             "notes": body.notes,
         })
-        .execute()
     )
     return {"data": response.data[0]}
 
@@ -138,19 +170,10 @@ async def update_supplement(
     body: SupplementUpdate,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_supplement_ownership(supplement_id, user_id)
-
     update_data = body.model_dump(exclude_unset=True)
     update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
 
-    response = (
-        supabase.table("user_supplements")
-        .update(update_data)
-        .eq("supplement_id", supplement_id)
-        .eq("user_id", str(user_id))
-        .execute()
-    )
-    return {"data": response.data[0]}
+    return {"data": await SUPPLEMENTS.update(supplement_id, user_id, update_data)}
 
 
 @router.delete("/supplements/{supplement_id}", status_code=204)
@@ -160,45 +183,38 @@ async def delete_supplement(
     supplement_id: int,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_supplement_ownership(supplement_id, user_id)
-
-    supabase.table("user_supplements").delete().eq("supplement_id", supplement_id).eq("user_id", str(user_id)).execute()
+    await SUPPLEMENTS.delete(supplement_id, user_id)
     return Response(status_code=204)
 
 
-@router.post("/supplements/{supplement_id}/log", response_model=DataResponse[SupplementLogResponse])
+async def toggle_logs(user_id: UUID, supplement_ids: list[int], status: str | None = None) -> list[dict]:
+    # Ownership check, read of today's logs and the writes happen in one transaction.
+    rows = (await run_query(supabase.rpc("toggle_supplement_logs", {
+        "p_user_id": str(user_id),
+        "p_supplement_ids": supplement_ids,
+        "p_log_date": date.today().isoformat(),
+        "p_status": status,
+    }))).data
+    if not rows:
+        raise HTTPException(status_code=404, detail=SUPPLEMENTS.not_found)
+    return rows
+
+
+@router.post("/supplements/log/batch", response_model=DataResponse[list[SupplementToggleResponse]])
 @limiter.limit("30/minute")
-async def toggle_supplement_log(
+async def toggle_supplement_logs(
     request: Request,
-    supplement_id: int,
+    body: SupplementLogBatch,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_supplement_ownership(supplement_id, user_id)
+    return {"data": await toggle_logs(user_id, body.supplement_ids, body.status)}
 
-    today = date.today().isoformat()
 
-    existing_log = (
-        supabase.table("user_supplement_logs")
-        .select("*")
-        .eq("supplement_id", supplement_id)
-        .eq("user_id", str(user_id))
-        .eq("log_date", today)
-        .execute()
-    ).data
-
-    if existing_log and existing_log[0]["status"] == "taken":
-        supabase.table("user_supplement_logs").delete().eq("log_id", existing_log[0]["log_id"]).execute()
-        return {"data": {"supplement_id": supplement_id, "log_date": today, "status": "pending"}}
-
-    response = (
-        supabase.table("user_supplement_logs")
-        .upsert({
-            "supplement_id": supplement_id,
-            "user_id": str(user_id),
-            "log_date": today,
-            "status": "taken",
-            "taken_at": datetime.now(timezone.utc).isoformat(),
-        }, on_conflict="supplement_id,log_date")
-        .execute()
-    )
-    return {"data": response.data[0]}
+@router.post("/supplements/{supplement_id}/log", response_model=DataResponse[SupplementToggleResponse])
+@limiter.limit("30/minute")
+async def toggle_supplement_log(
+    request: Request,
+    supplement_id: int,
+    user_id: UUID = Depends(get_current_user),
+):
+    return {"data": (await toggle_logs(user_id, [supplement_id]))[0]}
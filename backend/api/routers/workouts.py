@@ -1,13 +1,15 @@
 from decimal import Decimal
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Request, Response
-from api.db.supabase import supabase
-from api.schemas.workout_record import WorkoutRecordCreate, WorkoutRecordUpdate, WorkoutResponse
+from api.db.supabase import supabase, run_query
+from api.db.repository import WORKOUTS, WORKOUT_EXERCISES, SETS
+from api.db.pagination import PageParams, paginate
+from api.schemas.workout_record import WorkoutRecordCreate, WorkoutRecordUpdate, WorkoutResponse, WorkoutDetailResponse
 from api.schemas.workout_exercise_record import WorkoutExerciseRecordCreate, WorkoutExerciseRecordUpdate, WorkoutExerciseResponse
-from api.schemas.set_record import SetRecordCreate, SetRecordUpdate, SetResponse
-from api.schemas.common import DataResponse
+from api.schemas.set_record import SetRecordCreate, SetRecordBatch, SetRecordUpdate, SetResponse
+from api.schemas.common import DataResponse, PageResponse
 from api.auth.auth import get_current_user
 from api.limiter import limiter
 
@@ -25,72 +27,33 @@ def convert_decimals_to_float(data: dict) -> dict:
     return data
 
 
-def verify_workout_ownership(workout_id: int, user_id: UUID):
-    result = (
-        supabase.table("workouts")
-        .select("id, user_id")
-        .eq("id", workout_id)
-        .eq("user_id", str(user_id))
-        .execute()
-    )
-
-    if not result.data:
-        raise HTTPException(status_code=404, detail="Workout not found")
-
-    if str(user_id) != result.data[0]["user_id"]:
-        raise HTTPException(status_code=403, detail="Not authorized")
-
-
-def verify_workout_exercise_ownership(workout_exercise_id: int, user_id: UUID):
-    result = (
-        supabase.table("workout_exercises")
-        .select("""
-            id,
-            workout_id,
-            workouts (
-                id,
-                user_id
-            )
-        """)
-        .eq("id", workout_exercise_id)
-        .execute()
-    )
+def set_row(workout_exercise_id: int, set_record: SetRecordCreate) -> dict:
+    return {
+        "workout_exercise_id": workout_exercise_id,
+        "reps": set_record.reps,
+        "weight_kg": float(set_record.weight_kg) if set_record.weight_kg is not None else None,
+        "rest_seconds": set_record.rest_seconds,
+        "rpe": float(set_record.rpe) if set_record.rpe is not None else None,
+    }
 
-    if not result.data:
-        raise HTTPException(status_code=404, detail="Workout exercise not found")
 
-    workout = result.data[0]["workouts"]
-    workout_user_id = workout[0]["user_id"] if isinstance(workout, list) else workout["user_id"]
-    if str(user_id) != workout_user_id:
-        raise HTTPException(status_code=403, detail="Not authorized")
+# Whole workout tree in one PostgREST request: exercises (with their catalogue
+# names) and each exercise's sets are embedded under the owned workout row.
+FULL_WORKOUT_COLUMNS = (
+    "*, workout_exercises(*, exercises(exercise_name, muscle_group), sets(*))"
+)
 
 
-def verify_set_ownership(set_id: int, user_id: UUID):
-    result = (
-        supabase.table("sets")
-        .select("""
-            id,
-            workout_exercise_id,
-            workout_exercises (
-                workout_id,
-                workouts (
-                    user_id
-                )
-            )
-        """)
-        .eq("id", set_id)
-        .execute()
-    )
-
-    if not result.data:
-        raise HTTPException(status_code=404, detail="Set not found")
-
-    we = result.data[0]["workout_exercises"]
-    we = we[0] if isinstance(we, list) else we
-    workout = we["workouts"]
-    workout_user_id = workout[0]["user_id"] if isinstance(workout, list) else workout["user_id"]
-    if str(user_id) != workout_user_id:
-        raise HTTPException(status_code=403, detail="Not authorized")
+def flatten_workout_tree(workout: dict) -> dict:
+    exercises = []
+    for workout_exercise in workout.pop("workout_exercises", None) or []:
+        catalogue = workout_exercise.pop("exercises", None) or {}
+        workout_exercise["exercise_name"] = catalogue.get("exercise_name")
+        workout_exercise["muscle_group"] = catalogue.get("muscle_group")
+        workout_exercise["sets"] = workout_exercise.get("sets") or []
+        exercises.append(workout_exercise)
+    workout["exercises"] = exercises
+    return workout
 
 
 # ------------------------------------------------------------------
@@ -104,7 +67,7 @@ async def add_new_workout(
     workout_record: WorkoutRecordCreate,
     user_id: UUID = Depends(get_current_user),
 ):
-    response = (
+    response = await run_query(
         supabase.table("workouts")
         .insert({
             "user_id": str(user_id),
@@ -114,21 +77,18 @@ async def add_new_workout(
             "notes": workout_record.notes,
             "routine_id": workout_record.routine_id,
         })
-        .execute()
     )
     return {"data": response.data[0]}
 
 
-@router.get("/workouts", response_model=DataResponse[list[WorkoutResponse]])
+@router.get("/workouts", response_model=PageResponse[WorkoutResponse])
 @limiter.limit("30/minute")
-async def get_all_user_workouts(request: Request, user_id: UUID = Depends(get_current_user)):
-    response = (
-        supabase.table("workouts")
-        .select("*")
-        .eq("user_id", str(user_id))
-        .execute()
-    )
-    return {"data": response.data}
+async def get_all_user_workouts(
+    request: Request,
+    page: PageParams = Depends(),
+    user_id: UUID = Depends(get_current_user),
+):
+    return await paginate(WORKOUTS.select(user_id), page, "workout_date", WORKOUTS.id_column, sort_type=date)
 
 
 @router.get("/workouts/{workout_id}", response_model=DataResponse[WorkoutResponse])
@@ -138,15 +98,27 @@ async def get_workout_by_id(
     workout_id: int,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_workout_ownership(workout_id, user_id)
-    response = (
-        supabase.table("workouts")
-        .select("*")
+    return {"data": await WORKOUTS.get(workout_id, user_id)}
+
+
+@router.get("/workouts/{workout_id}/full", response_model=DataResponse[WorkoutDetailResponse])
+@limiter.limit("30/minute")
+async def get_full_workout(
+    request: Request,
+    workout_id: int,
+    user_id: UUID = Depends(get_current_user),
+):
+    response = await run_query(
+        WORKOUTS.select(user_id, FULL_WORKOUT_COLUMNS)
         .eq("id", workout_id)
-        .eq("user_id", str(user_id))
-        .execute()
+        .order("order_index", foreign_table="workout_exercises")
+        .order("id", foreign_table="workout_exercises")
+        .order("id", foreign_table="workout_exercises.sets")
     )
-    return {"data": response.data[0]}
+    if not response.data:
+        raise HTTPException(status_code=404, detail=WORKOUTS.not_found)
+
+    return {"data": flatten_workout_tree(response.data[0])}
 
 
 @router.put("/workouts/{workout_id}", response_model=DataResponse[WorkoutResponse])
@@ -157,19 +129,10 @@ async def update_workout(
     updated_record: WorkoutRecordUpdate,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_workout_ownership(workout_id, user_id)
-
     update_data = updated_record.model_dump(exclude_unset=True)
     update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
 
-    response = (
-        supabase.table("workouts")
-        .update(update_data)
-        .eq("id", workout_id)
-        .eq("user_id", str(user_id))
-        .execute()
-    )
-    return {"data": response.data[0]}
+    return {"data": await WORKOUTS.update(workout_id, user_id, update_data)}
 
 
 @router.delete("/workouts/{workout_id}", status_code=204)
@@ -179,8 +142,7 @@ async def delete_workout(
     workout_id: int,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_workout_ownership(workout_id, user_id)
-    supabase.table("workouts").delete().eq("id", workout_id).eq("user_id", str(user_id)).execute()
+    await WORKOUTS.delete(workout_id, user_id)
     return Response(status_code=204)
 
 
@@ -196,15 +158,14 @@ async def add_exercise_to_workout(
     workout_exercise_record: WorkoutExerciseRecordCreate,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_workout_ownership(workout_id, user_id)
-    response = (
+    await WORKOUTS.verify(workout_id, user_id)
+    response = await run_query(
         supabase.table("workout_exercises")
         .insert({
             "workout_id": workout_id,
             "exercise_id": workout_exercise_record.exercise_id,
             "order_index": workout_exercise_record.order_index,
         })
-        .execute()
     )
     return {"data": response.data[0]}
 
@@ -216,12 +177,11 @@ async def get_exercises_in_workout(
     workout_id: int,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_workout_ownership(workout_id, user_id)
-    response = (
+    await WORKOUTS.verify(workout_id, user_id)
+    response = await run_query(
         supabase.table("workout_exercises")
         .select("*")
         .eq("workout_id", workout_id)
-        .execute()
     )
     return {"data": response.data}
 
@@ -234,16 +194,8 @@ async def update_workout_exercise(
     updated_data: WorkoutExerciseRecordUpdate,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_workout_exercise_ownership(workout_exercise_id, user_id)
-
     update_payload = updated_data.model_dump(exclude_unset=True)
-    response = (
-        supabase.table("workout_exercises")
-        .update(update_payload)
-        .eq("id", workout_exercise_id)
-        .execute()
-    )
-    return {"data": response.data[0]}
+    return {"data": await WORKOUT_EXERCISES.update(workout_exercise_id, user_id, update_payload)}
 
 
 @router.delete("/workout-exercises/{workout_exercise_id}", status_code=204)
@@ -253,8 +205,7 @@ async def delete_exercise_from_workout(
     workout_exercise_id: int,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_workout_exercise_ownership(workout_exercise_id, user_id)
-    supabase.table("workout_exercises").delete().eq("id", workout_exercise_id).execute()
+    await WORKOUT_EXERCISES.delete(workout_exercise_id, user_id)
     return Response(status_code=204)
 
 
@@ -270,21 +221,28 @@ async def add_set_to_workout_exercise(
     set_record: SetRecordCreate,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_workout_exercise_ownership(workout_exercise_id, user_id)
-    response = (
-        supabase.table("sets")
-        .insert({
-            "workout_exercise_id": workout_exercise_id,
-            "reps": set_record.reps,
-            "weight_kg": float(set_record.weight_kg) if set_record.weight_kg is not None else None,
-            "rest_seconds": set_record.rest_seconds,
-            "rpe": float(set_record.rpe) if set_record.rpe is not None else None,
-        })
-        .execute()
-    )
+    await WORKOUT_EXERCISES.verify(workout_exercise_id, user_id)
+    response = await run_query(supabase.table("sets").insert(set_row(workout_exercise_id, set_record)))
     return {"data": response.data[0]}
 
 
+@router.post("/workout-exercises/{workout_exercise_id}/sets/batch", response_model=DataResponse[list[SetResponse]], status_code=201)
+@limiter.limit("15/minute")
+async def add_sets_to_workout_exercise(
+    request: Request,
+    workout_exercise_id: int,
+    set_records: SetRecordBatch,
+    user_id: UUID = Depends(get_current_user),
+):
+    await WORKOUT_EXERCISES.verify(workout_exercise_id, user_id)
+    # One multi-row INSERT is a single statement, so either every set is stored or none is.
+    response = await run_query(
+        supabase.table("sets").insert([set_row(workout_exercise_id, record) for record in set_records])
+    )
+    # Ids are assigned in VALUES order; sort so the reply matches the request.
+    return {"data": sorted(response.data, key=lambda row: row["id"])}
+
+
 @router.get("/workout-exercises/{workout_exercise_id}/sets", response_model=DataResponse[list[SetResponse]])
 @limiter.limit("30/minute")
 async def get_sets_for_workout_exercise(
@@ -292,12 +250,11 @@ async def get_sets_for_workout_exercise(
     workout_exercise_id: int,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_workout_exercise_ownership(workout_exercise_id, user_id)
-    response = (
+    await WORKOUT_EXERCISES.verify(workout_exercise_id, user_id)
+    response = await run_query(
         supabase.table("sets")
         .select("*")
         .eq("workout_exercise_id", workout_exercise_id)
-        .execute()
     )
     return {"data": response.data}
 
@@ -310,13 +267,10 @@ async def update_set(
     updated_record: SetRecordUpdate,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_set_ownership(set_id, user_id)
-
     update_data = updated_record.model_dump(exclude_unset=True)
     update_data = convert_decimals_to_float(update_data)
 
-    response = supabase.table("sets").update(update_data).eq("id", set_id).execute()
-    return {"data": response.data[0]}
+    return {"data": await SETS.update(set_id, user_id, update_data)}
 
 
 @router.delete("/sets/{set_id}", status_code=204)
@@ -326,6 +280,5 @@ async def delete_set(
     set_id: int,
     user_id: UUID = Depends(get_current_user),
 ):
-    verify_set_ownership(set_id, user_id)
-    supabase.table("sets").delete().eq("id", set_id).execute()
+    await SETS.delete(set_id, user_id)
     return Response(status_code=204)
@@ -1,4 +1,4 @@
-from typing import TypeVar, Generic
+from typing import Generic, Optional, TypeVar
 from pydantic import BaseModel
 
 T = TypeVar("T")
@@ -10,3 +10,8 @@ class DataResponse(BaseModel, Generic[T]):
 
 class SuccessResponse(BaseModel):
     success: bool
+
+
+class PageResponse(BaseModel, Generic[T]):
+    data: list[T]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+
+from api.schemas.schedule_record import TodayDoseItem
+from api.schemas.supplement_record import SupplementTodayItem
+
+
+class TodayDashboard(BaseModel):
+    doses: list[TodayDoseItem]
+    supplements: list[SupplementTodayItem]
@@ -13,6 +13,20 @@ class MedicationResponse(BaseModel):
     updated_at: Optional[datetime] = None
 
 
+class MedicationSuggestion(BaseModel):
+    rxcui: str
+    name: str
+    tty: Optional[str] = None
+
+
+class MedicationMatch(BaseModel):
+    medication_id: int
+    rxcui: str
+    name: str
+    is_brand: bool
+    distance: int = Field(..., description="Summed edit distance of the matched words")
+
+
 class MedicationRecordCreate(BaseModel):
     model_config = {"str_strip_whitespace": True}
 
@@ -67,6 +67,12 @@ class IntakeLogResponse(BaseModel):
     created_at: datetime
 
 
+class DoseLogResponse(IntakeLogResponse):
+    next_dose_at: Optional[datetime] = None
+    stock_quantity: Optional[float] = None
+    stock_decremented: bool = False
+
+
 class TodayDoseItem(BaseModel):
     schedule_id: int
     medication_id: int
@@ -80,3 +86,26 @@ class TodayDoseItem(BaseModel):
     status: str = "pending"
     taken_at: Optional[datetime] = None
     is_overdue: bool = False
+
+
+class AdherencePeriod(BaseModel):
+    medication_id: int
+    medication_name: str
+    period_start: date
+    expected: int
+    taken: int
+    missed: int
+    adherence: Optional[float] = None
+
+
+class TimelineDose(BaseModel):
+    schedule_id: int
+    medication_id: int
+    medication_name: str
+    scheduled_at: datetime
+    dose_amount: float
+    dose_unit: Optional[str] = None
+    status: str = "pending"
+    intake_id: Optional[int] = None
+    taken_at: Optional[datetime] = None
+    is_overdue: bool = False
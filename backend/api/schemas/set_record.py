@@ -40,4 +40,7 @@ class SetRecordUpdate(BaseModel):
     reps:         Optional[Reps]        = None
     weight_kg:    Optional[WeightKg]    = None
     rest_seconds: Optional[RestSeconds] = None
-    rpe:          Optional[Rpe]         = None
\ No newline at end of file
+    rpe:          Optional[Rpe]         = None
+
+# Sets logged for one exercise in a single request.
+SetRecordBatch = Annotated[list[SetRecordCreate], Field(min_length=1, max_length=50)]
@@ -16,6 +16,17 @@ class StockRecordResponse(BaseModel):
     created_at: datetime
 
 
+class StockForecast(BaseModel):
+    stock_id: int
+    medication_id: int
+    quantity: Optional[int] = None
+    unit: Optional[str] = None
+    daily_usage: float
+    days_remaining: Optional[float] = None
+    depletion_date: Optional[date] = None
+    is_low: bool
+
+
 class StockRecordCreate(BaseModel):
     model_config = {"str_strip_whitespace": True}
 
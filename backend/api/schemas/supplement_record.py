@@ -1,7 +1,7 @@
 import html
 from datetime import datetime, date
 from pydantic import BaseModel, Field, field_validator
-from typing import Optional
+from typing import Literal, Optional
 
 class SupplementCreate(BaseModel):
     model_config = {"str_strip_whitespace": True}
@@ -58,6 +58,25 @@ class SupplementLogResponse(BaseModel):
     taken_at: Optional[datetime] = None
     notes: Optional[str] = None
 
+class SupplementToggleResponse(BaseModel):
+    supplement_id: int
+    log_date: date
+    status: str
+    taken_at: Optional[datetime] = None
+    log_id: Optional[int] = None
+
+class SupplementLogBatch(BaseModel):
+    supplement_ids: list[int] = Field(..., min_length=1, max_length=50)
+    # None toggles each supplement; "taken"/"pending" sets that state on all of them.
+    status: Optional[Literal["taken", "pending"]] = None
+
+class SupplementHistory(BaseModel):
+    supplement_id: int
+    name: str
+    current_streak: int = 0
+    longest_streak: int = 0
+    taken_days: list[date] = []
+
 class SupplementTodayItem(BaseModel):
     supplement_id: int
     name: str
@@ -4,6 +4,9 @@ from typing_extensions import Annotated
 from pydantic import BaseModel, Field, field_validator
 from datetime import date, datetime
 
+from api.schemas.workout_exercise_record import WorkoutExerciseResponse
+from api.schemas.set_record import SetResponse
+
 
 class WorkoutResponse(BaseModel):
     id: int
@@ -15,6 +18,16 @@ class WorkoutResponse(BaseModel):
     created_at: datetime
 
 
+class WorkoutExerciseDetail(WorkoutExerciseResponse):
+    exercise_name: Optional[str] = None
+    muscle_group: Optional[str] = None
+    sets: list[SetResponse] = []
+
+
+class WorkoutDetailResponse(WorkoutResponse):
+    exercises: list[WorkoutExerciseDetail] = []
+
+
 class WorkoutRecordCreate(BaseModel):
     model_config = {"str_strip_whitespace": True}
 
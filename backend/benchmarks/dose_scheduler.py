@@ -0,0 +1,67 @@
+"""
+Single-core throughput of the missed-dose scheduler (api/dosing/scheduler.py).
+
+Loads N schedules with random next doses, then replays a day of scheduler passes
+(one every --tick seconds of simulated time). In each pass, some reminded doses get
+logged before the grace period ends (the router's incremental `track`). The rest are
+recorded as missed and re-tracked one interval later, as record_missed_doses does.
+No database is involved: this measures the in-process bookkeeping only.
+
+Run from backend/:
+    python -m benchmarks.dose_scheduler [--schedules 300000] [--tick 30] [--logged 0.7]
+"""
+import argparse
+import random
+import resource
+import statistics
+import time
+
+from api.dosing.scheduler import DoseScheduler
+
+SECOND = 1_000_000
+HOUR = 3600 * SECOND
+DAY = 24 * HOUR
+
+
+def main(count: int, tick_seconds: int, logged_share: float) -> None:
+    rng = random.Random(1)
+    interval = {sid: DAY // rng.choice((1, 2, 3, 4)) for sid in range(1, count + 1)}
+    schedules = [(sid, rng.randrange(interval[sid])) for sid in interval]
+
+    scheduler = DoseScheduler(grace_us=2 * HOUR)
+    started = time.perf_counter()
+    scheduler.load(schedules, now_us=0)
+    load_ms = (time.perf_counter() - started) * 1000
+
+    reminders = missed = logged = 0
+    pass_ms = []
+    for now in range(0, DAY + 1, tick_seconds * SECOND):
+        started = time.perf_counter()
+        due, overdue = scheduler.advance(now, limit=count)
+        for dose in due:
+            if rng.random() < logged_share:
+                scheduler.track(dose.schedule_id, dose.due_us + interval[dose.schedule_id])
+                logged += 1
+        for dose in overdue:
+            scheduler.track(dose.schedule_id, dose.due_us + interval[dose.schedule_id])
+        pass_ms.append((time.perf_counter() - started) * 1000)
+        reminders += len(due)
+        missed += len(overdue)
+
+    events = reminders + missed + logged
+    busy = sum(pass_ms) / 1000
+    print(f"{count} schedules, one simulated day, a pass every {tick_seconds} s ({len(pass_ms)} passes)")
+    print(f"  load                 {load_ms:8.1f} ms")
+    print(f"  reminders / logged / missed   {reminders} / {logged} / {missed}")
+    print(f"  pass p50 / p99 / max {statistics.median(pass_ms):8.2f} / {statistics.quantiles(pass_ms, n=100)[98]:.2f} / {max(pass_ms):.2f} ms")
+    print(f"  events per second    {events / busy:10.0f}  ({busy:.2f} s busy of a simulated day)")
+    print(f"  peak RSS             {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:8.0f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--schedules", type=int, default=300_000)
+    parser.add_argument("--tick", type=int, default=30, help="simulated seconds between passes")
+    parser.add_argument("--logged", type=float, default=0.7, help="share of reminded doses logged in time")
+    args = parser.parse_args()
+    main(args.schedules, args.tick, args.logged)
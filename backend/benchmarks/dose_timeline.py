@@ -0,0 +1,85 @@
+"""
+Throughput of the dose occurrence engine behind GET /api/schedules/timeline.
+
+Expands a batch of schedules into every dose slot of a window and matches one intake
+log per slot, timing the array work only (no database, no JSON). The per-dose Python
+loop the engine replaces is timed alongside it for comparison.
+
+Run from backend/:
+    python -m benchmarks.dose_timeline [--schedules 5000] [--days 7]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from api.dosing.occurrences import ScheduleSet, dose_interval, parse_timestamp
+
+
+def _schedules(count: int, start: datetime) -> list[dict]:
+    rng = random.Random(1)
+    return [
+        {
+            "schedule_id": n,
+            "frequency_per_day": rng.choice((1, 2, 3, 4)),
+            "interval_hours": None,
+            "start_date": (start - timedelta(days=30)).date().isoformat(),
+            "end_date": None,
+            "next_dose_at": (start + timedelta(minutes=rng.randrange(24 * 60))).isoformat(),
+        }
+        for n in range(1, count + 1)
+    ]
+
+
+def _python_expand(schedules: list[dict], start: datetime, end: datetime) -> int:
+    slots = 0
+    for s in schedules:
+        step = dose_interval(s)
+        at = parse_timestamp(s["next_dose_at"])
+        while at > start:
+            at -= step
+        while at < end:
+            if at >= start:
+                slots += 1
+            at += step
+    return slots
+
+
+def main(count: int, days: int) -> None:
+    start = datetime(2025, 3, 1, tzinfo=timezone.utc)
+    end = start + timedelta(days=days)
+    schedules = _schedules(count, start)
+
+    began = time.perf_counter()
+    schedule_set = ScheduleSet(schedules)
+    loaded = time.perf_counter()
+    occurrences = schedule_set.expand(start, end)
+    expanded = time.perf_counter()
+
+    stamps = occurrences.timestamps()
+    logs = [
+        {"schedule_id": schedules[p]["schedule_id"], "taken_at": str(stamps[i]).replace("Z", "+00:00"), "was_missed": False}
+        for i, p in enumerate(occurrences.position.tolist())
+    ]
+    matched_from = time.perf_counter()
+    occurrences.match_logs(logs)
+    occurrences.in_time_order()
+    matched = time.perf_counter()
+
+    python_slots = _python_expand(schedules, start, end)
+    python_done = time.perf_counter()
+    assert python_slots == len(occurrences)
+
+    print(f"{count} schedules over {days} days -> {len(occurrences)} dose slots")
+    print(f"  load rows into arrays  {(loaded - began) * 1000:8.1f} ms")
+    print(f"  expand (arrays)        {(expanded - loaded) * 1000:8.1f} ms")
+    print(f"  match logs + order     {(matched - matched_from) * 1000:8.1f} ms  ({len(logs)} logs)")
+    print(f"  expand (per-dose loop) {(python_done - matched) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--schedules", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=7)
+    args = parser.parse_args()
+    main(args.schedules, args.days)
@@ -0,0 +1,73 @@
+"""
+Load test: throughput of an authenticated read endpoint as concurrent clients grow.
+
+Each request costs two database round trips (user lookup in get_current_user, then
+the collection query). With queries offloaded from the event loop, throughput should
+scale roughly linearly with concurrency until DB_MAX_CONCURRENCY is reached;
+`--inline` runs queries on the event loop (the old behaviour) for comparison, where
+throughput stays flat no matter how many clients are waiting.
+
+Run from backend/:
+    python -m benchmarks.load_async_db [--latency 0.02] [--requests 200] [--inline]
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import Executor, Future
+
+import httpx
+
+from benchmarks.stub_db import StubDB, install
+
+
+class _InlineExecutor(Executor):
+    """Runs submitted work immediately on the calling (event loop) thread."""
+
+    def submit(self, fn, /, *args, **kwargs):
+        future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+
+async def _run_level(app, token: str, concurrency: int, total: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", cookies={"access_token": token}) as client:
+        remaining = iter(range(total))
+
+        async def worker():
+            for _ in remaining:
+                resp = await client.get("/api/workouts")
+                resp.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - start
+
+
+async def main(latency: float, total: int, inline: bool) -> None:
+    from api.db import supabase as db_module
+    from api.main import app
+
+    stub = StubDB(latency=latency, rows={"workouts": []})
+    token = install(stub)
+    if inline:
+        db_module._db_executor = _InlineExecutor()
+
+    mode = "inline (event loop)" if inline else f"offloaded (pool={db_module.DB_MAX_CONCURRENCY})"
+    print(f"GET /api/workouts, {latency * 1000:.0f} ms per query, {total} requests, queries {mode}")
+    print(f"{'clients':>8} {'req/s':>10} {'speedup':>9}")
+    baseline = None
+    for concurrency in (1, 2, 4, 8, 16, 32):
+        elapsed = await _run_level(app, token, concurrency, total)
+        throughput = total / elapsed
+        baseline = baseline or throughput
+        print(f"{concurrency:>8} {throughput:>10.1f} {throughput / baseline:>8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per stub query")
+    parser.add_argument("--requests", type=int, default=200, help="requests per concurrency level")
+    parser.add_argument("--inline", action="store_true", help="run queries on the event loop (pre-offload behaviour)")
+    args = parser.parse_args()
+    asyncio.run(main(args.latency, args.requests, args.inline))
@@ -0,0 +1,100 @@
+"""
+Benchmark: latency of an ordinary endpoint while a burst of logins is being hashed.
+
+Login workers hammer POST /api/auth/login while probe clients time GET /api/workouts.
+Each configuration runs in its own process because the hash pool is sized at import.
+`--hash-workers 40 --queue-depth 1000` approximates the old behaviour of hashing on
+Starlette's shared threadpool (40 threads, no admission limit).
+
+Run from backend/:
+    python -m benchmarks.login_storm [--compare 40,1] [--duration 5] [--rounds 10]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def _storm(duration: float, logins: int, probes: int) -> dict:
+    import bcrypt
+    import httpx
+    from benchmarks.stub_db import StubDB, install
+    from api.main import app
+
+    password = "BenchPass123!"
+    hashed = bcrypt.hashpw(password.encode(), bcrypt.gensalt(int(os.environ["BCRYPT_ROUNDS"]))).decode()
+    stub = StubDB(latency=0.005, rows={"workouts": [], "refresh_tokens": []})
+    token = install(stub)
+    stub.rows["users"][0].update({"email": "bench@example.com", "password": hashed})
+
+    transport = httpx.ASGITransport(app=app)
+    probe_latencies: list[float] = []
+    login_status: dict[int, int] = {}
+    deadline = time.perf_counter() + duration
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def login_worker():
+            while time.perf_counter() < deadline:
+                resp = await client.post("/api/auth/login", json={"email": "bench@example.com", "password": password})
+                login_status[resp.status_code] = login_status.get(resp.status_code, 0) + 1
+                if resp.status_code == 503:
+                    await asyncio.sleep(0.05)
+
+        async def probe_worker():
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                resp = await client.get("/api/workouts", cookies={"access_token": token})
+                resp.raise_for_status()
+                probe_latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(login_worker() for _ in range(logins)), *(probe_worker() for _ in range(probes)))
+
+    return {
+        "p50": statistics.median(probe_latencies) * 1000,
+        "p99": _percentile(probe_latencies, 99) * 1000,
+        "probes": len(probe_latencies),
+        "logins_ok": login_status.get(200, 0),
+        "logins_503": login_status.get(503, 0),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--compare", default="40,1", help="comma-separated hash pool sizes to compare")
+    parser.add_argument("--queue-depth", type=int, default=None, help="HASH_QUEUE_DEPTH (default: 1000 for 40 workers, else 32)")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per configuration")
+    parser.add_argument("--logins", type=int, default=40, help="concurrent login clients")
+    parser.add_argument("--probes", type=int, default=4, help="concurrent GET /api/workouts clients")
+    parser.add_argument("--rounds", type=int, default=10, help="bcrypt work factor")
+    parser.add_argument("--single", type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single is not None:
+        result = asyncio.run(_storm(args.duration, args.logins, args.probes))
+        print(" ".join(f"{k}={v}" for k, v in result.items()))
+        return
+
+    print(f"{args.logins} login clients, {args.probes} probe clients, bcrypt rounds={args.rounds}, {args.duration:.0f}s each")
+    print(f"{'pool':>5} {'queue':>6} {'p50 ms':>8} {'p99 ms':>8} {'probes':>7} {'logins':>7} {'503s':>6}")
+    for workers in (int(w) for w in args.compare.split(",")):
+        queue = args.queue_depth if args.queue_depth is not None else (1000 if workers >= 40 else 32)
+        env = {**os.environ, "HASH_POOL_SIZE": str(workers), "HASH_QUEUE_DEPTH": str(queue), "BCRYPT_ROUNDS": str(args.rounds)}
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.login_storm", "--single", str(workers),
+             "--duration", str(args.duration), "--logins", str(args.logins), "--probes", str(args.probes)],
+            env=env, capture_output=True, text=True, check=True,
+        ).stdout.strip().splitlines()[-1]
+        r = dict(item.split("=") for item in out.split())
+        print(f"{workers:>5} {queue:>6} {float(r['p50']):>8.1f} {float(r['p99']):>8.1f} {r['probes']:>7} {r['logins_ok']:>7} {r['logins_503']:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Misspelled-name search latency of the in-memory medication index (api/medications/fuzzy.py).
+
+Indexes a synthetic lexicon of N medication names (a mix of brand-style single words
+and "stem N MG form" clinical-drug names), then searches for randomly chosen names
+with one or two typos (deletion, insertion, substitution or transposition) in the
+drug word. For comparison, a few of the same queries are answered by scoring every
+indexed word with the same edit-distance function. No network or database is involved.
+
+Run from backend/:
+    python -m benchmarks.medication_fuzzy [--names 100000] [--queries 20000]
+"""
+import argparse
+import random
+import resource
+import statistics
+import string
+import time
+
+import benchmarks.stub_db  # noqa: F401 (placeholder env for importing the api package)
+from api.medications.fuzzy import FuzzyIndex, allowed_distance, edit_distance
+
+FORMS = ("Oral Tablet", "Oral Capsule", "Injectable Solution", "Topical Cream", "Oral Suspension")
+
+
+def _names(count: int, rng: random.Random) -> list[str]:
+    stems = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(6, 12))) for _ in range(count // 5)]
+    names = []
+    for i in range(count):
+        stem = rng.choice(stems).capitalize()
+        if i % 4 == 0:
+            names.append(stem)
+        else:
+            names.append(f"{stem} {rng.choice((5, 10, 20, 50, 100, 250, 500))} MG {rng.choice(FORMS)}")
+    return names
+
+
+def _typo(word: str, rng: random.Random) -> str:
+    i = rng.randrange(len(word) - 1)
+    kind = rng.randrange(4)
+    if kind == 0:
+        return word[:i] + word[i + 1:]
+    if kind == 1:
+        return word[:i] + rng.choice(string.ascii_lowercase) + word[i:]
+    if kind == 2:
+        return word[:i] + rng.choice(string.ascii_lowercase) + word[i + 1:]
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def _query(name: str, rng: random.Random) -> str:
+    stem, *rest = name.lower().split()
+    for _ in range(rng.choice((1, 2))):
+        stem = _typo(stem, rng)
+    return " ".join([stem, *rest[:1]])
+
+
+def _linear(index: FuzzyIndex, query: str) -> int:
+    """Edit-distance every indexed word against the first query word."""
+    word = query.split()[0]
+    limit = allowed_distance(word)
+    return sum(edit_distance(word, candidate, limit) <= limit for candidate in index._words)
+
+
+def main(count: int, queries: int, linear: int) -> None:
+    rng = random.Random(1)
+    names = _names(count, rng)
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    index = FuzzyIndex()
+    for medication_id, name in enumerate(names, 1):
+        index.add({"medication_id": medication_id, "rxcui": str(medication_id), "name": name, "is_brand": False})
+    build_s = time.perf_counter() - started
+    rss_mb = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1024
+
+    targets = [rng.randrange(count) for _ in range(queries)]
+    typed = [_query(names[t], rng) for t in targets]
+    timings = []
+    found = 0
+    for target, query in zip(targets, typed):
+        started = time.perf_counter()
+        results = index.search(query, limit=10)
+        timings.append((time.perf_counter() - started) * 1_000_000)
+        found += any(r["medication_id"] == target + 1 for r in results)
+
+    linear_timings = []
+    for query in typed[:linear]:
+        started = time.perf_counter()
+        _linear(index, query)
+        linear_timings.append((time.perf_counter() - started) * 1000)
+
+    stats = index.stats()
+    print(f"{count} names ({stats['words']} distinct words, {stats['deletes']} delete keys) "
+          f"indexed in {build_s:.1f} s, ~{rss_mb:.0f} MB")
+    print(f"  {queries} misspelled queries (limit 10), target in results for {found}")
+    print(f"  p50 / p99        {statistics.median(timings):.0f} / {statistics.quantiles(timings, n=100)[98]:.0f} us")
+    print(f"  linear scan      {statistics.median(linear_timings):.1f} ms median over {linear} queries")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--names", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=20_000)
+    parser.add_argument("--linear", type=int, default=20, help="queries to repeat as a linear scan")
+    args = parser.parse_args()
+    main(args.names, args.queries, args.linear)
@@ -0,0 +1,115 @@
+"""
+Latency of the RxNav lookups behind GET /api/medications/search on a database miss.
+
+Starts a local stub RxNav server (uvicorn, 127.0.0.1) whose endpoints each sleep for a
+fixed latency, then times one term search plus its property lookups three ways:
+
+  before   a new httpx.AsyncClient per search, properties fetched one after another
+           (the previous router code)
+  cold     the shared pooled client with concurrent, semaphore-bounded property
+           fetches, cache cleared before every search
+  warm     the same client with its term and properties caches, over a pool of
+           repeated terms
+
+The stub is plain HTTP on loopback, so the connection setup saved by pooling is far
+cheaper here than a TLS handshake to rxnav.nlm.nih.gov; real-world gains from the
+shared client are larger than "before" vs "cold" shows.
+
+Run from backend/:
+    python -m benchmarks.rxnav_search [--latency 0.03] [--ids 6] [--searches 40] [--terms 10]
+"""
+import argparse
+import asyncio
+import socket
+import statistics
+import threading
+import time
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+
+def _stub_app(latency: float, ids: int) -> Starlette:
+    async def search(request):
+        await asyncio.sleep(latency)
+        term = request.query_params["name"]
+        return JSONResponse({"idGroup": {"rxnormId": [f"{abs(hash(term)) % 10**6}{n}" for n in range(ids)]}})
+
+    async def properties(request):
+        await asyncio.sleep(latency)
+        rxcui = request.path_params["rxcui"]
+        return JSONResponse({"properties": {"rxcui": rxcui, "name": f"drug {rxcui}", "tty": "SCD"}})
+
+    return Starlette(routes=[
+        Route("/REST/rxcui.json", search),
+        Route("/REST/rxcui/{rxcui}/properties.json", properties),
+    ])
+
+
+def _serve(app: Starlette) -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="error"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}/REST"
+
+
+async def _search_before(base_url: str, term: str) -> list[dict]:
+    async with httpx.AsyncClient() as client:
+        ids = (await client.get(f"{base_url}/rxcui.json", params={"name": term, "search": 9, "allsrc": 0}, timeout=5)).json()
+        data = []
+        for rxcui in ids["idGroup"]["rxnormId"]:
+            data.append((await client.get(f"{base_url}/rxcui/{rxcui}/properties.json", timeout=5)).json())
+        return data
+
+
+async def _time(search, terms: list[str]) -> list[float]:
+    timings = []
+    for term in terms:
+        start = time.perf_counter()
+        await search(term)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+async def main(latency: float, ids: int, searches: int, distinct_terms: int) -> None:
+    from api.medications.rxnav import RxNavClient
+
+    base_url = _serve(_stub_app(latency, ids))
+    client = RxNavClient(base_url=base_url)
+    await client.start()
+
+    async def cold(term):
+        client.clear_cache()
+        return await client.get_properties_many(await client.search_ids(term))
+
+    async def warm(term):
+        return await client.get_properties_many(await client.search_ids(term))
+
+    unique = [f"term {n}" for n in range(searches)]
+    repeated = [f"term {n % distinct_terms}" for n in range(searches)]
+    print(f"RxNav search + {ids} property lookups, {latency * 1000:.0f} ms per stub call, {searches} searches")
+    for label, search, terms in (
+        ("before", lambda term: _search_before(base_url, term), unique),
+        ("cold", cold, unique),
+        (f"warm ({distinct_terms} terms)", warm, repeated),
+    ):
+        timings = await _time(search, terms)
+        print(f"  {label:<16} p50 {statistics.median(timings):7.1f} ms   p99 {statistics.quantiles(timings, n=100)[98]:7.1f} ms")
+    await client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.03, help="seconds per stub RxNav call")
+    parser.add_argument("--ids", type=int, default=6, help="rxcuis returned per search")
+    parser.add_argument("--searches", type=int, default=40)
+    parser.add_argument("--terms", type=int, default=10, help="distinct terms in the warm run")
+    args = parser.parse_args()
+    asyncio.run(main(args.latency, args.ids, args.searches, args.terms))
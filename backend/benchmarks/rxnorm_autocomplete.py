@@ -0,0 +1,66 @@
+"""
+Prefix lookup latency of the offline RxNorm index (api/medications/rxnorm_index.py).
+
+Writes a synthetic RXNCONSO.RRF of N clinical-drug style names to a temporary
+directory, builds the index from it, then times prefix queries of 2-8 characters
+against the memory-mapped arrays. No network or database is involved.
+
+Run from backend/:
+    python -m benchmarks.rxnorm_autocomplete [--names 300000] [--queries 20000]
+"""
+import argparse
+import random
+import statistics
+import string
+import tempfile
+import time
+from pathlib import Path
+
+from api.medications.rxnorm_index import RxNormIndex, build
+
+FORMS = ("Oral Tablet", "Oral Capsule", "Injectable Solution", "Topical Cream", "Oral Suspension")
+
+
+def _write_rrf(path: Path, count: int, rng: random.Random) -> list[str]:
+    stems = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 11))) for _ in range(count // 8)]
+    names = []
+    with open(path, "w", encoding="utf-8") as rrf:
+        for rxcui in range(1, count + 1):
+            name = f"{rng.choice(stems).capitalize()} {rng.choice((5, 10, 20, 50, 100, 250, 500))} MG {rng.choice(FORMS)}"
+            names.append(name)
+            rrf.write(f"{rxcui}|ENG||||||||||RXNORM|SCD|{rxcui}|{name}||N||\n")
+    return names
+
+
+def main(count: int, queries: int) -> None:
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        names = _write_rrf(Path(tmp) / "RXNCONSO.RRF", count, rng)
+
+        started = time.perf_counter()
+        entries = build(Path(tmp) / "RXNCONSO.RRF", Path(tmp) / "index")
+        build_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        index = RxNormIndex(Path(tmp) / "index")
+        open_ms = (time.perf_counter() - started) * 1000
+
+        prefixes = [rng.choice(names)[:rng.randint(2, 8)] for _ in range(queries)]
+        timings = []
+        hits = 0
+        for prefix in prefixes:
+            started = time.perf_counter()
+            hits += bool(index.prefix(prefix, limit=10))
+            timings.append((time.perf_counter() - started) * 1_000_000)
+
+    print(f"{entries} names indexed in {build_s:.1f} s, opened in {open_ms:.2f} ms")
+    print(f"  {queries} prefix queries (limit 10), {hits} with results")
+    print(f"  p50 / p99        {statistics.median(timings):.0f} / {statistics.quantiles(timings, n=100)[98]:.0f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--names", type=int, default=300_000)
+    parser.add_argument("--queries", type=int, default=20_000)
+    args = parser.parse_args()
+    main(args.names, args.queries)
@@ -0,0 +1,87 @@
+"""
+Latency of GET /api/schedules/today with a fixed per-query database latency.
+
+The endpoint reads the user's schedules, then looks up medication names, stock units
+and today's intake logs. The three lookups only depend on the schedules, so they run
+concurrently and a request costs two query latencies instead of four. `--serial`
+shrinks the database pool to one worker, which forces the lookups back into a
+sequence and reproduces the old timing for comparison. Medication names come from
+the process-wide medication cache once the warm-up request has filled it, so timed
+requests make three queries.
+
+Run from backend/:
+    python -m benchmarks.schedules_today [--latency 0.02] [--requests 50] [--serial]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+
+import httpx
+
+from benchmarks.stub_db import StubDB, install
+
+
+def _rows(schedules: int) -> dict:
+    today = date.today().isoformat()
+    now = datetime.now(timezone.utc).isoformat()
+    return {
+        "user_medication_schedule": [
+            {
+                "schedule_id": n,
+                "medication_id": n,
+                "stock_id": n,
+                "dose_amount": 1,
+                "dose_unit": "tablet",
+                "frequency_per_day": 2,
+                "start_date": today,
+                "end_date": None,
+                "next_dose_at": now,
+            }
+            for n in range(1, schedules + 1)
+        ],
+        "medications": [{"medication_id": n, "rxcui": str(n), "name": f"Medication {n}"} for n in range(1, schedules + 1)],
+        "user_medication_stock": [{"stock_id": n, "unit": "tablet"} for n in range(1, schedules + 1)],
+        "user_medication_intake_logs": [
+            {"intake_id": 1, "schedule_id": 1, "was_missed": False, "taken_at": now},
+        ],
+    }
+
+
+async def main(latency: float, total: int, serial: bool) -> None:
+    from api.db import supabase as db_module
+    from api.main import app
+
+    stub = StubDB(latency=latency, rows=_rows(schedules=5))
+    token = install(stub)
+    if serial:
+        db_module._db_executor = ThreadPoolExecutor(max_workers=1)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", cookies={"access_token": token}) as client:
+        # First request fills the verified-user cache so only endpoint queries are timed.
+        (await client.get("/api/schedules/today")).raise_for_status()
+
+        stub.calls = 0
+        timings = []
+        for _ in range(total):
+            start = time.perf_counter()
+            (await client.get("/api/schedules/today")).raise_for_status()
+            timings.append((time.perf_counter() - start) * 1000)
+
+    mode = "serial (pool=1)" if serial else "concurrent lookups"
+    print(f"GET /api/schedules/today, {latency * 1000:.0f} ms per query, {mode}")
+    print(f"  queries/request  {stub.calls / total:.1f}")
+    print(f"  p50              {statistics.median(timings):.1f} ms")
+    print(f"  p99              {statistics.quantiles(timings, n=100)[98]:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per stub query")
+    parser.add_argument("--requests", type=int, default=50, help="sequential requests to time")
+    parser.add_argument("--serial", action="store_true", help="one database worker, so lookups run one after another")
+    args = parser.parse_args()
+    asyncio.run(main(args.latency, args.requests, args.serial))
@@ -0,0 +1,57 @@
+"""
+Stand-in for the Supabase client used by the benchmarks.
+
+Every query sleeps for a fixed latency (blocking, like the real sync client's HTTP
+round trip) and returns canned rows per table, so the numbers reflect how the API
+schedules database work rather than how fast the test project happens to be.
+"""
+import os
+import time
+import uuid
+
+os.environ.setdefault("SUPABASE_URL", "http://stub.invalid")
+os.environ.setdefault("SUPABASE_KEY", "stub")
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret")
+os.environ.setdefault("ENVIRONMENT", "test")  # disables the rate limiter
+
+from postgrest import APIResponse
+
+
+class StubQuery:
+    def __init__(self, db: "StubDB", table: str):
+        self._db = db
+        self._table = table
+
+    def __getattr__(self, _name):
+        # select/eq/in_/order/limit/insert/... — filters are irrelevant to the stub
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        self._db.calls += 1
+        time.sleep(self._db.latency)
+        return APIResponse(data=self._db.rows.get(self._table, []))
+
+
+class StubDB:
+    def __init__(self, latency: float = 0.02, rows: dict | None = None):
+        self.latency = latency
+        self.rows = rows or {}
+        self.calls = 0
+
+    def table(self, name: str) -> StubQuery:
+        return StubQuery(self, name)
+
+    def rpc(self, name: str, _params: dict | None = None) -> StubQuery:
+        return StubQuery(self, name)
+
+
+def install(stub: StubDB) -> str:
+    """Route the shared supabase client through `stub`; returns an access token for a stub user."""
+    from api.auth.jwt import create_access_token
+    from api.db.supabase import supabase
+
+    user_id = str(uuid.uuid4())
+    stub.rows.setdefault("users", [{"id": user_id}])
+    supabase.table = stub.table
+    supabase.rpc = stub.rpc
+    return create_access_token({"sub": user_id})
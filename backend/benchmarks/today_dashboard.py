@@ -0,0 +1,91 @@
+"""
+Latency of the combined GET /api/today against the two calls it replaces.
+
+The home screen used to call /api/schedules/today and then /api/supplements/today.
+/api/today authenticates once and builds both sections concurrently, so with a fixed
+per-query latency it costs two query latencies (schedules, then their lookups; the
+supplement queries overlap both) instead of the two endpoints' sum. Each response's
+Server-Timing header is averaged per section.
+
+Run from backend/:
+    python -m benchmarks.today_dashboard [--latency 0.02] [--requests 50]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections import defaultdict
+from datetime import date
+
+import httpx
+
+from benchmarks.schedules_today import _rows
+from benchmarks.stub_db import StubDB, install
+
+
+def _supplement_rows(supplements: int) -> dict:
+    today = date.today().isoformat()
+    return {
+        "user_supplements": [
+            {"supplement_id": n, "name": f"Supplement {n}", "dosage_amount": 1, "dosage_unit": "capsule"}
+            for n in range(1, supplements + 1)
+        ],
+        "user_supplement_logs": [
+            {"log_id": 1, "supplement_id": 1, "log_date": today, "status": "taken", "taken_at": None},
+        ],
+    }
+
+
+def _parse_server_timing(header: str) -> dict[str, float]:
+    sections = {}
+    for entry in header.split(","):
+        name, _, duration = entry.strip().partition(";dur=")
+        sections[name] = float(duration)
+    return sections
+
+
+async def _time(client: httpx.AsyncClient, paths: list[str], total: int) -> tuple[list[float], dict[str, list[float]]]:
+    timings = []
+    sections = defaultdict(list)
+    for _ in range(total):
+        start = time.perf_counter()
+        for path in paths:
+            response = await client.get(path)
+            response.raise_for_status()
+            header = response.headers.get("Server-Timing")
+            if header:
+                for name, ms in _parse_server_timing(header).items():
+                    sections[name].append(ms)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings, sections
+
+
+async def main(latency: float, total: int) -> None:
+    from api.main import app
+
+    stub = StubDB(latency=latency, rows={**_rows(schedules=5), **_supplement_rows(supplements=5)})
+    token = install(stub)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", cookies={"access_token": token}) as client:
+        # First request fills the verified-user cache so only endpoint queries are timed.
+        (await client.get("/api/today")).raise_for_status()
+
+        print(f"Home screen load, {latency * 1000:.0f} ms per query, {total} loads")
+        for label, paths in (
+            ("two endpoints", ["/api/schedules/today", "/api/supplements/today"]),
+            ("GET /api/today", ["/api/today"]),
+        ):
+            stub.calls = 0
+            timings, sections = await _time(client, paths, total)
+            print(f"  {label:<16} p50 {statistics.median(timings):6.1f} ms   p99 {statistics.quantiles(timings, n=100)[98]:6.1f} ms   queries/load {stub.calls / total:.1f}")
+            for name, values in sections.items():
+                print(f"    {name:<14} {statistics.mean(values):6.1f} ms (Server-Timing mean)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per stub query")
+    parser.add_argument("--requests", type=int, default=50, help="sequential loads to time per variant")
+    args = parser.parse_args()
+    asyncio.run(main(args.latency, args.requests))
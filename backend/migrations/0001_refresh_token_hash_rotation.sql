@@ -0,0 +1,42 @@
+-- Store refresh tokens by SHA-256 digest instead of the full JWT, and rotate them
+-- in a single round trip.
+
+alter table refresh_tokens add column if not exists token_hash text;
+
+update refresh_tokens
+set token_hash = encode(sha256(convert_to(token, 'UTF8')), 'hex')
+where token_hash is null;
+
+alter table refresh_tokens alter column token_hash set not null;
+create unique index if not exists refresh_tokens_token_hash_key on refresh_tokens (token_hash);
+
+alter table refresh_tokens drop column if exists token;
+
+
+-- Consumes the old token and stores its replacement in one statement. Returns the
+-- user id when rotated, and no rows when the old token is unknown, expired, already
+-- rotated, or belongs to another user. The DELETE takes the row lock, so two concurrent
+-- rotations of one token cannot both succeed.
+-- (Returns a set rather than a boolean: the Python client expects a JSON array.)
+create or replace function rotate_refresh_token(
+    p_old_hash text,
+    p_new_hash text,
+    p_user_id uuid,
+    p_expires_at timestamptz
+) returns setof uuid
+language sql
+as $$
+    with consumed as (
+        delete from refresh_tokens
+        where token_hash = p_old_hash
+          and user_id = p_user_id
+          and expires_at > now()
+        returning user_id
+    )
+    insert into refresh_tokens (user_id, token_hash, expires_at)
+    select user_id, p_new_hash, p_expires_at from consumed
+    returning user_id;
+$$;
+
+revoke execute on function rotate_refresh_token(text, text, uuid, timestamptz) from public, anon, authenticated;
+grant execute on function rotate_refresh_token(text, text, uuid, timestamptz) to service_role;
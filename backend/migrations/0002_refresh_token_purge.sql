@@ -0,0 +1,40 @@
+-- Batched cleanup of refresh_tokens: expired rows, then each user's oldest sessions
+-- beyond p_max_sessions. Each call deletes at most p_batch_size rows of each kind;
+-- the caller repeats until a call comes back short.
+
+create index if not exists refresh_tokens_expires_at_idx on refresh_tokens (expires_at);
+create index if not exists refresh_tokens_user_id_expires_at_idx on refresh_tokens (user_id, expires_at desc);
+
+create or replace function purge_refresh_tokens(
+    p_max_sessions integer,
+    p_batch_size integer
+) returns table (expired integer, over_cap integer)
+language plpgsql
+as $$
+begin
+    delete from refresh_tokens
+    where id in (
+        select id from refresh_tokens
+        where expires_at <= now()
+        order by expires_at
+        limit p_batch_size
+    );
+    get diagnostics expired = row_count;
+
+    delete from refresh_tokens
+    where id in (
+        select id from (
+            select id, row_number() over (partition by user_id order by expires_at desc) as session_rank
+            from refresh_tokens
+        ) ranked
+        where session_rank > p_max_sessions
+        limit p_batch_size
+    );
+    get diagnostics over_cap = row_count;
+
+    return next;
+end;
+$$;
+
+revoke execute on function purge_refresh_tokens(integer, integer) from public, anon, authenticated;
+grant execute on function purge_refresh_tokens(integer, integer) to service_role;
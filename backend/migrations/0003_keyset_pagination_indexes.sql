@@ -0,0 +1,21 @@
+-- Composite indexes backing keyset pagination of the per-user list endpoints.
+-- Each matches the endpoint's filter and sort: user_id equality, then
+-- (sort column, id) descending, so a page is one index range scan whatever its depth.
+
+create index if not exists workouts_user_id_workout_date_id_idx
+    on workouts (user_id, workout_date desc, id desc);
+
+create index if not exists symptom_logs_user_id_created_at_symptom_id_idx
+    on symptom_logs (user_id, created_at desc, symptom_id desc);
+
+create index if not exists body_metrics_user_id_recorded_at_id_idx
+    on body_metrics (user_id, recorded_at desc, id desc);
+
+create index if not exists user_medication_stock_user_id_created_at_stock_id_idx
+    on user_medication_stock (user_id, created_at desc, stock_id desc);
+
+create index if not exists user_supplements_user_id_created_at_supplement_id_idx
+    on user_supplements (user_id, created_at desc, supplement_id desc);
+
+create index if not exists workout_routines_user_id_created_at_id_idx
+    on workout_routines (user_id, created_at desc, id desc);
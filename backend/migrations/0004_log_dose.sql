@@ -0,0 +1,89 @@
+-- Logs one dose in a single transaction: inserts the intake log, advances the
+-- schedule's next_dose_at by one dose interval, and takes the dose out of stock.
+--
+-- Returns one row with the new log (as jsonb), the schedule's next_dose_at, the stock
+-- quantity, and whether stock was decremented. Returns no rows when the schedule does
+-- not exist, is deleted, or belongs to another user.
+--
+-- The schedule row is locked for the duration, and the stock decrement is a conditional
+-- UPDATE (quantity >= dose), so two devices logging at once can neither skip an
+-- interval nor drive stock negative. Missed doses are logged but neither advance the
+-- schedule nor touch stock. The dose interval matches api/dosing/occurrences.py:
+-- interval_hours when set, otherwise the day divided by frequency_per_day.
+
+create or replace function log_dose(
+    p_schedule_id bigint,
+    p_user_id uuid,
+    p_taken_at timestamptz,
+    p_was_missed boolean,
+    p_notes text
+) returns table (
+    intake jsonb,
+    next_dose_at timestamptz,
+    stock_quantity numeric,
+    stock_decremented boolean
+)
+language plpgsql
+as $$
+#variable_conflict use_column
+declare
+    v_schedule user_medication_schedule%rowtype;
+    v_intake user_medication_intake_logs%rowtype;
+    v_dose integer;
+begin
+    select * into v_schedule
+    from user_medication_schedule s
+    where s.schedule_id = p_schedule_id
+      and s.user_id = p_user_id
+      and s.deleted_at is null
+    for update;
+
+    if not found then
+        return;
+    end if;
+
+    v_dose := trunc(v_schedule.dose_amount)::integer;
+
+    insert into user_medication_intake_logs (schedule_id, user_id, dose_amount, was_missed, taken_at, notes)
+    values (p_schedule_id, p_user_id, v_dose, p_was_missed, p_taken_at, p_notes)
+    returning * into v_intake;
+
+    intake := to_jsonb(v_intake);
+    next_dose_at := v_schedule.next_dose_at;
+    stock_decremented := false;
+
+    if not p_was_missed then
+        if v_schedule.next_dose_at is not null then
+            update user_medication_schedule s
+            set next_dose_at = s.next_dose_at + coalesce(
+                make_interval(hours => s.interval_hours),
+                interval '1 day' / greatest(s.frequency_per_day, 1)
+            )
+            where s.schedule_id = p_schedule_id
+            returning s.next_dose_at into next_dose_at;
+        end if;
+
+        if v_schedule.stock_id is not null then
+            update user_medication_stock st
+            set quantity = st.quantity - v_dose
+            where st.stock_id = v_schedule.stock_id
+              and st.user_id = p_user_id
+              and st.quantity >= v_dose
+            returning st.quantity into stock_quantity;
+
+            stock_decremented := found;
+            if not stock_decremented then
+                select st.quantity into stock_quantity
+                from user_medication_stock st
+                where st.stock_id = v_schedule.stock_id
+                  and st.user_id = p_user_id;
+            end if;
+        end if;
+    end if;
+
+    return next;
+end;
+$$;
+
+revoke execute on function log_dose(bigint, uuid, timestamptz, boolean, text) from public, anon, authenticated;
+grant execute on function log_dose(bigint, uuid, timestamptz, boolean, text) to service_role;
@@ -0,0 +1,56 @@
+-- Records a batch of doses as missed, for the in-process missed-dose scheduler.
+--
+-- p_schedule_ids[i] is considered missed at p_due_at[i] only if the schedule still has
+-- next_dose_at = p_due_at[i] (nothing logged the dose in the meantime) and the dose
+-- falls before end_date. For those, the schedule is advanced by one dose interval and
+-- a was_missed intake log is inserted. The conditional update makes the call
+-- idempotent, so several workers can submit the same dose and only one records it.
+--
+-- Returns every requested schedule that is still active with its current next_dose_at
+-- (the advanced one where a miss was recorded, null once it passes end_date), so the
+-- caller can re-sync.
+
+create or replace function record_missed_doses(
+    p_schedule_ids bigint[],
+    p_due_at timestamptz[]
+) returns table (schedule_id bigint, next_dose_at timestamptz, missed boolean)
+language sql
+as $$
+    with due as (
+        select d.schedule_id, d.due_at
+        from unnest(p_schedule_ids, p_due_at) as d(schedule_id, due_at)
+    ),
+    advanced as (
+        update user_medication_schedule s
+        set next_dose_at = s.next_dose_at + coalesce(
+            make_interval(hours => s.interval_hours),
+            interval '1 day' / greatest(s.frequency_per_day, 1)
+        )
+        from due
+        where s.schedule_id = due.schedule_id
+          and s.next_dose_at = due.due_at
+          and s.deleted_at is null
+          and (s.end_date is null or due.due_at::date <= s.end_date)
+        returning s.schedule_id, s.user_id, s.dose_amount, s.next_dose_at, s.end_date, due.due_at
+    ),
+    logged as (
+        insert into user_medication_intake_logs (schedule_id, user_id, dose_amount, was_missed, taken_at, notes)
+        select a.schedule_id, a.user_id, trunc(a.dose_amount)::integer, true, a.due_at, 'Recorded automatically'
+        from advanced a
+    )
+    select a.schedule_id,
+           case when a.end_date is null or a.next_dose_at::date <= a.end_date then a.next_dose_at end,
+           true
+    from advanced a
+    union all
+    select s.schedule_id,
+           case when s.end_date is null or s.next_dose_at::date <= s.end_date then s.next_dose_at end,
+           false
+    from user_medication_schedule s
+    join due on due.schedule_id = s.schedule_id
+    where s.deleted_at is null
+      and s.schedule_id not in (select a.schedule_id from advanced a);
+$$;
+
+revoke execute on function record_missed_doses(bigint[], timestamptz[]) from public, anon, authenticated;
+grant execute on function record_missed_doses(bigint[], timestamptz[]) to service_role;
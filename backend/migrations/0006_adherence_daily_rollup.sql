@@ -0,0 +1,80 @@
+-- Daily taken/missed counts per schedule, for GET /schedules/adherence.
+--
+-- One row per (schedule, UTC day) with at least one intake log, kept in step with
+-- user_medication_intake_logs by a row trigger, so adherence over a year reads at most
+-- 366 rows per schedule instead of every log.
+
+create table if not exists user_medication_adherence_daily (
+    schedule_id bigint not null references user_medication_schedule (schedule_id) on delete cascade,
+    user_id uuid not null,
+    day date not null,
+    taken integer not null default 0,
+    missed integer not null default 0,
+    primary key (schedule_id, day)
+);
+
+create index if not exists user_medication_adherence_daily_user_id_day_idx
+    on user_medication_adherence_daily (user_id, day);
+
+alter table user_medication_adherence_daily enable row level security;
+
+
+-- Adds (p_sign = 1) or removes (p_sign = -1) one log's contribution to its day.
+create or replace function bump_adherence_daily(
+    p_schedule_id bigint,
+    p_user_id uuid,
+    p_taken_at timestamptz,
+    p_was_missed boolean,
+    p_sign integer
+) returns void
+language sql
+as $$
+    insert into user_medication_adherence_daily (schedule_id, user_id, day, taken, missed)
+    values (
+        p_schedule_id,
+        p_user_id,
+        (p_taken_at at time zone 'UTC')::date,
+        case when p_was_missed then 0 else p_sign end,
+        case when p_was_missed then p_sign else 0 end
+    )
+    on conflict (schedule_id, day) do update
+    set taken = user_medication_adherence_daily.taken + excluded.taken,
+        missed = user_medication_adherence_daily.missed + excluded.missed;
+$$;
+
+create or replace function maintain_adherence_daily() returns trigger
+language plpgsql
+as $$
+begin
+    if tg_op in ('UPDATE', 'DELETE') and old.schedule_id is not null then
+        perform bump_adherence_daily(old.schedule_id, old.user_id, old.taken_at, old.was_missed, -1);
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') and new.schedule_id is not null then
+        perform bump_adherence_daily(new.schedule_id, new.user_id, new.taken_at, new.was_missed, 1);
+    end if;
+    return null;
+end;
+$$;
+
+drop trigger if exists user_medication_intake_logs_adherence_daily on user_medication_intake_logs;
+create trigger user_medication_intake_logs_adherence_daily
+    after insert or update of schedule_id, taken_at, was_missed or delete on user_medication_intake_logs
+    for each row execute function maintain_adherence_daily();
+
+
+-- Backfill from existing logs. Re-running replaces the counts rather than adding to them.
+insert into user_medication_adherence_daily (schedule_id, user_id, day, taken, missed)
+select schedule_id,
+       user_id,
+       (taken_at at time zone 'UTC')::date,
+       count(*) filter (where not was_missed),
+       count(*) filter (where was_missed)
+from user_medication_intake_logs
+where schedule_id is not null
+group by schedule_id, user_id, (taken_at at time zone 'UTC')::date
+on conflict (schedule_id, day) do update
+set taken = excluded.taken,
+    missed = excluded.missed;
+
+revoke execute on function bump_adherence_daily(bigint, uuid, timestamptz, boolean, integer) from public, anon, authenticated;
+grant execute on function bump_adherence_daily(bigint, uuid, timestamptz, boolean, integer) to service_role;
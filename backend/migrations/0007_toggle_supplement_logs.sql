@@ -0,0 +1,79 @@
+-- Toggles one or more supplements' log for a day in a single transaction.
+--
+-- For each supplement a 'taken' log is deleted (back to pending) and anything else is
+-- upserted as taken. p_status = 'taken' or 'pending' sets that state instead of
+-- flipping, so "take all" leaves supplements already taken alone.
+--
+-- Returns one row per supplement with its new state (log_id and taken_at are null when
+-- pending). Returns no rows, and changes nothing, if any supplement does not exist or
+-- belongs to another user. The supplement rows are locked first, so two devices
+-- toggling at once apply one after the other instead of both reading "pending".
+
+create or replace function toggle_supplement_logs(
+    p_user_id uuid,
+    p_supplement_ids bigint[],
+    p_log_date date,
+    p_status text default null
+) returns table (
+    supplement_id bigint,
+    log_date date,
+    status text,
+    taken_at timestamptz,
+    log_id bigint
+)
+language plpgsql
+as $$
+#variable_conflict use_column
+declare
+    v_ids bigint[];
+    v_id bigint;
+    v_taken boolean;
+begin
+    select array_agg(distinct id order by id) into v_ids from unnest(p_supplement_ids) as id;
+
+    perform 1
+    from user_supplements s
+    where s.supplement_id = any(v_ids)
+      and s.user_id = p_user_id
+    order by s.supplement_id
+    for update;
+
+    if v_ids is null or (
+        select count(*) from user_supplements s
+        where s.supplement_id = any(v_ids) and s.user_id = p_user_id
+    ) <> cardinality(v_ids) then
+        return;
+    end if;
+
+    foreach v_id in array v_ids loop
+        select exists (
+            select 1 from user_supplement_logs l
+            where l.supplement_id = v_id and l.log_date = p_log_date and l.status = 'taken'
+        ) into v_taken;
+
+        supplement_id := v_id;
+        log_date := p_log_date;
+
+        if coalesce(p_status = 'pending', v_taken) then
+            delete from user_supplement_logs l
+            where l.supplement_id = v_id and l.log_date = p_log_date;
+
+            status := 'pending';
+            taken_at := null;
+            log_id := null;
+        else
+            insert into user_supplement_logs as l (supplement_id, user_id, log_date, status, taken_at)
+            values (v_id, p_user_id, p_log_date, 'taken', now())
+            on conflict (supplement_id, log_date) do update
+            set status = 'taken',
+                taken_at = case when l.status = 'taken' then l.taken_at else excluded.taken_at end
+            returning l.status, l.taken_at, l.log_id into status, taken_at, log_id;
+        end if;
+
+        return next;
+    end loop;
+end;
+$$;
+
+revoke execute on function toggle_supplement_logs(uuid, bigint[], date, text) from public, anon, authenticated;
+grant execute on function toggle_supplement_logs(uuid, bigint[], date, text) to service_role;
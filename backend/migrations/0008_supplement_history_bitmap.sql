@@ -0,0 +1,159 @@
+-- Per-supplement bitmap of taken days, for GET /supplements/history and streaks.
+--
+-- Bit i of `taken` (set_bit/get_bit order) is day origin + i, so a year of history is
+-- 46 bytes per supplement. A row trigger on user_supplement_logs sets or clears one
+-- bit per write, and keeps longest_streak current: setting a bit joins the runs on
+-- either side of it, and only clearing a bit inside a longest run rescans the bitmap.
+-- The current streak depends on today's date, so the API derives it from the bitmap.
+
+create table if not exists user_supplement_history (
+    supplement_id bigint primary key references user_supplements (supplement_id) on delete cascade,
+    user_id uuid not null,
+    origin date not null,
+    taken bytea not null,
+    longest_streak integer not null default 0,
+    updated_at timestamptz not null default now()
+);
+
+create index if not exists user_supplement_history_user_id_idx
+    on user_supplement_history (user_id);
+
+alter table user_supplement_history enable row level security;
+
+
+-- Consecutive set bits starting at p_bit and moving by p_step (1 or -1).
+create or replace function supplement_run_length(p_bits bytea, p_bit integer, p_step integer)
+returns integer
+language plpgsql
+immutable
+as $$
+declare
+    v_run integer := 0;
+begin
+    while p_bit >= 0 and p_bit < 8 * length(p_bits) and get_bit(p_bits, p_bit) = 1 loop
+        v_run := v_run + 1;
+        p_bit := p_bit + p_step;
+    end loop;
+    return v_run;
+end;
+$$;
+
+create or replace function supplement_longest_run(p_bits bytea)
+returns integer
+language plpgsql
+immutable
+as $$
+declare
+    v_longest integer := 0;
+    v_run integer := 0;
+begin
+    for i in 0 .. 8 * length(p_bits) - 1 loop
+        if get_bit(p_bits, i) = 1 then
+            v_run := v_run + 1;
+            v_longest := greatest(v_longest, v_run);
+        else
+            v_run := 0;
+        end if;
+    end loop;
+    return v_longest;
+end;
+$$;
+
+
+-- Marks one day taken or not taken in a supplement's bitmap, growing it (in whole
+-- bytes, so existing bits keep their positions) when the day falls outside it.
+create or replace function mark_supplement_day(
+    p_supplement_id bigint,
+    p_user_id uuid,
+    p_day date,
+    p_taken boolean
+) returns void
+language plpgsql
+as $$
+declare
+    v_origin date;
+    v_bits bytea;
+    v_longest integer;
+    v_pad integer;
+    v_bit integer;
+    v_run integer;
+begin
+    select h.origin, h.taken, h.longest_streak into v_origin, v_bits, v_longest
+    from user_supplement_history h
+    where h.supplement_id = p_supplement_id
+    for update;
+
+    if not found then
+        if not p_taken then
+            return;
+        end if;
+        insert into user_supplement_history (supplement_id, user_id, origin, taken)
+        values (p_supplement_id, p_user_id, p_day, '\x00'::bytea);
+        v_origin := p_day;
+        v_bits := '\x00'::bytea;
+        v_longest := 0;
+    end if;
+
+    if p_day < v_origin then
+        v_pad := (v_origin - p_day + 7) / 8;
+        v_bits := decode(repeat('00', v_pad), 'hex') || v_bits;
+        v_origin := v_origin - 8 * v_pad;
+    end if;
+
+    v_bit := p_day - v_origin;
+    if v_bit >= 8 * length(v_bits) then
+        v_bits := v_bits || decode(repeat('00', v_bit / 8 + 1 - length(v_bits)), 'hex');
+    end if;
+
+    if (get_bit(v_bits, v_bit) = 1) = p_taken then
+        return;
+    end if;
+
+    v_bits := set_bit(v_bits, v_bit, case when p_taken then 1 else 0 end);
+    v_run := 1
+        + supplement_run_length(v_bits, v_bit - 1, -1)
+        + supplement_run_length(v_bits, v_bit + 1, 1);
+
+    if p_taken then
+        v_longest := greatest(v_longest, v_run);
+    elsif v_run >= v_longest then
+        v_longest := supplement_longest_run(v_bits);
+    end if;
+
+    update user_supplement_history h
+    set origin = v_origin,
+        taken = v_bits,
+        longest_streak = v_longest,
+        updated_at = now()
+    where h.supplement_id = p_supplement_id;
+end;
+$$;
+
+create or replace function maintain_supplement_history() returns trigger
+language plpgsql
+as $$
+begin
+    if tg_op in ('UPDATE', 'DELETE') and old.status = 'taken' then
+        perform mark_supplement_day(old.supplement_id, old.user_id, old.log_date, false);
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') and new.status = 'taken' then
+        perform mark_supplement_day(new.supplement_id, new.user_id, new.log_date, true);
+    end if;
+    return null;
+end;
+$$;
+
+drop trigger if exists user_supplement_logs_history on user_supplement_logs;
+create trigger user_supplement_logs_history
+    after insert or update of status, log_date or delete on user_supplement_logs
+    for each row execute function maintain_supplement_history();
+
+
+-- Backfill from existing logs. Already-set bits are left alone, so this can be re-run.
+select mark_supplement_day(supplement_id, user_id, log_date, true)
+from user_supplement_logs
+where status = 'taken'
+order by supplement_id, log_date;
+
+revoke execute on function mark_supplement_day(bigint, uuid, date, boolean) from public, anon, authenticated;
+grant execute on function mark_supplement_day(bigint, uuid, date, boolean) to service_role;
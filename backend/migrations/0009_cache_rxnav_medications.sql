@@ -0,0 +1,20 @@
+-- Bulk insert of medications fetched from RxNav on a search miss, so the next search
+-- for the same term is answered from the medications table.
+--
+-- p_medications is a JSON array of {rxcui, name, is_brand}. Rows whose rxcui or name
+-- is already present (both are unique) are skipped rather than failing the batch, and
+-- only the newly inserted rows are returned.
+
+create or replace function cache_rxnav_medications(p_medications jsonb)
+returns setof medications
+language sql
+as $$
+    insert into medications (rxcui, name, generic_rxcui, is_brand)
+    select m.rxcui, m.name, null, m.is_brand
+    from jsonb_to_recordset(p_medications) as m(rxcui text, name text, is_brand boolean)
+    on conflict do nothing
+    returning *;
+$$;
+
+revoke execute on function cache_rxnav_medications(jsonb) from public, anon, authenticated;
+grant execute on function cache_rxnav_medications(jsonb) to service_role;
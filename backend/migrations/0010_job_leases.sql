@@ -0,0 +1,39 @@
+-- Single-runner election for background jobs that must not run in every worker.
+--
+-- Each pass, a worker calls claim_job_lease; it gets (or renews) the job's lease only
+-- if no other holder's lease is still live, and runs the pass only when it returns
+-- true. A worker that stops renewing loses the job once its lease expires.
+--
+-- A lease row rather than pg_try_advisory_lock: PostgREST runs each call in its own
+-- transaction on a pooled connection, so a session advisory lock would neither outlive
+-- the call nor be released with the worker that took it.
+
+create table if not exists job_leases (
+    job text primary key,
+    holder text not null,
+    expires_at timestamptz not null
+);
+
+alter table job_leases enable row level security;
+
+
+create or replace function claim_job_lease(
+    p_job text,
+    p_holder text,
+    p_ttl_seconds integer
+) returns boolean
+language sql
+as $$
+    with claimed as (
+        insert into job_leases as l (job, holder, expires_at)
+        values (p_job, p_holder, now() + make_interval(secs => p_ttl_seconds))
+        on conflict (job) do update
+            set holder = excluded.holder, expires_at = excluded.expires_at
+            where l.holder = excluded.holder or l.expires_at <= now()
+        returning 1
+    )
+    select exists (select 1 from claimed);
+$$;
+
+revoke execute on function claim_job_lease(text, text, integer) from public, anon, authenticated;
+grant execute on function claim_job_lease(text, text, integer) to service_role;
@@ -42,3 +42,16 @@ def test_logout_invalidates_session(test_user):
     # Auth boundary 401s use FastAPI's default {"detail":"..."} format.
     test_user.client.post("/api/auth/logout")
     assert test_user.client.get("/api/auth/me").status_code == 401
+
+
+def test_refresh_rotates_token(test_user):
+    c = test_user.client
+    old_refresh = c.cookies.get("refresh_token")
+
+    resp = c.post("/api/auth/refresh")
+    assert resp.status_code == 200
+    assert resp.cookies.get("refresh_token") not in (None, old_refresh)
+
+    # The rotated-out token is single-use.
+    c.cookies.set("refresh_token", old_refresh, path="/api/auth/refresh")
+    assert c.post("/api/auth/refresh").status_code == 401
@@ -11,6 +11,27 @@ def test_create_and_list_body_metric(test_user):
     assert any(m["weight_kg"] == 75.0 for m in data)
 
 
+def test_body_metrics_page_with_cursor(test_user):
+    for day in (1, 2, 3):
+        assert_ok(
+            test_user.client.post(
+                "/api/body-metrics",
+                json=body_metric_factory(recorded_at=f"2025-01-0{day}T08:00:00Z"),
+            ),
+            expected_status=201,
+        )
+
+    params = {"limit": 2, "from": "2025-01-01T00:00:00Z", "to": "2025-01-04T00:00:00Z"}
+    first = test_user.client.get("/api/body-metrics", params=params).json()
+    assert [m["recorded_at"][:10] for m in first["data"]] == ["2025-01-03", "2025-01-02"]
+
+    second = test_user.client.get(
+        "/api/body-metrics", params={**params, "cursor": first["next_cursor"]}
+    ).json()
+    assert [m["recorded_at"][:10] for m in second["data"]] == ["2025-01-01"]
+    assert second["next_cursor"] is None
+
+
 def test_body_metric_idor(make_user):
     owner = make_user()
     attacker = make_user()
@@ -1,37 +1,30 @@
-from unittest.mock import AsyncMock, MagicMock, patch
+from contextlib import contextmanager
+from unittest.mock import patch
 
 import httpx
 
+from api.medications.rxnav import RXNAV_BASE_URL, rxnav
 from tests.factories import medication_factory
 from tests.helpers import assert_ok
 
 
-def _make_async_client(side_effects: list) -> tuple:
-    """Return (MockClass, mock_client) ready for use in `with patch(...) as MockClass`."""
-    mock_client = AsyncMock()
-    mock_client.get = AsyncMock(side_effect=side_effects)
-    return mock_client
+@contextmanager
+def mock_rxnav(handler):
+    """Serve RxNav from `handler` on the shared client; Supabase's own httpx calls are unaffected."""
+    rxnav.clear_cache()
+    mock_client = httpx.AsyncClient(base_url=RXNAV_BASE_URL, transport=httpx.MockTransport(handler))
+    with patch.object(rxnav, "_http", mock_client):
+        yield
+    rxnav.clear_cache()
 
 
 def test_medication_search_returns_results(test_user):
-    # Patch only httpx.AsyncClient inside the medical router so Supabase's
-    # sync httpx.Client calls are unaffected and auth continues to work.
-    id_resp = MagicMock()
-    id_resp.json.return_value = {"idGroup": {"rxnormId": ["99999999"]}}
-    id_resp.raise_for_status.return_value = None
-
-    props_resp = MagicMock()
-    props_resp.json.return_value = {
-        "properties": {"rxcui": "99999999", "name": "test_drug", "tty": "SBD"}
-    }
-    props_resp.raise_for_status.return_value = None
-
-    mock_client = AsyncMock()
-    mock_client.get = AsyncMock(side_effect=[id_resp, props_resp])
-
-    with patch("api.routers.medical.httpx.AsyncClient") as MockClass:
-        MockClass.return_value.__aenter__ = AsyncMock(return_value=mock_client)
-        MockClass.return_value.__aexit__ = AsyncMock(return_value=None)
+    def handler(request):
+        if request.url.path.endswith("/rxcui.json"):
+            return httpx.Response(200, json={"idGroup": {"rxnormId": ["99999999"]}})
+        return httpx.Response(200, json={"properties": {"rxcui": "99999999", "name": "test_drug", "tty": "SBD"}})
+
+    with mock_rxnav(handler):
         resp = test_user.client.get("/api/medications/search?medication_term=ibuprofen")
 
     data = assert_ok(resp)
@@ -39,20 +32,25 @@ def test_medication_search_returns_results(test_user):
     assert len(data) > 0
 
 
-def test_medication_search_degrades_on_rxnav_503(test_user):
-    id_resp = MagicMock()
-    id_resp.raise_for_status.side_effect = httpx.HTTPStatusError(
-        "503 Service Unavailable",
-        request=MagicMock(),
-        response=MagicMock(status_code=503),
-    )
+def test_medication_search_miss_is_written_back(test_user):
+    medication = medication_factory()
+
+    def handler(request):
+        if request.url.path.endswith("/rxcui.json"):
+            return httpx.Response(200, json={"idGroup": {"rxnormId": [medication["rxcui"]]}})
+        return httpx.Response(200, json={"properties": medication})
 
-    mock_client = AsyncMock()
-    mock_client.get = AsyncMock(return_value=id_resp)
+    with mock_rxnav(handler):
+        first = assert_ok(test_user.client.get(f"/api/medications/search?medication_term={medication['name']}"))
+        second = assert_ok(test_user.client.get(f"/api/medications/search?medication_term={medication['name']}"))
 
-    with patch("api.routers.medical.httpx.AsyncClient") as MockClass:
-        MockClass.return_value.__aenter__ = AsyncMock(return_value=mock_client)
-        MockClass.return_value.__aexit__ = AsyncMock(return_value=None)
+    assert first == [{"properties": medication}]
+    assert second[0]["rxcui"] == medication["rxcui"]
+    assert "medication_id" in second[0]
+
+
+def test_medication_search_degrades_on_rxnav_503(test_user):
+    with mock_rxnav(lambda request: httpx.Response(503)):
         resp = test_user.client.get("/api/medications/search?medication_term=ibuprofen")
 
     assert resp.status_code != 500
@@ -19,17 +19,26 @@ def test_dose_log_decrements_stock(test_user):
         expected_status=201,
     )["schedule_id"]
 
-    assert_ok(
+    forecast = assert_ok(c.get("/api/medications/stock/forecast"))
+    assert [f["days_remaining"] for f in forecast if f["stock_id"] == stock_id] == [5.0]
+
+    logged = assert_ok(
         c.post(
             f"/api/schedules/{sched_id}/log",
             json={"schedule_id": sched_id, "dose_amount": 2.0, "was_missed": False},
         ),
         expected_status=201,
     )
+    assert logged["schedule_id"] == sched_id
+    assert logged["stock_decremented"] is True
+    assert logged["stock_quantity"] == 8.0
 
     remaining = assert_ok(c.get(f"/api/medications/stock/{stock_id}"))["quantity"]
     assert remaining == 8.0
 
+    low = assert_ok(c.get("/api/medications/stock/forecast", params={"low_only": True}))
+    assert [(f["stock_id"], f["days_remaining"]) for f in low] == [(stock_id, 4.0)]
+
 
 def test_schedule_idor_log(make_user):
     owner = make_user()
@@ -56,3 +65,78 @@ def test_schedule_idor_log(make_user):
         f"/api/schedules/{sched_id}/log",
         body={"schedule_id": sched_id, "dose_amount": 2.0, "was_missed": False},
     )
+
+
+def test_timeline_expands_schedule_and_marks_logged_dose(test_user):
+    c = test_user.client
+
+    med_id = assert_ok(
+        c.post("/api/medications", json=medication_factory()), expected_status=201
+    )["medication_id"]
+
+    stock_id = assert_ok(
+        c.post(f"/api/medications/{med_id}/stock", json=stock_factory()),
+        expected_status=201,
+    )["stock_id"]
+
+    sched_id = assert_ok(
+        c.post(
+            "/api/schedules",
+            json=schedule_factory(
+                med_id,
+                stock_id,
+                frequency_per_day=2,
+                interval_hours=None,
+                next_dose_at="2025-01-01T08:00:00Z",
+            ),
+        ),
+        expected_status=201,
+    )["schedule_id"]
+
+    assert_ok(
+        c.post(
+            f"/api/schedules/{sched_id}/log",
+            json={
+                "schedule_id": sched_id,
+                "dose_amount": 2.0,
+                "was_missed": False,
+                "taken_at": "2025-01-02T08:15:00Z",
+            },
+        ),
+        expected_status=201,
+    )
+
+    timeline = assert_ok(
+        c.get("/api/schedules/timeline", params={"from": "2025-01-02T00:00:00Z", "to": "2025-01-03T00:00:00Z"})
+    )
+    assert [d["scheduled_at"][11:16] for d in timeline] == ["08:00", "20:00"]
+    assert [d["status"] for d in timeline] == ["taken", "pending"]
+
+
+def test_adherence_counts_logged_doses_in_the_current_week(test_user):
+    c = test_user.client
+
+    med_id = assert_ok(
+        c.post("/api/medications", json=medication_factory()), expected_status=201
+    )["medication_id"]
+
+    stock_id = assert_ok(
+        c.post(f"/api/medications/{med_id}/stock", json=stock_factory()),
+        expected_status=201,
+    )["stock_id"]
+
+    sched_id = assert_ok(
+        c.post("/api/schedules", json=schedule_factory(med_id, stock_id)),
+        expected_status=201,
+    )["schedule_id"]
+
+    assert_ok(
+        c.post(
+            f"/api/schedules/{sched_id}/log",
+            json={"schedule_id": sched_id, "dose_amount": 2.0, "was_missed": False},
+        ),
+        expected_status=201,
+    )
+
+    adherence = assert_ok(c.get("/api/schedules/adherence", params={"period": "week", "periods": 1}))
+    assert [(row["medication_id"], row["taken"], row["missed"]) for row in adherence] == [(med_id, 1, 0)]
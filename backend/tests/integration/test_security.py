@@ -13,16 +13,27 @@ from datetime import timedelta
     ("GET",  "/api/symptoms"),
     ("POST", "/api/symptoms"),
     ("GET",  "/api/user/medications"),
+    ("GET",  "/api/medications/stock/forecast"),
+    ("GET",  "/api/medications/autocomplete?q=ab"),
+    ("GET",  "/api/medications/fuzzy?q=ab"),
     ("GET",  "/api/body-metrics"),
     ("GET",  "/api/schedules"),
+    ("GET",  "/api/today"),
+    ("GET",  "/api/schedules/adherence"),
     ("GET",  "/api/workout-plans"),
     ("GET",  "/api/workouts"),
+    ("GET",  "/api/workouts/1/full"),
+    ("GET",  "/api/metrics"),
 ])
 def test_unauthenticated_request_returns_401(client, method, path):
     resp = client.request(method, path)
     assert resp.status_code == 401
 
 
+def test_user_session_does_not_open_metrics(test_user):
+    assert test_user.client.get("/api/metrics").status_code == 401
+
+
 # --- Token integrity (Section 5.3) ---
 
 def test_expired_token_returns_401(client):
@@ -0,0 +1,29 @@
+from dataclasses import dataclass
+from uuid import UUID
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.auth.auth import get_current_user
+from api.main import app
+
+
+@dataclass
+class FakeUser:
+    client: TestClient
+    user_id: UUID
+
+
+@pytest.fixture
+def fake_user():
+    """
+    Unit-test counterpart of the integration `test_user` fixture: a TestClient whose
+    requests are authenticated as a fixed user_id, with no signup or database involved.
+    Patch the router's run_query (or helpers) to stand in for the tables it reads.
+    """
+    user_id = UUID("00000000-0000-0000-0000-000000000001")
+    app.dependency_overrides[get_current_user] = lambda: user_id
+    try:
+        yield FakeUser(client=TestClient(app), user_id=user_id)
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,55 @@
+from datetime import date, datetime, timezone
+
+from api.dosing.adherence import adherence_by_medication, period_starts
+
+NOW = datetime(2026, 3, 11, 12, 0, tzinfo=timezone.utc)  # a Wednesday
+
+
+def _schedule(schedule_id: int, medication_id: int, **overrides) -> dict:
+    return {
+        "schedule_id": schedule_id,
+        "medication_id": medication_id,
+        "frequency_per_day": 1,
+        "interval_hours": None,
+        "start_date": "2026-01-01",
+        "end_date": None,
+        "next_dose_at": "2026-03-12T08:00:00+00:00",
+        **overrides,
+    }
+
+
+def test_period_starts_step_back_by_week_and_calendar_month():
+    assert period_starts("week", 3, NOW.date()) == [date(2026, 2, 23), date(2026, 3, 2), date(2026, 3, 9)]
+    assert period_starts("month", 4, NOW.date()) == [date(2025, 12, 1), date(2026, 1, 1), date(2026, 2, 1), date(2026, 3, 1)]
+
+
+def test_adherence_groups_rollups_by_medication_and_period():
+    schedules = [_schedule(1, 10), _schedule(2, 10, frequency_per_day=2, next_dose_at=None), _schedule(3, 20)]
+    rollups = [
+        {"schedule_id": 1, "day": "2026-03-02", "taken": 1, "missed": 0},
+        {"schedule_id": 2, "day": "2026-03-03", "taken": 2, "missed": 0},
+        {"schedule_id": 2, "day": "2026-03-10", "taken": 9, "missed": 1},
+        {"schedule_id": 3, "day": "2026-02-01", "taken": 1, "missed": 0},  # before the first period
+        {"schedule_id": 99, "day": "2026-03-10", "taken": 1, "missed": 0},  # not one of the schedules
+    ]
+    rows = adherence_by_medication(schedules, rollups, period_starts("week", 2, NOW.date()), NOW)
+
+    by_key = {(row["medication_id"], row["period_start"]): row for row in rows}
+    # Medication 10, week of Mar 2: 7 + 14 slots, 3 logged.
+    assert by_key[(10, date(2026, 3, 2))] == {
+        "medication_id": 10, "period_start": date(2026, 3, 2), "expected": 21, "taken": 3, "missed": 0, "adherence": 14.3,
+    }
+    # Week of Mar 9 up to (not including) Wednesday noon: 3 + 5 slots; extra logs cap adherence at 100.
+    current = by_key[(10, date(2026, 3, 9))]
+    assert (current["expected"], current["taken"], current["missed"], current["adherence"]) == (8, 9, 1, 100.0)
+    assert by_key[(20, date(2026, 3, 9))]["adherence"] == 0.0
+    assert [row["period_start"] for row in rows] == sorted(row["period_start"] for row in rows)
+
+
+def test_periods_without_expected_doses_report_no_adherence():
+    schedules = [_schedule(1, 10, start_date="2026-03-12")]
+    rollups = [{"schedule_id": 1, "day": "2026-03-10", "taken": 1, "missed": 0}]
+    rows = adherence_by_medication(schedules, rollups, period_starts("week", 2, NOW.date()), NOW)
+    assert rows == [{
+        "medication_id": 10, "period_start": date(2026, 3, 9), "expected": 0, "taken": 1, "missed": 0, "adherence": None,
+    }]
@@ -0,0 +1,39 @@
+from api.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_entry_expires_after_ttl():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl=60, clock=clock)
+    cache.set("user", True)
+    clock.now = 59
+    assert cache.get("user") is True
+    clock.now = 61
+    assert cache.get("user") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert len(cache) == 2
+
+
+def test_invalidate_and_hit_rate():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("user", True)
+    cache.get("user")
+    cache.invalidate("user")
+    cache.get("user")
+    assert cache.stats()["hit_rate"] == 0.5
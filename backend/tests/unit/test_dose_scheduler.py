@@ -0,0 +1,121 @@
+import asyncio
+from datetime import datetime, timezone
+
+from postgrest import APIResponse
+
+from api.dosing.occurrences import from_us, to_us
+from api.dosing.scheduler import DoseQueue, DoseScheduler, DueDose
+from api.jobs import missed_doses
+
+MINUTE = 60 * 1_000_000
+
+
+def test_queue_skips_rescheduled_and_removed_entries():
+    queue = DoseQueue()
+    queue.replace([(1, 10), (2, 20), (3, 30)])
+    queue.upsert(1, 40)
+    queue.remove(2)
+    assert queue.pop_due(35, limit=10) == [3]
+    assert queue.pop_due(50, limit=10) == [1]
+    assert len(queue) == 0
+
+
+def test_dose_is_reminded_then_missed_after_grace():
+    scheduler = DoseScheduler(grace_us=30 * MINUTE)
+    scheduler.load([(1, 100 * MINUTE), (2, 200 * MINUTE)], now_us=0)
+
+    assert scheduler.advance(100 * MINUTE) == ([DueDose(1, 100 * MINUTE)], [])
+    assert scheduler.advance(129 * MINUTE) == ([], [])
+    assert scheduler.advance(130 * MINUTE) == ([], [DueDose(1, 100 * MINUTE)])
+    assert len(scheduler) == 1
+
+
+def test_logging_a_dose_before_the_grace_period_cancels_the_miss():
+    scheduler = DoseScheduler(grace_us=30 * MINUTE)
+    scheduler.load([(1, 100 * MINUTE)], now_us=0)
+    scheduler.advance(100 * MINUTE)
+
+    scheduler.track(1, 820 * MINUTE)  # dose logged, schedule advanced
+    assert scheduler.advance(200 * MINUTE) == ([], [])
+    assert scheduler.advance(820 * MINUTE) == ([DueDose(1, 820 * MINUTE)], [])
+
+
+def test_overdue_doses_are_recorded_in_batches_and_retracked(monkeypatch):
+    scheduler = DoseScheduler(grace_us=0)
+    scheduler.load([(1, 0), (2, 0), (3, 0)], now_us=0)
+    batches = []
+
+    async def fake_run_query(query):
+        params = query.request.json
+        batches.append(params["p_schedule_ids"])
+        return APIResponse(data=[
+            {"schedule_id": sid, "next_dose_at": "2099-01-01T00:00:00+00:00", "missed": sid != 3}
+            for sid in params["p_schedule_ids"]
+        ])
+
+    monkeypatch.setattr(missed_doses, "dose_scheduler", scheduler)
+    monkeypatch.setattr(missed_doses, "run_query", fake_run_query)
+    monkeypatch.setattr(missed_doses, "MISSED_DOSE_BATCH_SIZE", 2)
+
+    result = asyncio.run(missed_doses.check_due_doses())
+    assert sorted(sum(batches, [])) == [1, 2, 3] and len(batches) == 2
+    assert result == {"reminders": 0, "missed": 2}
+    assert len(scheduler) == 3
+
+
+def test_only_the_lease_holder_tracks_schedules_and_runs_passes(monkeypatch):
+    scheduler = DoseScheduler(grace_us=0)
+    leases = [True, True, False]
+    passes = []
+
+    async def fake_claim_lease(job, ttl_seconds):
+        return leases.pop(0)
+
+    async def fake_reload():
+        passes.append("reload")
+        scheduler.load([(1, 10**18)], now_us=0)
+
+    async def fake_check():
+        passes.append("check")
+        return {"reminders": 0, "missed": 0}
+
+    monkeypatch.setattr(missed_doses, "dose_scheduler", scheduler)
+    monkeypatch.setattr(missed_doses, "claim_lease", fake_claim_lease)
+    monkeypatch.setattr(missed_doses, "reload_schedules", fake_reload)
+    monkeypatch.setattr(missed_doses, "check_due_doses", fake_check)
+    monkeypatch.setattr(missed_doses, "_leading", False)
+    monkeypatch.setattr(missed_doses, "_next_reload", float("inf"))
+
+    # Elected: starts with a full reload, then tracks changes served by this worker.
+    asyncio.run(missed_doses.run_dose_scheduler())
+    missed_doses.track_schedule({"schedule_id": 2, "next_dose_at": "2099-01-01T00:00:00+00:00"})
+    asyncio.run(missed_doses.run_dose_scheduler())
+    assert passes == ["reload", "check", "check"]
+    assert len(scheduler) == 2
+
+    # Lost the lease: drops its state and ignores further changes.
+    assert asyncio.run(missed_doses.run_dose_scheduler()) == {"leading": False}
+    missed_doses.track_schedule({"schedule_id": 3, "next_dose_at": "2099-01-01T00:00:00+00:00"})
+    assert len(scheduler) == 0
+    assert passes == ["reload", "check", "check"]
+
+
+def test_reminder_for_a_dose_logged_through_another_worker_is_dropped(monkeypatch):
+    due = to_us(datetime.now(timezone.utc)) - MINUTE
+    logged_next = due + 720 * MINUTE
+    scheduler = DoseScheduler(grace_us=60 * MINUTE)
+    scheduler.load([(1, due), (2, due)], now_us=due - 1)
+
+    async def fake_run_query(query):
+        return APIResponse(data=[
+            {"schedule_id": 1, "next_dose_at": from_us(due).isoformat()},
+            {"schedule_id": 2, "next_dose_at": from_us(logged_next).isoformat()},
+        ])
+
+    monkeypatch.setattr(missed_doses, "dose_scheduler", scheduler)
+    monkeypatch.setattr(missed_doses, "run_query", fake_run_query)
+
+    assert asyncio.run(missed_doses.check_due_doses()) == {"reminders": 1, "missed": 0}
+    # Schedule 2 now waits for its next dose instead of being recorded as missed.
+    assert scheduler.advance(due + 61 * MINUTE) == ([], [DueDose(1, due)])
+    assert scheduler.advance(logged_next) == ([DueDose(2, logged_next)], [])
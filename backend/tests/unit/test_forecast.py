@@ -0,0 +1,110 @@
+import asyncio
+from datetime import date
+
+from postgrest import APIResponse
+
+from api.cache import TTLCache
+from api.dosing import forecast
+from api.dosing.forecast import forecast_stock
+
+TODAY = date(2026, 3, 1)
+
+
+def stock(stock_id, quantity, user_id="u1"):
+    return {"stock_id": stock_id, "user_id": user_id, "medication_id": 7, "quantity": quantity, "unit": "tablet"}
+
+
+def schedule(stock_id, dose, freq=1, interval_hours=None, start="2026-01-01", end=None):
+    return {
+        "stock_id": stock_id, "dose_amount": dose, "frequency_per_day": freq,
+        "interval_hours": interval_hours, "start_date": start, "end_date": end,
+    }
+
+
+def test_usage_sums_the_schedules_drawing_from_each_stock():
+    result = forecast_stock(
+        [stock(2, 30), stock(1, 10)],
+        [schedule(1, 1, freq=2), schedule(1, 1.5, interval_hours=12), schedule(2, 2)],
+        TODAY,
+    )
+    by_id = {f["stock_id"]: f for f in result}
+    # Stock 1: 2 doses/day of 1, plus 2 doses/day of 1.5 truncated to 1.
+    assert by_id[1]["daily_usage"] == 4
+    assert by_id[1]["days_remaining"] == 2.5
+    assert by_id[1]["depletion_date"] == date(2026, 3, 3)
+    assert by_id[1]["is_low"]
+    assert by_id[2]["days_remaining"] == 15 and not by_id[2]["is_low"]
+
+
+def test_inactive_and_unlinked_schedules_are_ignored():
+    result = forecast_stock(
+        [stock(1, 10)],
+        [schedule(1, 1, start="2026-04-01"), schedule(1, 1, end="2026-02-01"), schedule(None, 5), schedule(99, 1)],
+        TODAY,
+    )
+    assert result[0]["daily_usage"] == 0
+    assert result[0]["days_remaining"] is None and result[0]["depletion_date"] is None
+    assert not result[0]["is_low"]
+
+
+def test_forecast_is_cached_until_invalidated(monkeypatch):
+    queries = []
+
+    async def fake_run_query(query):
+        queries.append(query)
+        table = query.request.params.get("select")
+        return APIResponse(data=[stock(1, 10)] if "quantity" in table else [schedule(1, 1)])
+
+    monkeypatch.setattr(forecast, "run_query", fake_run_query)
+    forecast.invalidate_forecast("u1")
+
+    first = asyncio.run(forecast.get_user_forecast("u1"))
+    assert asyncio.run(forecast.get_user_forecast("u1")) is first
+    assert len(queries) == 2
+
+    forecast.invalidate_forecast("u1")
+    asyncio.run(forecast.get_user_forecast("u1"))
+    assert len(queries) == 4
+
+
+def test_invalidation_during_a_load_keeps_the_stale_result_out_of_the_cache(monkeypatch):
+    queries = []
+
+    async def fake_run_query(query):
+        queries.append(query)
+        # A dose is logged while the rows are being read.
+        forecast.invalidate_forecast("u2")
+        table = query.request.params.get("select")
+        return APIResponse(data=[stock(1, 10, "u2")] if "quantity" in table else [schedule(1, 1)])
+
+    monkeypatch.setattr(forecast, "run_query", fake_run_query)
+
+    asyncio.run(forecast.get_user_forecast("u2"))
+    asyncio.run(forecast.get_user_forecast("u2"))
+    assert len(queries) == 4
+
+
+def test_priming_only_fills_absent_users_not_invalidated_since_the_snapshot():
+    for user_id in ("p1", "p2", "p3"):
+        forecast.invalidate_forecast(user_id)
+    forecast._forecasts.set("p1", ["cached"])
+    generation = forecast.forecast_generation()
+    forecast.invalidate_forecast("p2")
+
+    primed = forecast.prime_forecasts({"p1": ["bulk"], "p2": ["bulk"], "p3": ["bulk"]}, generation)
+
+    assert primed == 1
+    assert forecast._forecasts.get("p1") == ["cached"]
+    assert forecast._forecasts.get("p2") is None
+    assert forecast._forecasts.get("p3") == ["bulk"]
+
+
+def test_generations_are_bounded_and_expire(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(forecast, "_generations", TTLCache(maxsize=2, ttl=60, clock=lambda: now[0]))
+    for user_id in ("g1", "g2", "g3"):
+        forecast.invalidate_forecast(user_id)
+    assert len(forecast._generations) == 2
+
+    now[0] = 61
+    assert forecast._generations.get("g3") is None
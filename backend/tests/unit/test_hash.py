@@ -0,0 +1,24 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from api.auth import hash as hash_module
+from api.auth.hash import hash_password, verify_password
+
+
+def test_hash_roundtrip(monkeypatch):
+    monkeypatch.setattr(hash_module, "BCRYPT_ROUNDS", 4)
+    hashed = asyncio.run(hash_password("ValidPass123!"))
+    assert hashed.startswith("$2b$04$")
+    assert asyncio.run(verify_password("ValidPass123!", hashed))
+    assert not asyncio.run(verify_password("WrongPass123!", hashed))
+
+
+def test_saturated_pool_returns_503(monkeypatch):
+    monkeypatch.setattr(hash_module, "HASH_POOL_SIZE", 0)
+    monkeypatch.setattr(hash_module, "HASH_QUEUE_DEPTH", 0)
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(hash_password("ValidPass123!"))
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.headers["Retry-After"] == "1"
@@ -3,7 +3,13 @@ from datetime import timedelta
 import jwt
 import pytest
 
-from api.auth.jwt import create_access_token, create_refresh_token, decode_access_token
+from api.auth.jwt import (
+    create_access_token,
+    create_refresh_token,
+    decode_access_token,
+    decode_refresh_token,
+    hash_refresh_token,
+)
 
 
 def test_token_roundtrip():
@@ -27,3 +33,15 @@ def test_refresh_token_rejected_as_access_token():
     token = create_refresh_token({"sub": "x"})
     with pytest.raises(jwt.InvalidTokenError):
         decode_access_token(token)
+
+
+def test_access_token_rejected_as_refresh_token():
+    token = create_access_token({"sub": "x"})
+    with pytest.raises(jwt.InvalidTokenError):
+        decode_refresh_token(token)
+
+
+def test_refresh_token_hash_is_fixed_length():
+    short, long = create_refresh_token({"sub": "x"}), create_refresh_token({"sub": "x" * 200})
+    assert len(hash_refresh_token(short)) == len(hash_refresh_token(long)) == 64
+    assert hash_refresh_token(short) == hash_refresh_token(short)
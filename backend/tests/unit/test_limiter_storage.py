@@ -0,0 +1,78 @@
+import time
+
+import fakeredis
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import SlidingWindowCounterRateLimiter
+
+from api import limiter_storage
+from api.limiter_storage import SharedMemoryStorage
+
+
+def test_shared_memory_storage_enforces_limit(tmp_path):
+    limiter = SlidingWindowCounterRateLimiter(storage_from_string(f"shm://{tmp_path}/limits?slots=64"))
+    limit = parse("3/minute")
+    assert [limiter.hit(limit, "127.0.0.1") for _ in range(5)] == [True, True, True, False, False]
+    assert limiter.hit(limit, "10.0.0.1")
+
+
+def test_workers_mapping_the_same_file_share_counters(tmp_path):
+    uri = f"shm://{tmp_path}/limits?slots=64"
+    worker_a = SlidingWindowCounterRateLimiter(SharedMemoryStorage(uri))
+    worker_b = SlidingWindowCounterRateLimiter(SharedMemoryStorage(uri))
+    limit = parse("4/minute")
+    for _ in range(2):
+        assert worker_a.hit(limit, "127.0.0.1")
+        assert worker_b.hit(limit, "127.0.0.1")
+    assert not worker_a.hit(limit, "127.0.0.1")
+    assert worker_b.get_window_stats(limit, "127.0.0.1").remaining == 0
+
+
+def test_full_probe_run_recycles_a_slot(tmp_path):
+    storage = SharedMemoryStorage(f"shm://{tmp_path}/limits?slots=4")
+    for n in range(20):
+        assert storage.incr(f"key-{n}", expiry=60) == 1
+    assert storage.get("key-19") == 1
+
+
+def test_eviction_keeps_live_sliding_windows_over_fixed_window_keys(tmp_path):
+    # With 4 slots every key shares one probe run. Sliding window slots anchor on a small
+    # window index and fixed window slots on an epoch timestamp; eviction must compare
+    # when each goes stale instead, or live sliding limits are recycled first.
+    storage = SharedMemoryStorage(f"shm://{tmp_path}/limits?slots=4")
+    limiter = SlidingWindowCounterRateLimiter(storage)
+    limit = parse("3/minute")
+    for address in ("10.0.0.1", "10.0.0.2"):
+        assert limiter.hit(limit, address) and limiter.hit(limit, address)
+
+    for n in range(10):
+        assert storage.incr(f"fixed-{n}", expiry=5) == 1
+
+    for address in ("10.0.0.1", "10.0.0.2"):
+        assert limiter.get_window_stats(limit, address).remaining == 1
+    assert storage.get("fixed-9") == 1
+
+
+def test_stale_slots_are_recycled_before_live_ones(tmp_path, monkeypatch):
+    storage = SharedMemoryStorage(f"shm://{tmp_path}/limits?slots=4")
+    storage.incr("short", expiry=1)
+    for n in range(3):
+        storage.incr(f"long-{n}", expiry=600)
+
+    later = time.time() + 5
+    monkeypatch.setattr(limiter_storage.time, "time", lambda: later)
+    storage.incr("new", expiry=600)
+
+    assert [storage.get(f"long-{n}") for n in range(3)] == [1, 1, 1]
+    assert storage.get("new") == 1
+
+
+def test_redis_storage_enforces_limit():
+    server = fakeredis.FakeServer()
+    storage = storage_from_string(
+        "redis://localhost:6379",
+        connection_pool=fakeredis.FakeRedis(server=server).connection_pool,
+    )
+    limiter = SlidingWindowCounterRateLimiter(storage)
+    limit = parse("2/minute")
+    assert [limiter.hit(limit, "127.0.0.1") for _ in range(3)] == [True, True, False]
@@ -0,0 +1,49 @@
+import pytest
+from postgrest import APIResponse
+
+from api.routers import schedules
+
+INTAKE = {
+    "intake_id": 9, "schedule_id": 4, "dose_amount": 2,
+    "was_missed": False, "taken_at": "2025-03-01T08:05:00+00:00", "notes": None,
+    "created_at": "2025-03-01T08:05:01+00:00",
+}
+
+
+@pytest.fixture
+def rpc_client(monkeypatch, fake_user):
+    calls = []
+
+    def respond(rows):
+        async def fake_run_query(query):
+            calls.append(query)
+            return APIResponse(data=rows)
+        monkeypatch.setattr(schedules, "run_query", fake_run_query)
+
+    return fake_user, respond, calls
+
+
+def test_log_dose_is_one_rpc_returning_log_schedule_and_stock(rpc_client):
+    user, respond, calls = rpc_client
+    respond([{
+        "intake": {**INTAKE, "user_id": str(user.user_id)},
+        "next_dose_at": "2025-03-01T20:00:00+00:00",
+        "stock_quantity": 8,
+        "stock_decremented": True,
+    }])
+
+    resp = user.client.post("/api/schedules/4/log", json={"schedule_id": 4, "dose_amount": 2, "was_missed": False})
+
+    assert resp.status_code == 201
+    assert len(calls) == 1
+    assert calls[0].request.json["p_user_id"] == str(user.user_id)
+    data = resp.json()["data"]
+    assert (data["intake_id"], data["stock_quantity"], data["stock_decremented"]) == (9, 8.0, True)
+    assert data["next_dose_at"].startswith("2025-03-01T20:00:00")
+
+
+def test_log_dose_on_unowned_schedule_is_404(rpc_client):
+    user, respond, _ = rpc_client
+    respond([])
+    resp = user.client.post("/api/schedules/4/log", json={"schedule_id": 4, "dose_amount": 2, "was_missed": False})
+    assert resp.status_code == 404
@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+from postgrest import APIResponse
+
+from api.medications import catalog
+from api.medications.catalog import MedicationCache, medication_cache
+
+ROWS = [
+    {"medication_id": 1, "rxcui": "153010", "name": "Advil", "generic_rxcui": None, "is_brand": True,
+     "created_at": "2026-01-01T00:00:00Z"},
+    {"medication_id": 2, "rxcui": "310965", "name": "Ibuprofen 200 MG Oral Tablet", "generic_rxcui": None,
+     "is_brand": False, "created_at": "2026-01-01T00:00:00Z"},
+]
+
+
+@pytest.fixture
+def table(monkeypatch):
+    """The medications table behind catalog.run_query; records the values each query asked for."""
+    queries = []
+
+    async def fake_run_query(query):
+        column, values = next((k, v) for k, v in query.request.params.items() if k != "select")
+        wanted = values.removeprefix("in.(").removesuffix(")").split(",")
+        queries.append((column, wanted))
+        return APIResponse(data=[row for row in ROWS if str(row[column]) in wanted])
+
+    monkeypatch.setattr(catalog, "run_query", fake_run_query)
+    return queries
+
+
+def test_get_many_reads_through_only_for_uncached_ids(table):
+    cache = MedicationCache(maxsize=10, ttl=60)
+
+    assert asyncio.run(cache.get_many([2, 1, 2])).keys() == {1, 2}
+    assert asyncio.run(cache.get_many([1, 2, 3])).keys() == {1, 2}
+    assert asyncio.run(cache.get(3)) is None
+    # Ids that do not exist are asked for again, in case another worker added them.
+    assert [wanted for _, wanted in table] == [["2", "1"], ["3"], ["3"]]
+
+
+def test_rxcui_lookups_share_the_cached_rows(table):
+    cache = MedicationCache(maxsize=10, ttl=60)
+    asyncio.run(cache.get_many([1]))
+
+    rows = asyncio.run(cache.get_by_rxcui(["310965", "153010", "999"]))
+
+    assert [row["medication_id"] for row in rows] == [2, 1]
+    assert table[1] == ("rxcui", ["310965", "999"])
+    assert asyncio.run(cache.get(2)) is rows[0]
+    assert len(table) == 2
+
+
+def test_added_medication_is_served_without_a_lookup(monkeypatch, table, fake_user):
+    inserted = {**ROWS[0], "medication_id": 9, "rxcui": "42", "name": "Zyrtec"}
+
+    async def insert(query):
+        return APIResponse(data=[inserted])
+
+    monkeypatch.setattr("api.routers.medical.run_query", insert)
+    medication_cache.clear()
+    try:
+        fake_user.client.post("/api/medications", json={"rxcui": "42", "name": "Zyrtec", "tty": "BN"})
+        resp = fake_user.client.get("/api/medications/9")
+        missing = fake_user.client.get("/api/medications/404")
+    finally:
+        medication_cache.clear()
+
+    assert resp.status_code == 200
+    assert resp.json()["data"]["name"] == "Zyrtec"
+    assert missing.status_code == 404
+    assert table == [("medication_id", ["404"])]
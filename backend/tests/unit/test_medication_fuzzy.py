@@ -0,0 +1,66 @@
+import pytest
+from postgrest import APIResponse
+
+from api.medications.fuzzy import FuzzyIndex, edit_distance
+
+
+def _medication(medication_id: int, name: str, is_brand: bool = False) -> dict:
+    return {"medication_id": medication_id, "rxcui": str(1000 + medication_id), "name": name, "is_brand": is_brand}
+
+
+@pytest.fixture
+def index():
+    index = FuzzyIndex()
+    for row in (
+        _medication(1, "Amoxicillin 500 MG Oral Capsule"),
+        _medication(2, "Amoxicillin 250 MG Oral Capsule"),
+        _medication(3, "Lipitor", is_brand=True),
+        _medication(4, "Atorvastatin 20 MG Oral Tablet"),
+        _medication(5, "Ibuprofen 200 MG Oral Tablet"),
+    ):
+        index.add(row)
+    return index
+
+
+def test_edit_distance_counts_transpositions_and_stops_at_the_limit():
+    assert edit_distance("ibuprofen", "ibuprofen", 2) == 0
+    assert edit_distance("ibuprofen", "ibuprfoen", 2) == 1
+    assert edit_distance("amoxicilin", "amoxicillin", 2) == 1
+    assert edit_distance("lipitor", "liptr", 2) == 2
+    assert edit_distance("lipitor", "aspirin", 2) == 3
+
+
+def test_search_ranks_misspellings_by_edit_distance(index):
+    assert [r["medication_id"] for r in index.search("amoxicilin")] == [2, 1]
+    assert [r["medication_id"] for r in index.search("amoxicilin 500")] == [1]
+    assert index.search("lipitr") == [{**_medication(3, "Lipitor", is_brand=True), "distance": 1}]
+    assert index.search("atrovastatin tablet")[0]["distance"] == 1
+    # Short tokens must match exactly; one unknown word rules a medication out.
+    assert index.search("amoxicillin 50") == []
+    assert index.search("ibuprofen xyzzyq") == []
+    assert index.search(" ") == []
+    assert len(index.search("oral", limit=2)) == 2
+
+
+def test_reindexing_a_medication_replaces_its_words(index):
+    index.add(_medication(3, "Lipitor 10 MG Oral Tablet", is_brand=True))
+    assert [r["medication_id"] for r in index.search("lipitor")] == [3]
+    assert index.search("10")[0]["name"] == "Lipitor 10 MG Oral Tablet"
+    assert len(index) == 5
+
+
+def test_added_medications_are_searchable_immediately(monkeypatch, fake_user):
+    fresh = FuzzyIndex()
+    inserted = {**_medication(7, "Cetirizine 10 MG Oral Tablet"), "generic_rxcui": None, "created_at": "2026-01-01T00:00:00Z"}
+
+    async def fake_run_query(query):
+        return APIResponse(data=[inserted], count=None)
+
+    monkeypatch.setattr("api.routers.medical.run_query", fake_run_query)
+    monkeypatch.setattr("api.routers.medical.medication_index", fresh)
+    created = fake_user.client.post("/api/medications", json={"rxcui": "1007", "name": "Cetirizine 10 MG Oral Tablet", "tty": "SCD"})
+    resp = fake_user.client.get("/api/medications/fuzzy", params={"q": "cetrizine"})
+
+    assert created.status_code == 201
+    assert resp.status_code == 200
+    assert resp.json()["data"] == [{**_medication(7, "Cetirizine 10 MG Oral Tablet"), "distance": 1}]
@@ -0,0 +1,22 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from api.auth import auth
+from api.main import app
+
+
+@pytest.mark.parametrize("configured,header,status", [
+    ("s3cret", "Bearer s3cret", 200),
+    ("s3cret", "Bearer wrong", 401),
+    ("s3cret", None, 401),
+    (None, "Bearer ", 401),
+])
+def test_metrics_require_the_internal_token(monkeypatch, configured, header, status):
+    monkeypatch.setattr(auth, "METRICS_TOKEN", configured)
+    headers = {"Authorization": header} if header else {}
+
+    resp = TestClient(app).get("/api/metrics", headers=headers)
+
+    assert resp.status_code == status
+    if status == 200:
+        assert "user_cache" in resp.json()["data"]
@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from api.dosing.occurrences import MISSED, PENDING, TAKEN, ScheduleSet, dose_interval, to_us
+
+DAY_1 = datetime(2025, 3, 1, tzinfo=timezone.utc)
+DAY_3 = datetime(2025, 3, 3, tzinfo=timezone.utc)
+
+
+def _schedule(schedule_id: int, **overrides) -> dict:
+    return {
+        "schedule_id": schedule_id,
+        "frequency_per_day": 3,
+        "interval_hours": None,
+        "start_date": "2025-03-01",
+        "end_date": None,
+        "next_dose_at": "2025-03-01T08:00:00+00:00",
+        **overrides,
+    }
+
+
+def _times(occurrences) -> list[str]:
+    stamps = occurrences.timestamps()
+    return [str(stamps[i]) for i in occurrences.in_time_order()]
+
+
+def test_slots_follow_the_anchor_within_the_date_range():
+    occurrences = ScheduleSet([_schedule(1, end_date="2025-03-01")]).expand(DAY_1, DAY_3)
+    assert _times(occurrences) == ["2025-03-01T00:00:00Z", "2025-03-01T08:00:00Z", "2025-03-01T16:00:00Z"]
+
+
+def test_interval_hours_overrides_frequency():
+    schedule = _schedule(1, interval_hours=36, next_dose_at=None, start_date="2025-02-27")
+    assert dose_interval(schedule).total_seconds() == 36 * 3600
+    assert _times(ScheduleSet([schedule]).expand(DAY_1, DAY_3)) == ["2025-03-02T00:00:00Z"]
+
+
+def test_schedules_are_merged_in_time_order():
+    schedules = ScheduleSet([_schedule(1, frequency_per_day=1), _schedule(2, frequency_per_day=2, next_dose_at=None)])
+    occurrences = schedules.expand(DAY_1, DAY_3)
+    assert len(occurrences) == 2 + 4
+    assert _times(occurrences)[:3] == ["2025-03-01T00:00:00Z", "2025-03-01T08:00:00Z", "2025-03-01T12:00:00Z"]
+
+
+def test_logs_attach_to_the_nearest_slot_and_latest_wins():
+    occurrences = ScheduleSet([_schedule(1, end_date="2025-03-01")]).expand(DAY_1, DAY_3)
+    occurrences.match_logs([
+        {"schedule_id": 1, "taken_at": "2025-03-01T09:10:00+00:00", "was_missed": True},
+        {"schedule_id": 1, "taken_at": "2025-03-01T08:40:00+00:00", "was_missed": False},
+        {"schedule_id": 1, "taken_at": "2025-03-01T15:00:00+00:00", "was_missed": True},
+        {"schedule_id": 99, "taken_at": "2025-03-01T08:00:00+00:00", "was_missed": False},
+    ])
+    ordered = occurrences.in_time_order()
+    assert occurrences.status[ordered].tolist() == [PENDING, MISSED, MISSED]
+    assert occurrences.log_index[ordered].tolist() == [-1, 0, 2]
+    assert occurrences.overdue(DAY_3)[ordered].tolist() == [True, False, False]
+    assert TAKEN not in occurrences.status
+
+
+def test_slot_counts_match_the_expanded_slots():
+    schedules = ScheduleSet([_schedule(1, end_date="2025-03-02"), _schedule(2, interval_hours=36, next_dose_at=None)])
+    edges = np.array([to_us(DAY_1), to_us(DAY_1 + timedelta(hours=12)), to_us(DAY_3)])
+    counts = schedules.slot_counts(edges)
+    assert counts.tolist() == [[2, 4], [1, 1]]
+    assert counts.sum() == len(schedules.expand(DAY_1, DAY_3))
@@ -0,0 +1,103 @@
+import asyncio
+from datetime import date, datetime
+
+import pytest
+from fastapi import HTTPException
+from postgrest import APIResponse
+
+from api.db import pagination
+from api.db.pagination import PageParams, decode_cursor, encode_cursor, paginate
+from api.db.repository import OwnedResource
+
+USER_ID = "00000000-0000-0000-0000-000000000001"
+BODY_METRICS = OwnedResource("body_metrics", "id", "Body metric entry not found")
+
+
+def _run(monkeypatch, rows: list[dict], page: PageParams, sort_column: str = "recorded_at", sort_type: type = datetime):
+    captured = {}
+
+    async def fake_run_query(query):
+        params = captured["params"] = query.request.params
+        return APIResponse(data=rows[:int(params["limit"])] if "limit" in params else rows, count=None)
+
+    monkeypatch.setattr(pagination, "run_query", fake_run_query)
+    body = asyncio.run(paginate(BODY_METRICS.select(USER_ID), page, sort_column, "id", sort_type))
+    return body, captured["params"]
+
+
+def test_cursor_roundtrip():
+    cursor = encode_cursor("2025-03-01T08:00:00+00:00", 42)
+    assert decode_cursor(cursor) == ("2025-03-01T08:00:00+00:00", 42)
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", encode_cursor("x", "1"), encode_cursor('x",id.gt.0', 1)])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor)
+    assert exc.value.status_code == 400
+
+
+def test_first_page_orders_newest_first_and_returns_next_cursor(monkeypatch):
+    rows = [{"id": n, "recorded_at": f"2025-03-0{n}T08:00:00+00:00"} for n in (3, 2, 1)]
+    body, params = _run(monkeypatch, rows, PageParams(limit=2, cursor=None, from_=None, to=None))
+
+    assert params["order"] == "recorded_at.desc,id.desc"
+    assert params["limit"] == "3"
+    assert [row["id"] for row in body["data"]] == [3, 2]
+    assert decode_cursor(body["next_cursor"]) == ("2025-03-02T08:00:00+00:00", 2)
+
+
+def test_cursor_and_date_range_are_pushed_into_the_query(monkeypatch):
+    page = PageParams(
+        limit=2,
+        cursor=encode_cursor("2025-03-02T08:00:00+00:00", 2),
+        from_=datetime(2025, 1, 1),
+        to=datetime(2025, 4, 1),
+    )
+    body, params = _run(monkeypatch, [{"id": 1, "recorded_at": "2025-03-01T08:00:00+00:00"}], page)
+
+    assert params["or"] == (
+        '(recorded_at.lt."2025-03-02T08:00:00+00:00",'
+        'and(recorded_at.eq."2025-03-02T08:00:00+00:00",id.lt.2))'
+    )
+    assert params.get_list("recorded_at") == ["gte.2025-01-01T00:00:00", "lt.2025-04-01T00:00:00"]
+    assert body["next_cursor"] is None
+
+
+def test_without_limit_or_cursor_every_row_is_returned(monkeypatch):
+    rows = [{"id": n, "recorded_at": f"2025-03-0{n}T08:00:00+00:00"} for n in range(9, 0, -1)]
+    body, params = _run(monkeypatch, rows, PageParams(limit=None, cursor=None, from_=None, to=None))
+
+    assert "limit" not in params
+    assert params["order"] == "recorded_at.desc,id.desc"
+    assert body == {"data": rows, "next_cursor": None}
+
+
+def test_cursor_without_limit_continues_in_default_pages(monkeypatch):
+    page = PageParams(limit=None, cursor=encode_cursor("2025-03-02T08:00:00+00:00", 2), from_=None, to=None)
+    _, params = _run(monkeypatch, [], page)
+
+    assert params["limit"] == str(pagination.DEFAULT_PAGE_SIZE + 1)
+
+
+def test_date_column_is_filtered_and_paged_by_date(monkeypatch):
+    page = PageParams(
+        limit=1,
+        cursor=encode_cursor("2025-03-02", 7),
+        from_=datetime(2025, 1, 1),
+        to=datetime(2025, 4, 1, 12, 30),
+    )
+    rows = [{"id": 6, "workout_date": "2025-03-01"}, {"id": 5, "workout_date": "2025-02-27"}]
+    body, params = _run(monkeypatch, rows, page, "workout_date", date)
+
+    # The afternoon of Apr 1 is after that day's midnight, so Apr 1 itself is in range.
+    assert params.get_list("workout_date") == ["gte.2025-01-01", "lt.2025-04-02"]
+    assert params["or"] == '(workout_date.lt."2025-03-02",and(workout_date.eq."2025-03-02",id.lt.7))'
+    assert decode_cursor(body["next_cursor"]) == ("2025-03-01", 6)
+
+
+def test_cursor_of_the_wrong_type_is_rejected(monkeypatch):
+    page = PageParams(limit=2, cursor=encode_cursor("2025-03-02T08:00:00+00:00", 2), from_=None, to=None)
+    with pytest.raises(HTTPException) as exc:
+        _run(monkeypatch, [], page, "workout_date", date)
+    assert exc.value.status_code == 400
@@ -0,0 +1,22 @@
+import asyncio
+
+from postgrest import APIResponse
+
+from api.jobs import refresh_token_purge
+
+
+def test_purge_repeats_until_a_batch_comes_back_short(monkeypatch):
+    batches = iter([
+        {"expired": 2, "over_cap": 0},
+        {"expired": 2, "over_cap": 1},
+        {"expired": 1, "over_cap": 0},
+    ])
+
+    async def fake_run_query(_query):
+        return APIResponse(data=[next(batches)])
+
+    monkeypatch.setattr(refresh_token_purge, "TOKEN_PURGE_BATCH_SIZE", 2)
+    monkeypatch.setattr(refresh_token_purge, "run_query", fake_run_query)
+
+    stats = asyncio.run(refresh_token_purge.purge_refresh_tokens())
+    assert (stats["expired"], stats["over_cap"], stats["batches"]) == (5, 1, 3)
@@ -0,0 +1,26 @@
+from api.db.repository import OwnedResource
+
+USER_ID = "00000000-0000-0000-0000-000000000001"
+
+
+def _params(query) -> dict:
+    return dict(query.request.params)
+
+
+def test_direct_resource_filters_on_own_user_id():
+    params = _params(OwnedResource("workouts", "id", "Workout not found").select(USER_ID))
+    assert params["select"] == "*"
+    assert params["user_id"] == f"eq.{USER_ID}"
+
+
+def test_nested_resource_filters_through_inner_joins():
+    sets = OwnedResource("sets", "id", "Set not found", owner_path=("workout_exercises", "workouts"))
+    params = _params(sets.select(USER_ID, columns="id"))
+    assert params["select"] == "id,workout_exercises!inner(workouts!inner(user_id))"
+    assert params["workout_exercises.workouts.user_id"] == f"eq.{USER_ID}"
+    assert "user_id" not in params
+
+
+def test_soft_deleted_rows_are_excluded():
+    schedules = OwnedResource("user_medication_schedule", "schedule_id", "Schedule not found", soft_delete=True)
+    assert _params(schedules.select(USER_ID))["deleted_at"] == "is.null"
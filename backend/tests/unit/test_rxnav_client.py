@@ -0,0 +1,70 @@
+import asyncio
+
+import httpx
+import pytest
+
+from api.medications.rxnav import RxNavClient
+
+
+def _client(handler) -> RxNavClient:
+    return RxNavClient(base_url="https://rxnav.test/REST", max_concurrency=2, transport=httpx.MockTransport(handler))
+
+
+def test_search_and_properties_are_cached():
+    paths = []
+
+    def handler(request):
+        paths.append(request.url.path)
+        if request.url.path.endswith("/rxcui.json"):
+            return httpx.Response(200, json={"idGroup": {"rxnormId": ["1", "2"]}})
+        return httpx.Response(200, json={"properties": {}})
+
+    async def run():
+        client = _client(handler)
+        ids = await client.search_ids("Ibuprofen")
+        await client.get_properties_many(ids)
+        assert await client.search_ids(" ibuprofen ") == ["1", "2"]
+        await client.get_properties_many(ids)
+        await client.close()
+
+    asyncio.run(run())
+    assert paths == ["/REST/rxcui.json", "/REST/rxcui/1/properties.json", "/REST/rxcui/2/properties.json"]
+
+
+def test_property_fetches_are_concurrent_but_bounded():
+    in_flight = peak = 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, json={"properties": {"rxcui": request.url.path.split("/")[-2]}})
+
+    async def run():
+        client = _client(handler)
+        results = await client.get_properties_many(["5", "4", "3", "2", "1"])
+        await client.close()
+        return [r["properties"]["rxcui"] for r in results]
+
+    assert asyncio.run(run()) == ["5", "4", "3", "2", "1"]
+    assert peak == 2
+
+
+def test_upstream_errors_are_raised_and_not_cached():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503)
+
+    async def run():
+        client = _client(handler)
+        for _ in range(2):
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.search_ids("ibuprofen")
+        await client.close()
+
+    asyncio.run(run())
+    assert len(calls) == 2
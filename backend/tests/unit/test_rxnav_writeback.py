@@ -0,0 +1,76 @@
+import pytest
+from postgrest import APIResponse
+
+from api.medications import catalog
+from api.medications.catalog import medication_cache, medication_rows
+from api.medications.fuzzy import FuzzyIndex
+
+PROPERTIES = [
+    {"properties": {"rxcui": "153010", "name": "Advil", "tty": "BN"}},
+    {"properties": {"rxcui": "310965", "name": "Ibuprofen 200 MG Oral Tablet", "tty": "SCD"}},
+    {"properties": {"rxcui": "5640", "name": "Ibuprofen", "tty": "IN"}},
+    {"properties": {"rxcui": "1", "name": "x" * 256, "tty": "SBD"}},
+    {},
+]
+
+
+def test_medication_rows_keep_supported_term_types():
+    assert medication_rows(PROPERTIES) == [
+        {"rxcui": "153010", "name": "Advil", "is_brand": True},
+        {"rxcui": "310965", "name": "Ibuprofen 200 MG Oral Tablet", "is_brand": False},
+    ]
+
+
+@pytest.fixture
+def search_client(monkeypatch, fake_user):
+    async def search_ids(term):
+        return ["153010", "310965", "5640"]
+
+    async def get_properties_many(ids):
+        return PROPERTIES
+
+    monkeypatch.setattr("api.routers.medical.rxnav.search_ids", search_ids)
+    monkeypatch.setattr("api.routers.medical.rxnav.get_properties_many", get_properties_many)
+    medication_cache.clear()
+    yield fake_user.client
+    medication_cache.clear()
+
+
+def test_search_miss_writes_fetched_medications_back_in_one_rpc(monkeypatch, search_client):
+    index = FuzzyIndex()
+    writes = []
+
+    async def fake_run_query(query):
+        if not str(query.request.path).endswith("/rpc/cache_rxnav_medications"):
+            return APIResponse(data=[])
+        writes.append(query)
+        rows = query.request.json["p_medications"]
+        return APIResponse(data=[{"medication_id": i, **row} for i, row in enumerate(rows, 1)])
+
+    monkeypatch.setattr(catalog, "run_query", fake_run_query)
+    monkeypatch.setattr(catalog, "medication_index", index)
+
+    first = search_client.get("/api/medications/search", params={"medication_term": "advil"})
+    second = search_client.get("/api/medications/search", params={"medication_term": "advil"})
+
+    assert first.status_code == 200
+    assert first.json()["data"] == PROPERTIES
+    assert len(writes) == 1
+    assert writes[0].request.json["p_medications"] == medication_rows(PROPERTIES)
+    assert [r["name"] for r in index.search("advl")] == ["Advil"]
+    # The written rows are cached too, so the repeat search is answered from them.
+    assert [r["medication_id"] for r in second.json()["data"]] == [1, 2]
+
+
+def test_failed_write_back_does_not_affect_the_response(monkeypatch, search_client):
+    async def fake_run_query(query):
+        if str(query.request.path).endswith("/rpc/cache_rxnav_medications"):
+            raise RuntimeError("database unavailable")
+        return APIResponse(data=[])
+
+    monkeypatch.setattr(catalog, "run_query", fake_run_query)
+
+    resp = search_client.get("/api/medications/search", params={"medication_term": "advil"})
+
+    assert resp.status_code == 200
+    assert resp.json()["data"] == PROPERTIES
@@ -0,0 +1,105 @@
+import pytest
+
+from api.limiter import limiter
+from api.medications import rxnorm_index
+from api.medications.rxnorm_index import RxNormIndex, build
+
+
+def _row(rxcui: int, tty: str, name: str, sab: str = "RXNORM", suppress: str = "N") -> str:
+    fields = [str(rxcui), "ENG", "", "", "", "", "", "", "", "", "", sab, tty, str(rxcui), name, "", suppress, ""]
+    return "|".join(fields) + "\n"
+
+
+@pytest.fixture
+def index(tmp_path):
+    rrf = tmp_path / "RXNCONSO.RRF"
+    rrf.write_text("".join([
+        _row(5640, "IN", "Ibuprofen"),
+        _row(310965, "SCD", "Ibuprofen 200 MG Oral Tablet"),
+        _row(310965, "SCD", "ibuprofen  200 mg oral tablet"),
+        _row(197806, "SCD", "Ibuprofen 600 MG Oral Tablet"),
+        _row(153010, "BN", "Advil"),
+        _row(202488, "BN", "Advil Migraine", suppress="O"),
+        _row(999, "SCD", "Ibuprofen 800 MG Oral Tablet", sab="MTHSPL"),
+        _row(1000, "SBD", "Paracétamol 500 MG Oral Tablet [Doliprane]"),
+    ]))
+    assert build(rrf, tmp_path / "index") == 5
+    return RxNormIndex(tmp_path / "index")
+
+
+def test_prefix_matches_normalised_names_in_order(index):
+    assert [r["rxcui"] for r in index.prefix("  IBUPROFEN ")] == ["310965", "197806"]
+    assert index.prefix("ibuprofen 6") == [{"rxcui": "197806", "name": "Ibuprofen 600 MG Oral Tablet", "tty": "SCD"}]
+    assert index.prefix("adv") == [{"rxcui": "153010", "name": "Advil", "tty": "BN"}]
+    assert index.prefix("paracé")[0]["tty"] == "SBD"
+    assert index.prefix("zzz") == [] and index.prefix(" ") == []
+    assert len(index.prefix("ibu", limit=1)) == 1
+
+
+def test_autocomplete_answers_from_the_index_without_rxnav(monkeypatch, index, fake_user):
+    async def no_rxnav(term):
+        raise AssertionError("RxNav called on an index hit")
+
+    monkeypatch.setattr(rxnorm_index, "_index", index)
+    monkeypatch.setattr("api.routers.medical.rxnav.search_ids", no_rxnav)
+    resp = fake_user.client.get("/api/medications/autocomplete", params={"q": "advil"})
+
+    assert resp.status_code == 200
+    assert resp.json()["data"] == [{"rxcui": "153010", "name": "Advil", "tty": "BN"}]
+
+
+@pytest.fixture
+def rxnav_calls(monkeypatch, index):
+    """The index above behind autocomplete, with RxNav stubbed to know only Zyrtec."""
+    terms = []
+
+    async def search_ids(term):
+        terms.append(term)
+        return ["42"]
+
+    async def get_properties_many(ids):
+        return [{"properties": {"rxcui": "42", "name": "Zyrtec", "tty": "BN"}}]
+
+    monkeypatch.setattr(rxnorm_index, "_index", index)
+    monkeypatch.setattr("api.routers.medical.rxnav.search_ids", search_ids)
+    monkeypatch.setattr("api.routers.medical.rxnav.get_properties_many", get_properties_many)
+    return terms
+
+
+def test_autocomplete_falls_back_to_rxnav_once_a_word_is_finished(rxnav_calls, fake_user):
+    partial = fake_user.client.get("/api/medications/autocomplete", params={"q": "zyr"})
+    finished = fake_user.client.get("/api/medications/autocomplete", params={"q": "zyrtec "})
+
+    assert partial.json()["data"] == []
+    assert finished.json()["data"] == [{"rxcui": "42", "name": "Zyrtec", "tty": "BN"}]
+    assert rxnav_calls == ["zyrtec"]
+
+
+def test_autocomplete_fallback_shares_the_search_rate_limit(monkeypatch, rxnav_calls, fake_user):
+    monkeypatch.setattr(limiter, "enabled", True)
+    limiter.reset()
+    try:
+        statuses = [
+            fake_user.client.get("/api/medications/autocomplete", params={"q": "zyrtec "}).status_code
+            for _ in range(6)
+        ]
+        hit = fake_user.client.get("/api/medications/autocomplete", params={"q": "advil"})
+    finally:
+        limiter.reset()
+
+    assert statuses == [200] * 5 + [429]
+    assert len(rxnav_calls) == 5
+    assert hit.status_code == 200
+
+
+def test_autocomplete_without_an_index_is_unavailable(monkeypatch, fake_user):
+    async def no_rxnav(term):
+        raise AssertionError("RxNav called without an index")
+
+    monkeypatch.setattr(rxnorm_index, "_index", None)
+    monkeypatch.setattr(rxnorm_index, "RXNORM_INDEX_DIR", None)
+    monkeypatch.setattr("api.routers.medical.rxnav.search_ids", no_rxnav)
+
+    resp = fake_user.client.get("/api/medications/autocomplete", params={"q": "zyrtec "})
+
+    assert resp.status_code == 503
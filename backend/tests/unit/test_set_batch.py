@@ -0,0 +1,45 @@
+from types import SimpleNamespace
+
+import pytest
+from postgrest import APIResponse
+
+from api.routers import workouts
+
+
+@pytest.fixture
+def batch_client(monkeypatch, fake_user):
+    calls = {"verify": 0, "insert": []}
+
+    async def fake_verify(resource_id, user_id, match=None):
+        calls["verify"] += 1
+
+    async def fake_run_query(query):
+        rows = query.request.json
+        calls["insert"].append(rows)
+        # Return out of order to check the endpoint restores request order.
+        created = [{**row, "id": 100 + i, "created_at": "2025-03-01T08:00:00+00:00"} for i, row in enumerate(rows)]
+        return APIResponse(data=list(reversed(created)))
+
+    monkeypatch.setattr(workouts, "WORKOUT_EXERCISES", SimpleNamespace(verify=fake_verify))
+    monkeypatch.setattr(workouts, "run_query", fake_run_query)
+    return fake_user.client, calls
+
+
+def test_batch_inserts_all_sets_in_one_query(batch_client):
+    client, calls = batch_client
+    body = [{"reps": 5, "weight_kg": "80.00"}, {"reps": 5, "weight_kg": "82.50"}, {"reps": 3, "rpe": "9.5"}]
+
+    resp = client.post("/api/workout-exercises/11/sets/batch", json=body)
+
+    assert resp.status_code == 201
+    assert calls["verify"] == 1
+    assert len(calls["insert"]) == 1
+    assert [row["reps"] for row in resp.json()["data"]] == [5, 5, 3]
+    assert [row["weight_kg"] for row in resp.json()["data"]] == [80.0, 82.5, None]
+
+
+@pytest.mark.parametrize("body", [[], [{"reps": 5}] * 51, [{"reps": 0}]])
+def test_batch_rejects_empty_oversized_or_invalid_input(batch_client, body):
+    client, calls = batch_client
+    assert client.post("/api/workout-exercises/11/sets/batch", json=body).status_code == 422
+    assert calls["insert"] == []
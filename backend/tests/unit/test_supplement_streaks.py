@@ -0,0 +1,57 @@
+from datetime import date
+
+import numpy as np
+from postgrest import APIResponse
+
+from api.dosing.streaks import TakenDays, decode_bitmap
+from api.routers import supplements
+
+ORIGIN = date(2025, 3, 1)
+
+
+def _days(*taken: int, length: int = 16) -> TakenDays:
+    bits = np.zeros(length, dtype=bool)
+    bits[list(taken)] = True
+    return TakenDays(ORIGIN, bits)
+
+
+def test_bitmap_decodes_in_postgres_get_bit_order():
+    # set_bit(b, 0) and set_bit(b, 9) on two zero bytes give \x0102.
+    assert np.flatnonzero(decode_bitmap("\\x0102")).tolist() == [0, 9]
+
+
+def test_taken_days_within_a_range():
+    days = _days(0, 2, 3, 15)
+    assert days.between(date(2025, 2, 1), date(2025, 3, 3)) == [date(2025, 3, 1), date(2025, 3, 3)]
+    assert days.between(date(2025, 3, 16), date(2025, 4, 1)) == [date(2025, 3, 16)]
+    assert days.between(date(2025, 4, 1), date(2025, 4, 30)) == []
+
+
+def test_current_streak_survives_until_a_whole_day_is_missed():
+    days = _days(1, 3, 4, 5)
+    assert days.current_streak(date(2025, 3, 6)) == 3   # day 5 is today
+    assert days.current_streak(date(2025, 3, 7)) == 3   # today (day 6) not taken yet
+    assert days.current_streak(date(2025, 3, 8)) == 0   # day 6 passed untaken
+    assert _days(0, 1, length=2).current_streak(date(2025, 3, 3)) == 2  # bitmap ends yesterday
+    assert days.current_streak(date(2025, 2, 1)) == 0
+
+
+def test_history_endpoint_reads_the_bitmap(monkeypatch, fake_user):
+    async def fake_run_query(query):
+        if str(query.request.path).endswith("user_supplement_history"):
+            # Bits 0, 1, 2 (Mar 1 – Mar 3) and 8 (Mar 9).
+            return APIResponse(data=[{"supplement_id": 3, "origin": "2025-03-01", "taken": "\\x0701", "longest_streak": 3}])
+        return APIResponse(data=[{"supplement_id": 3, "name": "Vitamin D"}, {"supplement_id": 4, "name": "Zinc"}])
+
+    monkeypatch.setattr(supplements, "run_query", fake_run_query)
+    monkeypatch.setattr(supplements, "date", type("FixedDate", (date,), {"today": classmethod(lambda cls: date(2025, 3, 9))}))
+    resp = fake_user.client.get("/api/supplements/history", params={"from": "2025-03-02", "to": "2025-03-09"})
+    too_long = fake_user.client.get("/api/supplements/history", params={"from": "2025-01-01", "to": "2026-03-01"})
+
+    assert resp.status_code == 200
+    assert resp.json()["data"] == [
+        {"supplement_id": 3, "name": "Vitamin D", "current_streak": 1, "longest_streak": 3,
+         "taken_days": ["2025-03-02", "2025-03-03", "2025-03-09"]},
+        {"supplement_id": 4, "name": "Zinc", "current_streak": 0, "longest_streak": 0, "taken_days": []},
+    ]
+    assert too_long.status_code == 400
@@ -0,0 +1,66 @@
+import pytest
+from postgrest import APIResponse
+
+from api.routers import supplements
+
+
+def _row(supplement_id: int, status: str) -> dict:
+    taken = status == "taken"
+    return {
+        "supplement_id": supplement_id, "log_date": "2025-03-01", "status": status,
+        "taken_at": "2025-03-01T08:05:00+00:00" if taken else None, "log_id": 40 + supplement_id if taken else None,
+    }
+
+
+@pytest.fixture
+def rpc_client(monkeypatch, fake_user):
+    calls = []
+
+    def respond(rows):
+        async def fake_run_query(query):
+            calls.append(query)
+            return APIResponse(data=rows)
+        monkeypatch.setattr(supplements, "run_query", fake_run_query)
+
+    return fake_user.client, respond, calls
+
+
+@pytest.mark.parametrize("status", ["taken", "pending"])
+def test_toggle_is_one_rpc_returning_the_new_state(rpc_client, status):
+    client, respond, calls = rpc_client
+    respond([_row(3, status)])
+
+    resp = client.post("/api/supplements/3/log")
+
+    assert resp.status_code == 200
+    assert len(calls) == 1
+    assert calls[0].request.json["p_supplement_ids"] == [3]
+    assert calls[0].request.json["p_status"] is None
+    assert resp.json()["data"]["status"] == status
+    assert (resp.json()["data"]["log_id"] is None) == (status == "pending")
+
+
+def test_batch_sets_the_requested_state_in_one_rpc(rpc_client):
+    client, respond, calls = rpc_client
+    respond([_row(3, "taken"), _row(5, "taken")])
+
+    resp = client.post("/api/supplements/log/batch", json={"supplement_ids": [5, 3], "status": "taken"})
+
+    assert resp.status_code == 200
+    assert len(calls) == 1
+    assert calls[0].request.json["p_status"] == "taken"
+    assert [row["supplement_id"] for row in resp.json()["data"]] == [3, 5]
+
+
+def test_unowned_supplement_returns_404(rpc_client):
+    client, respond, _ = rpc_client
+    respond([])
+    assert client.post("/api/supplements/3/log").status_code == 404
+    assert client.post("/api/supplements/log/batch", json={"supplement_ids": [3, 4]}).status_code == 404
+
+
+@pytest.mark.parametrize("body", [{"supplement_ids": []}, {"supplement_ids": list(range(51))}, {"supplement_ids": [1], "status": "done"}])
+def test_batch_rejects_empty_oversized_or_invalid_input(rpc_client, body):
+    client, _, calls = rpc_client
+    assert client.post("/api/supplements/log/batch", json=body).status_code == 422
+    assert calls == []
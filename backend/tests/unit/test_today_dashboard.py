@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+
+from api.routers import dashboard
+
+DOSE = {
+    "schedule_id": 1, "medication_id": 2, "medication_name": "Ibuprofen", "frequency_per_day": 2,
+    "dose_amount": 1.0, "status": "pending",
+}
+SUPPLEMENT = {"supplement_id": 3, "name": "Vitamin D", "log_date": "2026-03-01", "status": "taken"}
+
+
+@pytest.fixture
+def dashboard_client(monkeypatch, fake_user):
+    async def fake_doses(user_id):
+        await asyncio.sleep(0.05)
+        return [DOSE]
+
+    async def fake_supplements(user_id):
+        await asyncio.sleep(0.05)
+        return [SUPPLEMENT]
+
+    monkeypatch.setattr(dashboard, "get_today_doses", fake_doses)
+    monkeypatch.setattr(dashboard, "get_today_supplements", fake_supplements)
+    return fake_user.client
+
+
+def test_today_combines_both_sections(dashboard_client):
+    resp = dashboard_client.get("/api/today")
+
+    assert resp.status_code == 200
+    data = resp.json()["data"]
+    assert [d["schedule_id"] for d in data["doses"]] == [1]
+    assert [s["supplement_id"] for s in data["supplements"]] == [3]
+
+
+def test_sections_run_concurrently_and_report_server_timing(dashboard_client):
+    header = dashboard_client.get("/api/today").headers["Server-Timing"]
+
+    timings = dict(entry.strip().split(";dur=") for entry in header.split(","))
+    assert set(timings) == {"doses", "supplements", "total"}
+    assert float(timings["total"]) < float(timings["doses"]) + float(timings["supplements"])
@@ -0,0 +1,28 @@
+from api.routers.workouts import flatten_workout_tree
+from api.schemas.workout_record import WorkoutDetailResponse
+
+
+def test_embedded_workout_is_flattened_into_detail_shape():
+    row = {
+        "id": 7, "user_id": "u", "workout_name": "Push", "workout_date": "2025-03-01",
+        "created_at": "2025-03-01T08:00:00+00:00",
+        "workout_exercises": [
+            {
+                "id": 11, "workout_id": 7, "exercise_id": 3, "order_index": 0,
+                "created_at": "2025-03-01T08:01:00+00:00",
+                "exercises": {"exercise_name": "Bench Press", "muscle_group": "Chest"},
+                "sets": [{"id": 21, "workout_exercise_id": 11, "reps": 5, "weight_kg": 80.0,
+                          "created_at": "2025-03-01T08:02:00+00:00"}],
+            },
+            {
+                "id": 12, "workout_id": 7, "exercise_id": 4, "order_index": 1,
+                "created_at": "2025-03-01T08:10:00+00:00", "exercises": None, "sets": [],
+            },
+        ],
+    }
+
+    detail = WorkoutDetailResponse.model_validate(flatten_workout_tree(row))
+
+    assert [e.exercise_name for e in detail.exercises] == ["Bench Press", None]
+    assert detail.exercises[0].sets[0].reps == 5
+    assert detail.exercises[1].sets == []
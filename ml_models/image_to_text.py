@@ -1,12 +1,9 @@
 from PIL import Image, ImageOps, ImageFilter
 import numpy as np
-import pytesseract
-import easyocr
 import re
 from pytesseract import Output
 
-# Initialize EasyOCR reader (only once)
-easyocr_reader = easyocr.Reader(lang_list=['en', 'fr'], gpu=False)
+from .ocr_engines import get_engine
 
 def is_low_quality_text(text):
     """
@@ -25,7 +22,8 @@ def preprocess_for_ocr(pil_img):
 
 def run_easyocr_fallback(image):
     img_np = np.array(image)
-    results = easyocr_reader.readtext(img_np)
+    # The EasyOCR reader (and PyTorch) is only loaded the first time the fallback runs
+    results = get_engine("easyocr").readtext(img_np)
     combined_text = " ".join([res[1] for res in results])
     return combined_text.strip()
 
@@ -34,9 +32,11 @@ def get_best_text_from_rotations(processed_img, verbose=True):
     best_score = -1
     best_angle = 0
 
+    tesseract = get_engine("tesseract")
+
     for angle in [0, 45, 90, 135, 180, 225, 270]:
         rotated = processed_img.rotate(angle, expand=True)
-        data = pytesseract.image_to_data(
+        data = tesseract.image_to_data(
             rotated,
             config='--oem 1 --psm 6',
             lang='eng+fra',
@@ -0,0 +1,133 @@
+"""
+Registry of OCR engines, built on first use instead of at import.
+
+Importing easyocr pulls in PyTorch, and building its Reader loads the detection and
+recognition models, so nothing here happens until an engine is asked for:
+
+    reader = get_engine("easyocr")
+
+Importing this module (or the pipeline) never builds anything. A server that forks
+workers can build the engines once in the parent by calling `warm_up()` there, e.g.
+through the `on_starting` pre-fork hook below. warm_up then calls gc.freeze(), so the
+garbage collector never writes to the model objects and the forked workers keep
+sharing their pages copy-on-write instead of each loading a copy.
+
+Build time and the RSS each engine added are kept in `engine_stats()`; to measure them:
+
+    python -m ml_models.ocr_engines [easyocr] [tesseract]
+"""
+import gc
+import os
+import sys
+import threading
+import time
+
+WARM_UP_ENGINES_ENV = "OCR_WARM_UP_ENGINES"
+
+_factories = {}
+_engines = {}
+_stats = {}
+_lock = threading.Lock()
+
+
+def _rss_mb():
+    """
+    Current resident set size in MB, peak RSS where /proc is unavailable (macOS), or
+    None where neither is (Windows).
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, AttributeError, ValueError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def _format_mb(mb):
+    return f"{mb:.0f} MB" if mb is not None else "n/a"
+
+
+def register_engine(name, factory):
+    """Register a zero-argument callable that builds the engine `name`."""
+    _factories[name] = factory
+
+
+def get_engine(name):
+    """The engine `name`, built (once per process) the first time it is asked for."""
+    engine = _engines.get(name)
+    if engine is not None:
+        return engine
+
+    with _lock:
+        if name not in _engines:
+            if name not in _factories:
+                raise KeyError(f"Unknown OCR engine: {name}")
+            rss_before = _rss_mb()
+            started = time.perf_counter()
+            _engines[name] = _factories[name]()
+            rss_after = _rss_mb()
+            _stats[name] = {
+                "startup_seconds": round(time.perf_counter() - started, 2),
+                "rss_mb": round(rss_after - rss_before, 1) if rss_before is not None else None,
+                "pid": os.getpid(),
+            }
+        return _engines[name]
+
+
+def warm_up(names=None, verbose=True):
+    """
+    Build the given engines (default: all registered) now, then freeze the garbage
+    collector's view of them so forked workers share their memory.
+    """
+    for name in names or list(_factories):
+        get_engine(name)
+        if verbose:
+            stats = _stats[name]
+            print(f"🔥 {name} ready in {stats['startup_seconds']:.2f}s (RSS +{_format_mb(stats['rss_mb'])})")
+    gc.freeze()
+    return engine_stats()
+
+
+def on_starting(server=None):
+    """
+    Pre-fork hook. gunicorn calls `on_starting` in the master process before it forks
+    any worker, so in gunicorn.conf.py:
+
+        from ml_models.ocr_engines import on_starting
+
+    warms the engines listed in OCR_WARM_UP_ENGINES (comma separated), or all of them.
+    """
+    names = [name.strip() for name in os.getenv(WARM_UP_ENGINES_ENV, "").split(",") if name.strip()]
+    return warm_up(names or None)
+
+
+def engine_stats():
+    """Startup time and RSS added per engine built so far."""
+    return {name: dict(stats) for name, stats in _stats.items()}
+
+
+def _build_easyocr():
+    import easyocr
+    return easyocr.Reader(lang_list=['en', 'fr'], gpu=False)
+
+
+def _build_tesseract():
+    import pytesseract
+    pytesseract.get_tesseract_version()  # fails fast if the tesseract binary is missing
+    return pytesseract
+
+
+register_engine("easyocr", _build_easyocr)
+register_engine("tesseract", _build_tesseract)
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(_factories)
+    print(f"baseline RSS {_format_mb(_rss_mb())}")
+    for name, stats in warm_up(names, verbose=False).items():
+        print(f"{name:10} startup {stats['startup_seconds']:6.2f} s   RSS +{_format_mb(stats['rss_mb'])}")
@@ -0,0 +1,70 @@
+import gc
+
+import pytest
+
+from ml_models import ocr_engines
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    """An empty engine registry per test, so the real factories are never built."""
+    monkeypatch.setattr(ocr_engines, "_factories", {})
+    monkeypatch.setattr(ocr_engines, "_engines", {})
+    monkeypatch.setattr(ocr_engines, "_stats", {})
+    yield
+    gc.unfreeze()
+
+
+def counting_factory(calls):
+    def build():
+        calls.append(1)
+        return object()
+    return build
+
+
+def test_engine_is_built_on_first_use_and_only_once():
+    calls = []
+    ocr_engines.register_engine("stand-in", counting_factory(calls))
+    assert calls == []
+
+    engine = ocr_engines.get_engine("stand-in")
+
+    assert ocr_engines.get_engine("stand-in") is engine
+    assert len(calls) == 1
+
+
+def test_unknown_engine_raises_key_error():
+    with pytest.raises(KeyError, match="Unknown OCR engine: missing"):
+        ocr_engines.get_engine("missing")
+
+
+def test_stats_are_kept_per_built_engine():
+    ocr_engines.register_engine("built", counting_factory([]))
+    ocr_engines.register_engine("unused", counting_factory([]))
+    ocr_engines.get_engine("built")
+
+    stats = ocr_engines.engine_stats()
+
+    assert stats.keys() == {"built"}
+    assert stats["built"].keys() == {"startup_seconds", "rss_mb", "pid"}
+
+
+def test_on_starting_warms_the_listed_engines(monkeypatch):
+    listed, other = [], []
+    ocr_engines.register_engine("listed", counting_factory(listed))
+    ocr_engines.register_engine("other", counting_factory(other))
+    monkeypatch.setenv(ocr_engines.WARM_UP_ENGINES_ENV, " listed, ")
+
+    stats = ocr_engines.on_starting(server=None)
+
+    assert stats.keys() == {"listed"}
+    assert (len(listed), len(other)) == (1, 0)
+    assert gc.get_freeze_count() > 0
+
+
+def test_on_starting_warms_every_engine_by_default(monkeypatch):
+    ocr_engines.register_engine("a", counting_factory([]))
+    ocr_engines.register_engine("b", counting_factory([]))
+    monkeypatch.delenv(ocr_engines.WARM_UP_ENGINES_ENV, raising=False)
+
+    assert ocr_engines.on_starting(server=None).keys() == {"a", "b"}